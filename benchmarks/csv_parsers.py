@@ -0,0 +1,112 @@
+"""
+CSV Parser Benchmark
+
+Compares the DataHandler.load_data parser backends on a synthetic AHCD-shaped
+features file (1024 uint8 pixel columns, 100k rows by default):
+  - parse time and rows/s
+  - peak RSS of the process, and the part added by the load itself
+
+Every parser runs in a fresh interpreter, so one backend's allocations do not
+hide the next one's peak.
+
+Usage:
+    python -m benchmarks.csv_parsers [--rows 100000] [--chunk-size 2048] [--dtype uint8] [--json parsers.json]
+"""
+# Import required libraries
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from classes.data_handler import DataHandler
+from benchmarks.suite import write_dataset
+
+# Repository root, the loads run from here
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside a fresh process, loads the dataset once and prints a JSON line
+LOAD_SCRIPT = """
+import io, json, resource, sys
+from classes.data_handler import DataHandler
+from classes.reporting import ConsoleReporter, set_reporter
+
+def peak_rss_mb():
+    # ru_maxrss survives exec and would include the parent's peak, VmHWM starts fresh
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+features, labels, parser, chunk_size, dtype = sys.argv[1:6]
+errors = io.StringIO()
+set_reporter(ConsoleReporter(stream=errors))
+# Interpreter, numpy and the backend's own imports, before any parsing
+if parser == "pandas":
+    import pandas
+elif parser == "pyarrow":
+    import pyarrow.csv
+baseline_mb = peak_rss_mb()
+stats = {}
+X, y = DataHandler.load_data(features, labels, chunk_size=int(chunk_size) or None, dtype=dtype,
+                             stats=stats, parser=parser)
+if X is None:
+    stats = {"error": errors.getvalue().strip()}
+else:
+    stats.update(baseline_rss_mb=baseline_mb, peak_rss_mb=peak_rss_mb())
+print(json.dumps(stats))
+"""
+
+def measure_parser(features_path, labels_path, parser, chunk_size=DataHandler.CHUNK_SIZE, dtype="uint8"):
+    """
+    Loads a dataset with one parser backend in a fresh process
+    Args:
+        features_path (str): Features CSV
+        labels_path (str): Labels CSV
+        parser (str): One of DataHandler.PARSERS
+        chunk_size (int): Rows per chunk, 0 reads the whole file at once
+        dtype (str): Output dtype
+    Returns:
+        dict: DataHandler load stats plus baseline_rss_mb, or {'error': message}
+    """
+    result = subprocess.run([sys.executable, "-c", LOAD_SCRIPT, features_path, labels_path, parser,
+                             str(chunk_size or 0), dtype], cwd=ROOT, capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no output"}
+    return json.loads(lines[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse time and memory of the CSV parser backends")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic features file")
+    parser.add_argument("--chunk-size", type=int, default=DataHandler.CHUNK_SIZE,
+                        help="Rows per chunk (0 reads the whole file at once)")
+    parser.add_argument("--dtype", choices=["uint8", "float32"], default="uint8", help="Output dtype")
+    parser.add_argument("--parsers", default=",".join(DataHandler.PARSERS), help="Comma separated backends")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    report = {"rows": args.rows, "chunk_size": args.chunk_size, "dtype": args.dtype, "parsers": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.rows} synthetic rows...")
+        features_path, labels_path = write_dataset(directory, args.rows)
+        report["file_mb"] = os.path.getsize(features_path) / 2**20
+        print(f"{report['file_mb']:.0f} MB features file, chunk size {args.chunk_size or 'none'}, {args.dtype}\n")
+        print(f"{'Parser':<10}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>14}{'load MB':>10}")
+        for name in args.parsers.split(","):
+            stats = measure_parser(features_path, labels_path, name, args.chunk_size, args.dtype)
+            report["parsers"][name] = stats
+            if "error" in stats:
+                print(f"{name:<10}  ! {stats['error']}")
+                continue
+            # Memory added by the load on top of the imports
+            added = stats["peak_rss_mb"] - stats["baseline_rss_mb"]
+            print(f"{name:<10}{stats['seconds']:>10.2f}{stats['rows_per_sec']:>12.0f}"
+                  f"{stats['peak_rss_mb']:>14.0f}{added:>10.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
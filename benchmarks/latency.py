@@ -0,0 +1,75 @@
+"""
+Single-Sample Latency Benchmark
+
+Compares per-sample prediction latency of Predictor.predict_image through
+model.predict against the traced fast path.
+
+Usage:
+    python -m benchmarks.latency [--model path/to/model.keras] [--runs 200]
+"""
+# Import required libraries
+import argparse
+import time
+import numpy as np
+from PIL import Image
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+
+def measure_latency(model, image, runs=200, warmup=10, fast=False):
+    """
+    Times repeated single-image predictions
+    Args:
+        model (tf.keras.Model): Trained model
+        image (PIL.Image): Input image
+        runs (int): Timed predictions
+        warmup (int): Untimed predictions first (tracing, caches)
+        fast (bool): Use the traced inference path
+    Returns:
+        dict: p50_ms, p99_ms, mean_ms and runs
+    """
+    for _ in range(warmup):
+        Predictor.predict_image(model, image, fast=fast)
+    latencies = np.empty(runs)
+    for i in range(runs):
+        start = time.perf_counter()
+        Predictor.predict_image(model, image, fast=fast)
+        latencies[i] = time.perf_counter() - start
+    latencies *= 1000.0
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+        'runs': runs,
+    }
+
+def compare_paths(model, runs=200):
+    """
+    Benchmarks the model.predict path and the fast path on the same input
+    Args:
+        model (tf.keras.Model): Trained model
+        runs (int): Timed predictions per path
+    Returns:
+        dict: Latency results keyed by 'predict' and 'fast'
+    """
+    image = Image.fromarray(np.random.randint(0, 256, (64, 64), dtype=np.uint8))
+    return {
+        'predict': measure_latency(model, image, runs=runs, fast=False),
+        'fast': measure_latency(model, image, runs=runs, fast=True),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-sample prediction latency benchmark")
+    parser.add_argument("--model", help="Path to a trained .keras model (an untrained model is built if omitted)")
+    parser.add_argument("--attention", action="store_true", help="Build the attention variant when no model is given")
+    parser.add_argument("--runs", type=int, default=200, help="Timed predictions per path")
+    args = parser.parse_args()
+    model = ModelTrainer.load_model(args.model) if args.model else ModelTrainer.build_model(use_attention=args.attention)
+    results = compare_paths(model, runs=args.runs)
+    print(f"{'path':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for path, stats in results.items():
+        print(f"{path:<10}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['mean_ms']:>10.2f}")
+    print(f"speed-up (p50): {results['predict']['p50_ms'] / results['fast']['p50_ms']:.1f}x")
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+HTTP Inference Load Generator
+
+Sends concurrent /predict requests to an InferenceServer and reports throughput
+and tail latency. Without --url it starts the server in-process twice, with
+micro-batching on and off, and compares the two.
+
+Usage:
+    python -m benchmarks.load_test [--model model.keras] [--requests 500] [--concurrency 16]
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 [--multipart]
+"""
+# Import required libraries
+import argparse
+import base64
+import io
+import json
+import threading
+import time
+import uuid
+import http.client
+from urllib.parse import urlsplit
+import numpy as np
+from PIL import Image
+from classes.inference_server import InferenceServer
+from classes.model_trainer import ModelTrainer
+
+def make_payload(multipart=False):
+    """
+    Builds a /predict request body with one random 64x64 PNG
+    Args:
+        multipart (bool): multipart/form-data instead of JSON/base64
+    Returns:
+        tuple: (content_type, body bytes)
+    """
+    buf = io.BytesIO()
+    Image.fromarray(np.random.randint(0, 256, (64, 64), dtype=np.uint8)).save(buf, format="PNG")
+    if not multipart:
+        return "application/json", json.dumps({'image': base64.b64encode(buf.getvalue()).decode()}).encode()
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"image\"; filename=\"sample.png\"\r\n"
+            f"Content-Type: image/png\r\n\r\n").encode() + buf.getvalue() + f"\r\n--{boundary}--\r\n".encode()
+    return f"multipart/form-data; boundary={boundary}", body
+
+def run_load(url, content_type, body, requests=500, concurrency=16, warmup=20):
+    """
+    Sends requests from concurrent clients, each over its own keep-alive connection
+    Args:
+        url (str): Server base URL
+        content_type (str): Request Content-Type
+        body (bytes): Request body
+        requests (int): Timed requests in total
+        concurrency (int): Client threads
+        warmup (int): Untimed requests first
+    Returns:
+        dict: requests, errors, seconds, throughput (requests/s), p50_ms, p95_ms, p99_ms and mean_ms
+    """
+    parts = urlsplit(url)
+    headers = {'Content-Type': content_type}
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client(count=None):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        sent = 0
+        while True:
+            if count is not None:
+                if sent >= count:
+                    break
+            else:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+            start = time.perf_counter()
+            connection.request("POST", "/predict", body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - start
+            sent += 1
+            if count is None:
+                with lock:
+                    latencies.append(elapsed)
+                    errors[0] += response.status != 200
+        connection.close()
+
+    client(count=warmup)
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000.0
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'seconds': seconds,
+        'throughput': len(latencies) / seconds,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+    }
+
+def compare_batching(model, requests=500, concurrency=16, max_batch_size=32, max_wait_ms=5.0, multipart=False):
+    """
+    Load-tests an in-process server with micro-batching on and off
+    Args:
+        model: Loaded model
+        requests (int): Timed requests per mode
+        concurrency (int): Client threads
+        max_batch_size (int): Batch size limit of the batching mode
+        max_wait_ms (float): Wait limit of the batching mode
+        multipart (bool): Send multipart/form-data instead of JSON
+    Returns:
+        dict: run_load results plus mean_batch_size, keyed by 'batched' and 'unbatched'
+    """
+    content_type, body = make_payload(multipart)
+    results = {}
+    for mode, batch_size in (('unbatched', 1), ('batched', max_batch_size)):
+        server = InferenceServer(model, port=0, max_batch_size=batch_size, max_wait_ms=max_wait_ms).start()
+        try:
+            results[mode] = run_load(server.url, content_type, body, requests=requests, concurrency=concurrency)
+            results[mode]['mean_batch_size'] = server.stats()['mean_batch_size']
+        finally:
+            server.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and tail latency of the HTTP inference service")
+    parser.add_argument("--url", help="Load-test a running server instead of starting one")
+    parser.add_argument("--model", help="Path to a trained .keras model (an untrained model is built if omitted)")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--multipart", action="store_true", help="Send multipart/form-data instead of JSON")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    if args.url:
+        results = {'server': run_load(args.url, *make_payload(args.multipart), requests=args.requests,
+                                      concurrency=args.concurrency)}
+    else:
+        model = ModelTrainer.load_model(args.model) if args.model else ModelTrainer.build_model()
+        results = compare_batching(model, requests=args.requests, concurrency=args.concurrency,
+                                   max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                                   multipart=args.multipart)
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'batch':>8}{'errors':>8}")
+    for mode, stats in results.items():
+        print(f"{mode:<10}{stats['throughput']:>10.1f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats.get('mean_batch_size', float('nan')):>8.1f}{stats['errors']:>8}")
+    if 'batched' in results:
+        print(f"throughput gain: {results['batched']['throughput'] / results['unbatched']['throughput']:.1f}x")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
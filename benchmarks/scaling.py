@@ -0,0 +1,48 @@
+"""
+Data-Parallel Scaling Report
+
+Trains with DistributedTrainer for several worker counts and reports
+throughput, speed-up and parallel efficiency against the smallest count.
+
+Usage:
+    python -m benchmarks.scaling [--workers 1,2,4,8] [--rows 20000] [--epochs 3] [--batch-size 128]
+    python -m benchmarks.scaling --features train.csv --labels train_labels.csv [--json scaling.json]
+"""
+# Import required libraries
+import argparse
+import json
+import numpy as np
+from classes.data_handler import DataHandler
+from classes.distributed_trainer import DistributedTrainer
+
+def main():
+    parser = argparse.ArgumentParser(description="Training throughput versus worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--features", help="Features CSV (synthetic data if omitted)")
+    parser.add_argument("--labels", help="Labels CSV")
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic samples")
+    parser.add_argument("--epochs", type=int, default=3, help="Epochs per run, the first is excluded")
+    parser.add_argument("--batch-size", type=int, default=128, help="Per-worker batch size")
+    parser.add_argument("--lr-scaling", choices=DistributedTrainer.LR_SCALINGS, default="linear")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    if args.features and args.labels:
+        X, y = DataHandler.load_data(args.features, args.labels, dtype="uint8")
+    else:
+        rng = np.random.default_rng(0)
+        X = rng.integers(0, 256, (args.rows, 1024), dtype=np.uint8)
+        y = rng.integers(0, 28, args.rows)
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    rows = DistributedTrainer.scaling_report(X, y, worker_counts=worker_counts, epochs=args.epochs,
+                                             per_worker_batch_size=args.batch_size, lr_scaling=args.lr_scaling)
+    print(f"\n{'workers':>8}{'global batch':>14}{'samples/s':>12}{'speed-up':>10}{'efficiency':>12}{'val acc':>9}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['global_batch_size']:>14}{row['samples_per_sec']:>12.0f}"
+              f"{row['speedup']:>9.2f}x{row['efficiency']:>12.0%}{row['val_accuracy']:>9.2%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
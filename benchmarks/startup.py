@@ -0,0 +1,122 @@
+"""
+Startup Time Report
+
+Measures cold-start cost in fresh interpreter processes:
+  - import breakdown of the app modules (python -X importtime)
+  - time to first render of each page through Streamlit's AppTest,
+    and whether TensorFlow / matplotlib got imported on the way
+
+Usage:
+    python -m benchmarks.startup [--top 15] [--json startup.json]
+"""
+# Import required libraries
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# Repository root, the scripts run from here
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Pages in sidebar order
+PAGES = ["🎓 Train Model", "🧪 Test Model", "📊 View Results", "🔮 Make Predictions", "🚪 Exit"]
+# Modules imported at app startup
+STARTUP_MODULES = ["main", "st_pages.train_page", "st_pages.test_page", "st_pages.results_page",
+                   "st_pages.predict_page", "st_pages.exit_page"]
+
+# Runs inside a fresh process, renders one page and prints a JSON line
+RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("main.py", default_timeout=300)
+app.run()
+page = sys.argv[1]
+if page != app.sidebar.radio[0].value:
+    app.sidebar.radio[0].set_value(page).run()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "tensorflow": "tensorflow" in sys.modules,
+    "matplotlib": "matplotlib" in sys.modules,
+    "errors": [str(e.message) for e in app.exception],
+}))
+"""
+
+def import_breakdown(module, top=15):
+    """
+    Cumulative import time of each package pulled in by a module
+    Args:
+        module (str): Module to import
+        top (int): Number of entries returned
+    Returns:
+        list: (package, cumulative_ms) sorted slowest first
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    # Lines look like "import time:  self |  cumulative |   name", children are listed
+    # before their parent and nesting is shown by indentation
+    entries = [(len(indent), name, int(cumulative_us) / 1000) for cumulative_us, indent, name in
+               re.findall(r"^import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)$", result.stderr, re.M)]
+    # Keep only the import tree of the target module (skips interpreter startup)
+    end = max((i for i, (depth, name, _) in enumerate(entries) if depth == 1 and name == module), default=None)
+    if end is None:
+        return []
+    start = max((i + 1 for i in range(end) if entries[i][0] == 1), default=0)
+    tree = entries[start:end]
+    totals = {}
+    for i, (depth, name, ms) in enumerate(tree):
+        package = name.split(".")[0]
+        # The parent is the next entry with a smaller indent
+        parent = next((other for d, other, _ in tree[i + 1:] if d < depth), module)
+        # Count a package once at its outermost entry point in each branch
+        if parent.split(".")[0] != package:
+            totals[package] = totals.get(package, 0) + ms
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+def first_render(page):
+    """
+    Time from process start to the first full render of a page
+    Args:
+        page (str): Sidebar page label
+    Returns:
+        dict: seconds, whether tensorflow/matplotlib were imported, and any script errors
+    """
+    result = subprocess.run([sys.executable, "-c", RENDER_SCRIPT, page], cwd=ROOT,
+                            capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"seconds": None, "tensorflow": None, "matplotlib": None,
+                "errors": [result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no output"]}
+    return json.loads(lines[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import and first-render report")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the import breakdown")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    report = {"imports": {}, "first_render": {}}
+    # Import breakdown of the whole app
+    print("Import breakdown (cumulative ms, fresh process per module)")
+    for module in STARTUP_MODULES:
+        breakdown = import_breakdown(module, args.top)
+        report["imports"][module] = breakdown
+        print(f"\n  {module}")
+        for package, ms in breakdown:
+            print(f"    {package:<28}{ms:>10.1f}")
+    # Time to first render per page
+    print(f"\n{'Page':<24}{'first render s':>16}{'tensorflow':>12}{'matplotlib':>12}")
+    for page in PAGES:
+        render = first_render(page)
+        report["first_render"][page] = render
+        seconds = f"{render['seconds']:.2f}" if render["seconds"] is not None else "error"
+        print(f"{page:<24}{seconds:>16}{str(render['tensorflow']):>12}{str(render['matplotlib']):>12}")
+        for error in render["errors"]:
+            print(f"    ! {error}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Hot Path Benchmark Suite
+
+Times the main data, training and inference paths on synthetic AHCD-shaped
+data (1024 uint8 pixel columns, labels 1-28) at several sizes:
+  - DataHandler.load_data             rows/s per dataset size
+  - DataHandler.preprocess_image      ms per image per source image size
+  - Predictor.predict_image           p50 ms, model.predict and traced paths
+  - ModelTrainer.build_model          seconds, with and without attention
+  - ModelTrainer.train_model          training steps/s per dataset size, default and XLA compile
+
+Results are written as JSON. --compare checks them against a stored baseline
+and exits with status 1 when a metric regressed by more than --tolerance.
+
+Usage:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json [--tolerance 0.2] [--output current.json]
+"""
+# Import required libraries
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from classes.data_handler import DataHandler
+from classes.model_trainer import ModelTrainer
+from classes.reporting import ConsoleReporter, set_reporter
+from classes.tf_loader import get_tf
+from benchmarks.latency import measure_latency
+
+# Default sizes, --quick uses the small ones only
+DATASET_SIZES = [1000, 5000, 20000]
+IMAGE_SIZES = [32, 128, 512]
+TRAIN_SIZES = [1024, 4096]
+QUICK_DATASET_SIZES = [500]
+QUICK_IMAGE_SIZES = [32, 128]
+QUICK_TRAIN_SIZES = [256]
+# Steps per call of the XLA training variant
+XLA_STEPS_PER_EXECUTION = 16
+
+def write_dataset(directory, rows, seed=0):
+    """
+    Writes a synthetic features/labels CSV pair
+    Args:
+        directory (str): Output directory
+        rows (int): Number of samples
+        seed (int): Random seed
+    Returns:
+        tuple: (features_path, labels_path)
+    """
+    rng = np.random.default_rng(seed)
+    features_path = os.path.join(directory, f"features_{rows}.csv")
+    labels_path = os.path.join(directory, f"labels_{rows}.csv")
+    np.savetxt(features_path, rng.integers(0, 256, (rows, 1024)), fmt="%d", delimiter=",")
+    np.savetxt(labels_path, rng.integers(1, 29, (rows, 1)), fmt="%d", delimiter=",")
+    return features_path, labels_path
+
+def best_of(function, repeats):
+    """
+    Fastest wall time of several runs, the least noisy estimate
+    Args:
+        function (callable): Code to time
+        repeats (int): Number of runs
+    Returns:
+        float: Seconds
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def metric(value, unit, higher_is_better):
+    """
+    One benchmark result
+    """
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+def bench_load_data(directory, sizes, repeats):
+    """
+    Parse throughput of load_data, whole-file and chunked float32 and uint8 paths
+    """
+    results = {}
+    for rows in sizes:
+        features_path, labels_path = write_dataset(directory, rows)
+        for dtype in ("float32", "uint8"):
+            seconds = best_of(lambda: DataHandler.load_data(features_path, labels_path, dtype=dtype), repeats)
+            results[f"load_data[rows={rows},dtype={dtype}]"] = metric(rows / seconds, "rows/s", True)
+            seconds = best_of(lambda: DataHandler.load_data(features_path, labels_path, dtype=dtype,
+                                                            chunk_size=DataHandler.CHUNK_SIZE), repeats)
+            results[f"load_data[rows={rows},dtype={dtype},chunk_size={DataHandler.CHUNK_SIZE}]"] = \
+                metric(rows / seconds, "rows/s", True)
+    return results
+
+def bench_preprocess_image(sizes, runs):
+    """
+    Per-image cost of preprocess_image for increasing source resolutions
+    """
+    results = {}
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        image = Image.fromarray(rng.integers(0, 256, (size, size), dtype=np.uint8))
+        seconds = best_of(lambda: [DataHandler.preprocess_image(image) for _ in range(runs)], 3)
+        results[f"preprocess_image[size={size}]"] = metric(seconds / runs * 1000, "ms", False)
+    return results
+
+def bench_build_model(repeats):
+    """
+    Model construction and compile time, with and without attention
+    Returns:
+        tuple: (results, models keyed by attention flag)
+    """
+    results, models = {}, {}
+    for use_attention in (False, True):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            models[use_attention] = ModelTrainer.build_model(use_attention=use_attention)
+            times.append(time.perf_counter() - start)
+        results[f"build_model[attention={use_attention}]"] = metric(min(times), "s", False)
+    return results, models
+
+def bench_predict_image(models, runs):
+    """
+    Single-sample latency through model.predict and the traced path
+    """
+    results = {}
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 256, (64, 64), dtype=np.uint8))
+    for use_attention, model in models.items():
+        for fast in (False, True):
+            stats = measure_latency(model, image, runs=runs, fast=fast)
+            results[f"predict_image[attention={use_attention},fast={fast}]"] = metric(stats["p50_ms"], "ms", False)
+    return results
+
+def bench_train_model(sizes, epochs, batch_size):
+    """
+    Training steps/s, measured after a warm-up epoch has traced the train step
+    """
+    results = {}
+    rng = np.random.default_rng(0)
+    for rows in sizes:
+        X = rng.integers(0, 256, (rows, 1024), dtype=np.uint8)
+        y = rng.integers(0, 28, rows)
+        for use_attention in (False, True):
+            # Default compile, then XLA with several steps per call
+            for xla, steps_per_execution in ((False, 1), (True, XLA_STEPS_PER_EXECUTION)):
+                model = ModelTrainer.build_model(use_attention=use_attention, jit_compile=xla,
+                                                 steps_per_execution=steps_per_execution)
+                ModelTrainer.train_model(model, X, y, epochs=1, batch_size=batch_size)
+                start = time.perf_counter()
+                history = ModelTrainer.train_model(model, X, y, epochs=epochs, batch_size=batch_size)
+                seconds = time.perf_counter() - start
+                # Early stopping may end the run before the requested epochs
+                steps = math.ceil(int(rows * 0.8) / batch_size) * len(history.history["loss"])
+                results[f"train_model[rows={rows},attention={use_attention},xla={xla}]"] = metric(
+                    steps / seconds, "steps/s", True)
+    return results
+
+def run_suite(quick=False, repeats=3, predict_runs=100, image_runs=1000, epochs=2, batch_size=128):
+    """
+    Runs every benchmark
+    Args:
+        quick (bool): Small sizes only, for smoke tests
+        repeats (int): Runs per timing, the fastest is kept
+        predict_runs (int): Timed predictions per latency measurement
+        image_runs (int): Preprocessed images per timing
+        epochs (int): Timed training epochs
+        batch_size (int): Training batch size
+    Returns:
+        dict: Report with environment and metrics keyed by benchmark name
+    """
+    # Keep progress output of the classes out of the report
+    previous = set_reporter(ConsoleReporter(stream=io.StringIO()))
+    try:
+        metrics = {}
+        with tempfile.TemporaryDirectory() as directory:
+            metrics.update(bench_load_data(directory, QUICK_DATASET_SIZES if quick else DATASET_SIZES, repeats))
+        metrics.update(bench_preprocess_image(QUICK_IMAGE_SIZES if quick else IMAGE_SIZES, image_runs))
+        # Import TensorFlow up front so build_model timings exclude it
+        get_tf()
+        build_results, models = bench_build_model(repeats)
+        metrics.update(build_results)
+        metrics.update(bench_predict_image(models, predict_runs))
+        metrics.update(bench_train_model(QUICK_TRAIN_SIZES if quick else TRAIN_SIZES, epochs, batch_size))
+    finally:
+        set_reporter(previous)
+    return {
+        "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                        "cpus": os.cpu_count(), "quick": quick},
+        "metrics": metrics,
+    }
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Compares metrics with a baseline report
+    Args:
+        report (dict): Current report
+        baseline (dict): Stored report
+        tolerance (float): Allowed relative slowdown before a metric is flagged
+    Returns:
+        list: (name, baseline value, current value, relative change, regressed) per shared metric,
+              relative change is positive when the current run is better
+    """
+    rows = []
+    for name, current in report["metrics"].items():
+        previous = baseline["metrics"].get(name)
+        if previous is None or previous["value"] == 0:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        if not current["higher_is_better"]:
+            change = -change
+        rows.append((name, previous["value"], current["value"], change, change < -tolerance))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the data, training and inference hot paths")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    parser.add_argument("--quick", action="store_true", help="Small sizes only")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per timing, the fastest is kept")
+    parser.add_argument("--epochs", type=int, default=2, help="Timed training epochs")
+    args = parser.parse_args()
+    report = run_suite(quick=args.quick, repeats=args.repeats, epochs=args.epochs)
+    print(f"{'benchmark':<48}{'value':>12}  unit")
+    for name, result in report["metrics"].items():
+        print(f"{name:<48}{result['value']:>12.3f}  {result['unit']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        print(f"\n{'benchmark':<48}{'baseline':>12}{'current':>12}{'change':>9}")
+        for name, previous, current, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<48}{previous:>12.3f}{current:>12.3f}{change:>+9.1%}{flag}")
+        regressions = sum(regressed for *_, regressed in rows)
+        print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%} tolerance")
+        if regressions:
+            sys.exit(1)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    main()
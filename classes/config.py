@@ -0,0 +1,29 @@
+"""
+Config Module
+"""
+# Import required libraries
+import os
+import sys
+
+def get_setting(name, default=None):
+    """
+    Reads a configuration value without requiring the Streamlit runtime.
+    Environment variables take precedence, then Streamlit secrets when the
+    app is running under Streamlit, then the default.
+    Args:
+        name (str): Setting name, e.g. MAX_UPLOAD_SIZE
+        default: Value returned when the setting is not defined
+    Returns:
+        str or default: Setting value
+    """
+    if name in os.environ:
+        return os.environ[name]
+    # Only consult secrets if Streamlit is already loaded (never import it here)
+    st = sys.modules.get('streamlit')
+    if st is not None:
+        try:
+            return st.secrets.get(name, default)
+        # No secrets.toml available
+        except Exception:
+            pass
+    return default
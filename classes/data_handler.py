@@ -1,105 +1,592 @@
-
-"""
-DataHandler Module
-"""
-# Import required libraries
-import numpy as np
-import pandas as pd
-import streamlit as st
-
-# Data handling operations
-class DataHandler:
-    """
-    Handles data loading and preprocessing operations 
-    """   
-    @staticmethod
-    def load_data(features_file, labels_file):
-        """
-        Loads and preprocesses CSV data    
-        Args:
-            features_file (UploadedFile): Streamlit uploaded file object for features
-            labels_file (UploadedFile): Streamlit uploaded file object for labels          
-        Returns:
-            tuple: (X, y) preprocessed features and labels
-        """
-        
-        # Try loading and processing data
-        try:
-            # Get Streamlit secrets and set default max upload size = 10MB
-            max_upload_size = int(st.secrets.get("MAX_UPLOAD_SIZE", 10)) 
-            # Validate file size
-            if features_file.size > max_upload_size * 1024 * 1024:
-                raise ValueError(f"File exceeds maximum size of {max_upload_size}MB")        
-            # Validate file objects existence
-            if features_file is None or labels_file is None:
-                raise ValueError("No files uploaded")   
-            # Validate file format (only for direct file uploads)
-            if hasattr(features_file, 'name') and hasattr(labels_file, 'name'):
-                if not (features_file.name.endswith('.csv') and labels_file.name.endswith('.csv')):
-                    raise ValueError("Only CSV files are supported")  
-            # Read files with validation
-            try:
-                X = pd.read_csv(features_file, header=None)
-                y = pd.read_csv(labels_file, header=None)
-            # Handle any errors
-            except pd.errors.EmptyDataError:
-                # Raise error value and Show error message
-                raise ValueError("Uploaded CSV files are empty")
-            # Handle any errors
-            except pd.errors.ParserError:
-                # Raise error value and Show error message
-                raise ValueError("Invalid CSV file")
-            # Validate numeric data
-            if not all(np.issubdtype(dtype, np.number) for dtype in X.dtypes):
-                raise ValueError("Non-numeric data detected in features")
-            # Check Dimension validation
-            # Check if shape is 32x32=1024
-            if X.shape[1] != 1024:  
-                # Raise error value and Show error message
-                raise ValueError(f"Expected 1024 features, got {X.shape[1]}")
-            # Check the labels and images are in equal samples counts 
-            if len(X) != len(y):
-                # Raise error value and Show error message
-                raise ValueError(f"Mismatched samples: {len(X)} features vs {len(y)} labels")
-            
-            # Processing (only reached if all checks pass)
-            X = X.values.reshape(-1, 1, 32, 32, 1).astype('float32') / 255.0
-            # Flatten and convert to zero based labels
-            y = y.values.flatten() - 1
-            # Return processed data
-            return X, y
-            
-        # Handle any errors
-        except Exception as e:
-            # Show error message
-            st.error(f"Data loading error: {str(e)}")
-            # Return empty values
-            return None, None
-
-    @staticmethod
-    def preprocess_image(image):
-        """
-        Processes images for model prediction
-        Args:
-            image (PIL.Image): Input image to process  
-        Returns:
-            tuple: (processed_array, processed_img) 
-                   normalized array and resized PIL Image
-        """
-        try:
-            # Convert to grayscale and resize
-            img = image.convert("L").resize((32, 32))
-            # Invert the image (255 - pixel value) and Convert to numpy array 
-            img_array = 255 - np.array(img)
-            # Transpose array
-            img_array = np.transpose(img_array)
-            # Reshape and normalise
-            img_array = img_array.reshape(1, 1, 32, 32, 1).astype('float32') / 255.0
-            # Return processed array and image
-            return img_array, img
-        # Handle any errors
-        except Exception as e:
-            # Show error message
-            st.error(f"Image processing error: {str(e)}")
-            # Return empty values
-            return None, None
+"""
+DataHandler Module
+"""
+# Import required libraries
+import io
+import os
+import time
+import zipfile
+import warnings
+import itertools
+import contextlib
+import numpy as np
+from classes.config import get_setting
+from classes.reporting import get_reporter
+from io import BytesIO
+from PIL import Image
+
+# resource is POSIX only, peak RSS is reported as None elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Data handling operations
+class DataHandler:
+    """
+    Handles data loading and preprocessing operations 
+    """   
+    # Default number of CSV rows parsed per chunk in streaming mode
+    CHUNK_SIZE = 2048
+    # File extensions accepted for bulk image input
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+    # CSV parser backends: pandas infers column types, pyarrow (multithreaded) and
+    # numpy (integer fast path) declare every pixel column as uint8 up front
+    PARSERS = ('pandas', 'pyarrow', 'numpy')
+
+    @staticmethod
+    def load_data(features_file, labels_file, chunk_size=None, dtype='float32', stats=None, parser=None):
+        """
+        Loads and preprocesses CSV data    
+        Args:
+            features_file (UploadedFile): Streamlit uploaded file object for features
+            labels_file (UploadedFile): Streamlit uploaded file object for labels          
+            chunk_size (int): Rows per chunk, enables bounded-memory streaming when set
+            dtype (str): Output dtype, 'float32' (normalised) or 'uint8' (raw pixels)
+            stats (dict): Optional dict filled with rows, seconds, rows_per_sec and peak_rss_mb
+            parser (str): One of PARSERS, defaults to the CSV_PARSER secret (pandas)
+        Returns:
+            tuple: (X, y) preprocessed features and labels
+        """
+        
+        # Try loading and processing data
+        try:
+            # Start load timer
+            start = time.perf_counter()
+            # Validate uploaded files
+            DataHandler._validate_files(features_file, labels_file)
+            # Validate output dtype
+            if np.dtype(dtype) not in (np.dtype('float32'), np.dtype('uint8')):
+                raise ValueError(f"Unsupported dtype {dtype}, use float32 or uint8")
+            # Validate parser backend
+            parser = parser or get_setting("CSV_PARSER", "pandas")
+            if parser not in DataHandler.PARSERS:
+                raise ValueError(f"Unknown CSV parser {parser}, use one of {', '.join(DataHandler.PARSERS)}")
+            # Stream features straight into a preallocated buffer
+            if chunk_size:
+                X, y = DataHandler._load_data_chunked(features_file, labels_file, chunk_size, dtype, parser)
+            else:
+                X, y = DataHandler._load_data_full(features_file, labels_file, dtype, parser)
+            # Report load throughput and memory
+            if stats is not None:
+                stats.update(DataHandler._load_stats(len(X), time.perf_counter() - start, chunk_size, dtype,
+                                                     parser))
+            # Return processed data
+            return X, y
+            
+        # Handle any errors
+        except Exception as e:
+            # Show error message
+            get_reporter().error(f"Data loading error: {str(e)}")
+            # Return empty values
+            return None, None
+
+    @staticmethod
+    def _validate_files(features_file, labels_file):
+        """
+        Validates uploaded file objects before parsing
+        Args:
+            features_file (UploadedFile): Features file object
+            labels_file (UploadedFile): Labels file object
+        """
+        # Validate file objects existence
+        if features_file is None or labels_file is None:
+            raise ValueError("No files uploaded")   
+        # Get Streamlit secrets and set default max upload size = 10MB
+        max_upload_size = int(get_setting("MAX_UPLOAD_SIZE", 10)) 
+        # Validate file size (in-memory buffers have no size attribute)
+        if getattr(features_file, 'size', 0) > max_upload_size * 1024 * 1024:
+            raise ValueError(f"File exceeds maximum size of {max_upload_size}MB")        
+        # Validate file format (only for direct file uploads)
+        if hasattr(features_file, 'name') and hasattr(labels_file, 'name'):
+            if not (features_file.name.endswith('.csv') and labels_file.name.endswith('.csv')):
+                raise ValueError("Only CSV files are supported")  
+
+    @staticmethod
+    def _read_csv(file, **kwargs):
+        """
+        Reads a headerless CSV and maps pandas errors to ValueError
+        Args:
+            file (file-like): CSV file object
+            **kwargs: Extra pandas.read_csv arguments
+        Returns:
+            pd.DataFrame or TextFileReader: Parsed data or chunk iterator
+        """
+        # Import pandas on first use, prediction-only processes never parse CSVs
+        import pandas as pd
+        try:
+            return pd.read_csv(file, header=None, **kwargs)
+        # Handle any errors
+        except pd.errors.EmptyDataError:
+            # Raise error value and Show error message
+            raise ValueError("Uploaded CSV files are empty")
+        # Handle any errors
+        except pd.errors.ParserError:
+            # Raise error value and Show error message
+            raise ValueError("Invalid CSV file")
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_source(file):
+        """
+        Opens a CSV given by path in binary mode, file objects are passed through
+        Args:
+            file (str or file-like): CSV path or file object
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                yield f
+        else:
+            yield file
+
+    @staticmethod
+    def _read_labels(labels_file, parser):
+        """
+        Reads the labels CSV
+        Args:
+            labels_file (file-like): Labels CSV
+            parser (str): Parser backend
+        Returns:
+            np.array: Zero based labels
+        """
+        if parser == 'pandas':
+            return DataHandler._read_csv(labels_file).values.flatten() - 1
+        # The other backends skip the pandas import, labels are one small integer column
+        with DataHandler._open_source(labels_file) as source, warnings.catch_warnings():
+            # An empty file is reported below rather than warned about
+            warnings.simplefilter('ignore', UserWarning)
+            try:
+                y = np.loadtxt(source, delimiter=',', dtype=np.int64, ndmin=2)
+            except ValueError:
+                raise ValueError("Invalid CSV file")
+        if not y.size:
+            raise ValueError("Uploaded CSV files are empty")
+        return y.reshape(-1) - 1
+
+    @staticmethod
+    def _feature_blocks(features_file, parser, chunk_size=None):
+        """
+        Parses the features CSV into blocks of rows
+        Args:
+            features_file (file-like): Features CSV
+            parser (str): Parser backend
+            chunk_size (int): Rows per block, None for as few blocks as the backend allows
+        Yields:
+            pd.DataFrame or np.array: Feature rows, validated by _validate_block
+        """
+        if parser == 'pyarrow':
+            yield from DataHandler._arrow_blocks(features_file, chunk_size)
+        elif parser == 'numpy':
+            # loadtxt parses into int64 first, so it always works chunk by chunk
+            yield from DataHandler._numpy_blocks(features_file, chunk_size or DataHandler.CHUNK_SIZE)
+        elif chunk_size:
+            yield from DataHandler._read_csv(features_file, chunksize=chunk_size)
+        else:
+            yield DataHandler._read_csv(features_file)
+
+    @staticmethod
+    def _arrow_blocks(features_file, chunk_size=None):
+        """
+        Parses the features CSV with pyarrow's multithreaded reader, every column declared uint8
+        Args:
+            features_file (str or file-like): Features CSV
+            chunk_size (int): Approximate rows per block, None reads the whole table
+        Yields:
+            np.array: (rows, columns) uint8 blocks
+        """
+        # pyarrow is optional, only this backend needs it
+        try:
+            import pyarrow as pa
+            from pyarrow import csv
+        except ImportError:
+            raise ValueError("The pyarrow CSV parser needs the pyarrow package")
+        # pyarrow reads bytes, text buffers are encoded
+        if isinstance(features_file, io.TextIOBase):
+            features_file = BytesIO(features_file.read().encode())
+        read_options = csv.ReadOptions(autogenerate_column_names=True, use_threads=True)
+        if chunk_size:
+            # Rows of up to 1024 "255," fields
+            read_options.block_size = max(chunk_size * 1024 * 4, 1 << 20)
+        # Declared types skip inference, out of range and empty fields fail the conversion
+        convert_options = csv.ConvertOptions(column_types={f"f{i}": pa.uint8() for i in range(1024)},
+                                             null_values=[])
+        try:
+            if chunk_size:
+                for batch in csv.open_csv(features_file, read_options=read_options, convert_options=convert_options):
+                    yield DataHandler._arrow_to_numpy(batch.columns)
+            else:
+                table = csv.read_csv(features_file, read_options=read_options, convert_options=convert_options)
+                yield DataHandler._arrow_to_numpy(table.columns)
+        # Map pyarrow errors to the messages of the pandas path
+        except pa.ArrowInvalid as e:
+            if "Empty CSV file" in str(e):
+                raise ValueError("Uploaded CSV files are empty")
+            if "conversion error" in str(e):
+                raise ValueError(f"Pixel values must be integers in the range 0-255 ({e})")
+            raise ValueError("Invalid CSV file")
+
+    @staticmethod
+    def _arrow_to_numpy(columns):
+        """
+        Copies pyarrow columns into one row-major array
+        Args:
+            columns (list): pyarrow arrays of equal length
+        Returns:
+            np.array: (rows, columns) array
+        """
+        rows = len(columns[0]) if columns else 0
+        block = np.empty((rows, len(columns)), dtype=np.uint8)
+        for index, column in enumerate(columns):
+            block[:, index] = np.asarray(column)
+        return block
+
+    @staticmethod
+    def _numpy_blocks(features_file, chunk_size):
+        """
+        Parses an all-integer features CSV with np.loadtxt, chunk by chunk
+        Args:
+            features_file (str or file-like): Features CSV
+            chunk_size (int): Rows per block
+        Yields:
+            np.array: (rows, columns) uint8 blocks
+        """
+        rows = 0
+        with DataHandler._open_source(features_file) as source:
+            lines = iter(source)
+            while True:
+                batch = list(itertools.islice(lines, chunk_size))
+                if not batch:
+                    break
+                # Parse wider than uint8 so out of range values are caught instead of wrapped
+                with warnings.catch_warnings():
+                    # Chunks of blank lines are skipped below
+                    warnings.simplefilter('ignore', UserWarning)
+                    # Fractional values are truncated with only a deprecation warning, reject them
+                    warnings.simplefilter('error', DeprecationWarning)
+                    try:
+                        values = np.loadtxt(batch, delimiter=',', dtype=np.int64, ndmin=2)
+                    except ValueError as e:
+                        if "number of columns changed" in str(e):
+                            raise ValueError("Invalid CSV file")
+                        raise ValueError(f"Pixel values must be integers in the range 0-255 ({e})")
+                if not values.size:
+                    continue
+                # One range check for the whole block
+                if values.min() < 0 or values.max() > 255:
+                    raise ValueError("Pixel values must be in the range 0-255")
+                rows += len(values)
+                yield values.astype(np.uint8)
+        if not rows:
+            raise ValueError("Uploaded CSV files are empty")
+
+    @staticmethod
+    def _validate_block(X, dtype):
+        """
+        Validates a block of feature rows
+        Args:
+            X (pd.DataFrame or np.array): Feature rows
+            dtype (str): Target output dtype
+        Returns:
+            np.array: The rows as one array
+        """
+        # Validate numeric data, one dtype check for the whole block instead of one per column
+        values = X.to_numpy() if hasattr(X, 'to_numpy') else X
+        if values.dtype.kind not in 'iuf':
+            raise ValueError("Non-numeric data detected in features")
+        # Check Dimension validation
+        # Check if shape is 32x32=1024
+        if values.shape[1] != 1024:  
+            # Raise error value and Show error message
+            raise ValueError(f"Expected 1024 features, got {values.shape[1]}")
+        # Raw pixels must fit in a byte (the uint8 backends are already range checked)
+        if np.dtype(dtype) == np.uint8 and values.dtype != np.uint8 and len(values):
+            if values.min() < 0 or values.max() > 255:
+                raise ValueError("Pixel values must be in the range 0-255")
+        return values
+
+    @staticmethod
+    def _load_data_full(features_file, labels_file, dtype, parser='pandas'):
+        """
+        Parses both CSV files in one pass
+        Args:
+            features_file (file-like): Features CSV
+            labels_file (file-like): Labels CSV
+            dtype (str): Output dtype
+            parser (str): Parser backend
+        Returns:
+            tuple: (X, y) processed features and labels
+        """
+        # Read files with validation
+        blocks = [DataHandler._validate_block(block, dtype)
+                  for block in DataHandler._feature_blocks(features_file, parser)]
+        X = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+        y = DataHandler._read_labels(labels_file, parser)
+        # Check the labels and images are in equal samples counts 
+        if len(X) != len(y):
+            # Raise error value and Show error message
+            raise ValueError(f"Mismatched samples: {len(X)} features vs {len(y)} labels")
+        
+        # Processing (only reached if all checks pass)
+        X = X.reshape(-1, 1, 32, 32, 1)
+        if np.dtype(dtype) == np.uint8:
+            X = X.astype('uint8', copy=False)
+        else:
+            X = X.astype('float32') / 255.0
+        return X, y
+
+    @staticmethod
+    def _load_data_chunked(features_file, labels_file, chunk_size, dtype, parser='pandas'):
+        """
+        Streams the features CSV in fixed-size row chunks into a preallocated buffer,
+        so peak memory stays close to the size of the final array
+        Args:
+            features_file (file-like): Features CSV
+            labels_file (file-like): Labels CSV
+            chunk_size (int): Rows parsed per chunk
+            dtype (str): Output dtype
+            parser (str): Parser backend
+        Returns:
+            tuple: (X, y) processed features and labels
+        """
+        # Labels are small, read them first to size the output buffer
+        y = DataHandler._read_labels(labels_file, parser)
+        n_samples = len(y)
+        # Preallocate the final array once
+        X = np.empty((n_samples, 1, 32, 32, 1), dtype=dtype)
+        flat = X.reshape(n_samples, 1024)
+        # Write each validated chunk straight into its slice of the buffer
+        row = 0
+        for values, _ in DataHandler._aligned_blocks(features_file, y, chunk_size, dtype, parser):
+            end = row + len(values)
+            if np.dtype(dtype) == np.uint8:
+                flat[row:end] = values
+            else:
+                np.divide(values, 255.0, out=flat[row:end], casting='unsafe')
+            row = end
+        return X, y
+
+    @staticmethod
+    def _aligned_blocks(features_file, y, chunk_size, dtype, parser):
+        """
+        Validated feature chunks paired with their labels
+        Args:
+            features_file (file-like): Features CSV
+            y (np.array): All labels of the file
+            chunk_size (int): Rows parsed per chunk
+            dtype (str): Target output dtype
+            parser (str): Parser backend
+        Yields:
+            tuple: (values, labels) of one chunk
+        """
+        n_samples = len(y)
+        row = 0
+        for chunk in DataHandler._feature_blocks(features_file, parser, chunk_size):
+            values = DataHandler._validate_block(chunk, dtype)
+            end = row + len(values)
+            if end > n_samples:
+                raise ValueError(f"Mismatched samples: more than {n_samples} features vs {n_samples} labels")
+            yield values, y[row:end]
+            row = end
+        # Check the labels and images are in equal samples counts 
+        if row != n_samples:
+            raise ValueError(f"Mismatched samples: {row} features vs {n_samples} labels")
+
+    @staticmethod
+    def iter_chunks(features_file, labels_file, chunk_size=CHUNK_SIZE, parser=None):
+        """
+        Streams a features/labels CSV pair chunk by chunk without building the whole array
+        (load_data with chunk_size keeps every chunk, this hands each one over and forgets it)
+        Args:
+            features_file (str or file-like): Features CSV
+            labels_file (str or file-like): Labels CSV
+            chunk_size (int): Rows per chunk
+            parser (str): One of PARSERS, defaults to the CSV_PARSER secret (pandas)
+        Yields:
+            tuple: (X, y) raw uint8 pixels of shape (rows, 1024) and zero based labels
+        Raises:
+            ValueError: Invalid files, the error is raised for the caller to report
+        """
+        parser = parser or get_setting("CSV_PARSER", "pandas")
+        if parser not in DataHandler.PARSERS:
+            raise ValueError(f"Unknown CSV parser {parser}, use one of {', '.join(DataHandler.PARSERS)}")
+        y = DataHandler._read_labels(labels_file, parser)
+        for values, labels in DataHandler._aligned_blocks(features_file, y, chunk_size, 'uint8', parser):
+            yield values.astype(np.uint8, copy=False), labels
+
+    @staticmethod
+    def _load_stats(rows, seconds, chunk_size, dtype, parser='pandas'):
+        """
+        Builds the load report
+        Args:
+            rows (int): Number of samples loaded
+            seconds (float): Wall time of the load
+            chunk_size (int): Rows per chunk or None
+            dtype (str): Output dtype
+            parser (str): Parser backend
+        Returns:
+            dict: rows, seconds, rows_per_sec, peak_rss_mb, chunk_size, dtype and parser
+        """
+        peak_rss_mb = None
+        if resource is not None:
+            # ru_maxrss is reported in KB on Linux
+            peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return {
+            'rows': rows,
+            'seconds': seconds,
+            'rows_per_sec': rows / seconds if seconds > 0 else float('inf'),
+            'peak_rss_mb': peak_rss_mb,
+            'chunk_size': chunk_size,
+            'dtype': str(np.dtype(dtype)),
+            'parser': parser,
+        }
+
+    @staticmethod
+    def preprocess_image(image):
+        """
+        Processes images for model prediction
+        Args:
+            image (PIL.Image): Input image to process  
+        Returns:
+            tuple: (processed_array, processed_img) 
+                   normalized array and resized PIL Image
+        """
+        try:
+            # Convert to grayscale and resize
+            img = image.convert("L").resize((32, 32))
+            # Invert the image (255 - pixel value) and Convert to numpy array 
+            img_array = 255 - np.array(img)
+            # Transpose array
+            img_array = np.transpose(img_array)
+            # Reshape and normalise
+            img_array = img_array.reshape(1, 1, 32, 32, 1).astype('float32') / 255.0
+            # Return processed array and image
+            return img_array, img
+        # Handle any errors
+        except Exception as e:
+            # Show error message
+            get_reporter().error(f"Image processing error: {str(e)}")
+            # Return empty values
+            return None, None
+
+    @staticmethod
+    def iter_images(source):
+        """
+        Lazily yields images from a bulk input source
+        Args:
+            source: A PIL image, a path to an image / directory / zip archive,
+                    an uploaded file (image or zip), or a list of any of these
+        Yields:
+            tuple: (name, PIL.Image) in a stable order, the image is None if it cannot be opened
+        """
+        # Lists are expanded item by item
+        if isinstance(source, (list, tuple)):
+            for index, item in enumerate(source):
+                for name, image in DataHandler.iter_images(item):
+                    yield (name if name is not None else f"image_{index}"), image
+        # PIL images are passed through
+        elif isinstance(source, Image.Image):
+            yield getattr(source, 'filename', None) or None, source
+        # Directories are walked in sorted order
+        elif isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.lower().endswith(DataHandler.IMAGE_EXTENSIONS):
+                        path = os.path.join(root, file_name)
+                        yield os.path.relpath(path, source), DataHandler._open_image(path)
+        # Zip archives by path or file object
+        elif DataHandler._is_zip(source):
+            with zipfile.ZipFile(source) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.lower().endswith(DataHandler.IMAGE_EXTENSIONS):
+                        yield member, DataHandler._open_image(BytesIO(archive.read(member)))
+        # Single image file by path or file object
+        else:
+            name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', None)
+            yield (str(name) if name is not None else None), DataHandler._open_image(source)
+
+    @staticmethod
+    def _open_image(file):
+        """
+        Opens an image without decoding it
+        Args:
+            file (str or file-like): Image path or file object
+        Returns:
+            PIL.Image: Opened image, or None if the file is not a readable image
+        """
+        try:
+            return Image.open(file)
+        # Handle unreadable files
+        except Exception:
+            return None
+
+    @staticmethod
+    def _is_zip(source):
+        """
+        Checks whether a path or file object is a zip archive
+        Args:
+            source (str or file-like): Input source
+        Returns:
+            bool: True for zip archives
+        """
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+        if str(name).lower().endswith('.zip'):
+            return True
+        # Unnamed file objects are sniffed, keeping the read position
+        if hasattr(source, 'read') and hasattr(source, 'seek'):
+            position = source.tell()
+            is_zip = zipfile.is_zipfile(source)
+            source.seek(position)
+            return is_zip
+        return False
+
+    @staticmethod
+    def resize_image(image):
+        """
+        Decodes an image into the 32x32 grayscale pixels used by the model
+        Args:
+            image (PIL.Image): Input image
+        Returns:
+            PIL.Image: Resized grayscale image
+        """
+        # Convert to grayscale and resize
+        return image.convert("L").resize((32, 32))
+
+    @staticmethod
+    def to_model_input(pixels):
+        """
+        Turns a block of resized grayscale pixels into model input
+        (vectorised form of the preprocess_image steps)
+        Args:
+            pixels (np.array): uint8 array of shape (N, 32, 32)
+        Returns:
+            np.array: float32 array of shape (N, 1, 32, 32, 1)
+        """
+        # Invert, transpose each image, reshape and normalise in one pass
+        inverted = 255 - pixels
+        return np.transpose(inverted, (0, 2, 1)).reshape(-1, 1, 32, 32, 1).astype('float32') / 255.0
+
+    @staticmethod
+    def preprocess_images(source):
+        """
+        Processes many images into one contiguous model input array
+        Args:
+            source: Anything accepted by iter_images
+        Returns:
+            tuple: (names, processed_array, failed) list of names, (N, 1, 32, 32, 1)
+                   float32 array, and names of images that could not be decoded
+        """
+        names, failed, resized = [], [], []
+        for index, (name, image) in enumerate(DataHandler.iter_images(source)):
+            name = name if name is not None else f"image_{index}"
+            try:
+                if image is None:
+                    raise ValueError(f"Cannot open {name}")
+                resized.append(np.asarray(DataHandler.resize_image(image)))
+                names.append(name)
+            # Skip images that cannot be decoded
+            except Exception:
+                failed.append(name)
+        pixels = np.stack(resized) if resized else np.empty((0, 32, 32), dtype=np.uint8)
+        return names, DataHandler.to_model_input(pixels), failed
+
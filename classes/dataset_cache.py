@@ -0,0 +1,95 @@
+"""
+DatasetCache Module
+"""
+# Import required libraries
+import threading
+from io import BytesIO
+from classes.config import get_setting
+from classes.data_handler import DataHandler
+from classes.lru_cache import LRUCache, content_digest
+
+# Parsed dataset caching
+class DatasetCache:
+    """
+    Content-addressed cache of parsed (X, y) arrays shared read-only across
+    Streamlit reruns and sessions, keyed by a hash of the uploaded CSV bytes
+    """
+    # Process-wide instance shared by all sessions
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_mb=1024):
+        """
+        Args:
+            max_mb (int): Memory budget for cached arrays in MB
+        """
+        self.cache = LRUCache(max_bytes=int(max_mb * 1024 * 1024),
+                              sizeof=lambda data: data[0].nbytes + data[1].nbytes)
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide cache, sized from the DATASET_CACHE_MB secret
+        Returns:
+            DatasetCache: Shared cache instance
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_mb=int(get_setting("DATASET_CACHE_MB", 1024)))
+            return cls._shared
+
+    # Content hash used for cache keys
+    digest = staticmethod(content_digest)
+
+    def load(self, features_file, labels_file, **load_kwargs):
+        """
+        Returns cached arrays for these files, parsing them with DataHandler.load_data on a miss
+        Args:
+            features_file (UploadedFile or bytes): Features CSV
+            labels_file (UploadedFile or bytes): Labels CSV
+            **load_kwargs: Extra DataHandler.load_data arguments (chunk_size, dtype, parser)
+        Returns:
+            tuple: (X, y) read-only arrays, or (None, None) if loading failed
+        """
+        features_bytes = self._read_bytes(features_file)
+        labels_bytes = self._read_bytes(labels_file)
+        # Loader options that change the parsed result are part of the key (the parser does not)
+        key = (self.digest(features_bytes, labels_bytes), load_kwargs.get('dtype', 'float32'))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # Keep uploaded file objects so name validation still applies
+        if isinstance(features_file, (bytes, bytearray)):
+            features_file = BytesIO(features_bytes)
+        if isinstance(labels_file, (bytes, bytearray)):
+            labels_file = BytesIO(labels_bytes)
+        X, y = DataHandler.load_data(features_file, labels_file, **load_kwargs)
+        if X is None:
+            return None, None
+        # Arrays are shared between sessions, so freeze them
+        X.flags.writeable = False
+        y.flags.writeable = False
+        self.cache.put(key, (X, y))
+        return X, y
+
+    def stats(self):
+        """
+        Returns hit/miss counters and memory use
+        Returns:
+            dict: LRUCache statistics
+        """
+        return self.cache.stats()
+
+    @staticmethod
+    def _read_bytes(file):
+        """
+        Gets raw bytes from an uploaded file or bytes object
+        Args:
+            file (UploadedFile or bytes): File contents
+        Returns:
+            bytes: File contents
+        """
+        if isinstance(file, (bytes, bytearray)):
+            return bytes(file)
+        # getvalue() does not move the read position
+        return file.getvalue()
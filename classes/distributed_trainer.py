@@ -0,0 +1,371 @@
+"""
+DistributedTrainer Module
+"""
+# Import required libraries
+import os
+import sys
+import json
+import math
+import queue
+import socket
+import tempfile
+import threading
+import subprocess
+import time
+import numpy as np
+from classes.model_trainer import ModelTrainer
+from classes.reporting import get_reporter
+from classes.tf_loader import get_tf
+# resource is POSIX only, peak RSS is recorded as NaN elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Repository root, worker processes import the classes package from here
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Data-parallel training operations
+class DistributedTrainer:
+    """
+    Trains the model data-parallel over several worker processes on this machine with
+    tf.distribute.MultiWorkerMirroredStrategy. Each worker trains on its own shard of the
+    samples and gradients are all-reduced every step, so all workers hold the same weights.
+    """
+    # Supported learning-rate scaling rules for the global batch size
+    LR_SCALINGS = ('linear', 'sqrt', 'none')
+
+    @staticmethod
+    def train_model(X_train, y_train, num_workers=2, per_worker_batch_size=128, epochs=20,
+                    use_attention=False, learning_rate=1e-3, lr_scaling='linear',
+                    validation_split=0.2, threads_per_worker=None, model_path=None, epoch_callback=None):
+        """
+        Trains a new model across local worker processes and saves it as .keras
+        Args:
+            X_train (np.array): Training features, float32 in [0,1] or raw uint8 pixels
+            y_train (np.array): Training labels
+            num_workers (int): Worker processes
+            per_worker_batch_size (int): Batch size of each worker, the global batch is num_workers times larger
+            epochs (int): Number of training epochs
+            use_attention (bool): Whether to add attention mechanism
+            learning_rate (float): Single-worker learning rate
+            lr_scaling (str): 'linear' or 'sqrt' scaling with the worker count, or 'none'
+            validation_split (float): Fraction of samples (taken from the end) used for validation
+            threads_per_worker (int): TensorFlow threads per worker, defaults to an even share of the CPUs
+            model_path (str): Where the chief worker saves the model (temporary file if None)
+            epoch_callback (callable): Called with (epoch, logs) as each epoch finishes
+        Returns:
+            tuple: (model_path, tf.keras.callbacks.History) or (None, None)
+        """
+        reporter = get_reporter()
+        progress = None
+        processes = []
+        try:
+            if lr_scaling not in DistributedTrainer.LR_SCALINGS:
+                raise ValueError(f"Unknown learning rate scaling: {lr_scaling}")
+            if model_path is None:
+                model_path = os.path.join(tempfile.mkdtemp(), "model.keras")
+            with tempfile.TemporaryDirectory() as work_dir:
+                # Workers read the arrays from disk and only copy their own shard
+                np.save(os.path.join(work_dir, "X.npy"), np.asarray(X_train))
+                np.save(os.path.join(work_dir, "y.npy"), np.asarray(y_train))
+                config = {
+                    'num_workers': num_workers,
+                    'per_worker_batch_size': per_worker_batch_size,
+                    'epochs': epochs,
+                    'use_attention': use_attention,
+                    'learning_rate': DistributedTrainer.scaled_learning_rate(learning_rate, num_workers, lr_scaling),
+                    'validation_split': validation_split,
+                    'threads': threads_per_worker or max((os.cpu_count() or 1) // num_workers, 1),
+                    'data_dir': work_dir,
+                    'model_path': model_path,
+                }
+                config_path = os.path.join(work_dir, "config.json")
+                with open(config_path, "w") as f:
+                    json.dump(config, f)
+                # Start one process per worker, the chief (index 0) streams its epoch logs on stdout
+                ports = DistributedTrainer._free_ports(num_workers)
+                cluster = {'worker': [f"localhost:{port}" for port in ports]}
+                for index in range(num_workers):
+                    env = dict(os.environ,
+                               TF_CONFIG=json.dumps({'cluster': cluster, 'task': {'type': 'worker', 'index': index}}),
+                               TF_CPP_MIN_LOG_LEVEL='3', CUDA_VISIBLE_DEVICES='')
+                    log = open(os.path.join(work_dir, f"worker_{index}.log"), "w")
+                    processes.append(subprocess.Popen(
+                        [sys.executable, "-m", "classes.distributed_trainer", config_path, str(index)],
+                        cwd=ROOT, env=env, stdout=subprocess.PIPE if index == 0 else subprocess.DEVNULL,
+                        stderr=log, text=True))
+                    log.close()
+                progress = reporter.progress()
+                history = DistributedTrainer._collect(processes, work_dir, progress, epochs, epoch_callback)
+                progress.clear()
+            reporter.metrics("📊 Final Training Metrics", {
+                "Training Accuracy": f"{history.history['accuracy'][-1]:.2%}",
+                "Training Loss": f"{history.history['loss'][-1]:.4f}",
+                "Validation Accuracy": f"{history.history['val_accuracy'][-1]:.2%}",
+                "Validation Loss": f"{history.history['val_loss'][-1]:.4f}",
+                "Workers": f"{num_workers} x {per_worker_batch_size} samples/step",
+                # Steady-state rate, the first epoch includes tracing
+                "Throughput": f"{np.median(history.history['samples_per_sec'][1:] or history.history['samples_per_sec']):.0f} samples/s",
+            })
+            return model_path, history
+        except Exception as e:
+            # Stop any worker still running
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+            if progress is not None:
+                progress.clear()
+            reporter.error(f"Distributed training error: {str(e)}")
+            return None, None
+
+    @staticmethod
+    def scaled_learning_rate(learning_rate, num_workers, lr_scaling='linear'):
+        """
+        Scales the learning rate with the global batch size
+        Args:
+            learning_rate (float): Single-worker learning rate
+            num_workers (int): Worker processes
+            lr_scaling (str): 'linear', 'sqrt' or 'none'
+        Returns:
+            float: Learning rate for the global batch
+        """
+        if lr_scaling == 'linear':
+            return learning_rate * num_workers
+        if lr_scaling == 'sqrt':
+            return learning_rate * math.sqrt(num_workers)
+        return learning_rate
+
+    @staticmethod
+    def scaling_report(X_train, y_train, worker_counts=(1, 2, 4), epochs=3, **train_kwargs):
+        """
+        Measures training throughput for several worker counts
+        Args:
+            X_train (np.array): Training features
+            y_train (np.array): Training labels
+            worker_counts (tuple): Worker counts to try
+            epochs (int): Epochs per run, the first (tracing) epoch is excluded from throughput
+            **train_kwargs: Passed to train_model
+        Returns:
+            list: One dict per worker count with workers, global_batch_size, samples_per_sec,
+                  speedup, efficiency and val_accuracy
+        """
+        rows = []
+        per_worker_batch_size = train_kwargs.get('per_worker_batch_size', 128)
+        for num_workers in worker_counts:
+            model_path, history = DistributedTrainer.train_model(X_train, y_train, num_workers=num_workers,
+                                                                 epochs=epochs, **train_kwargs)
+            if history is None:
+                continue
+            os.remove(model_path)
+            rates = history.history['samples_per_sec']
+            rows.append({
+                'workers': num_workers,
+                'global_batch_size': num_workers * per_worker_batch_size,
+                'samples_per_sec': float(np.median(rates[1:] or rates)),
+                'val_accuracy': history.history['val_accuracy'][-1],
+            })
+        # Speed-up and efficiency relative to the smallest worker count
+        if rows:
+            base = rows[0]['samples_per_sec'] / rows[0]['workers']
+            for row in rows:
+                row['speedup'] = row['samples_per_sec'] / rows[0]['samples_per_sec']
+                row['efficiency'] = row['samples_per_sec'] / (base * row['workers'])
+        return rows
+
+    @staticmethod
+    def _free_ports(count):
+        """
+        Finds free localhost ports for the worker servers
+        """
+        sockets = []
+        for _ in range(count):
+            s = socket.socket()
+            s.bind(("localhost", 0))
+            sockets.append(s)
+        ports = [s.getsockname()[1] for s in sockets]
+        for s in sockets:
+            s.close()
+        return ports
+
+    @staticmethod
+    def _collect(processes, work_dir, progress, epochs, epoch_callback=None):
+        """
+        Follows the chief's epoch logs until every worker has exited
+        Args:
+            processes (list): Worker processes, chief first
+            work_dir (str): Directory with the worker logs
+            progress: Reporter progress handle
+            epochs (int): Requested epochs
+            epoch_callback (callable): Called with (epoch, logs) per epoch
+        Returns:
+            tf.keras.callbacks.History: History rebuilt from the chief's logs
+        """
+        lines = queue.Queue()
+        # Read the chief's stdout in the background so dead workers are noticed
+        reader = threading.Thread(target=lambda: [lines.put(line) for line in processes[0].stdout], daemon=True)
+        reader.start()
+        history = {}
+        while True:
+            try:
+                logs = json.loads(lines.get(timeout=0.5))
+                for key, value in logs.items():
+                    history.setdefault(key, []).append(value)
+                progress.update(
+                    (logs['epoch'] + 1) / epochs,
+                    f"Epoch {logs['epoch']+1}/{epochs} - "
+                    f"Loss: {logs['loss']:.4f}, "
+                    f"Acc: {logs['accuracy']:.4f}, "
+                    f"Val Loss: {logs['val_loss']:.4f}, "
+                    f"Val Acc: {logs['val_accuracy']:.4f}, "
+                    f"{logs['samples_per_sec']:.0f} samples/s"
+                )
+                if epoch_callback is not None:
+                    epoch_callback(logs['epoch'], logs)
+            except queue.Empty:
+                pass
+            codes = [process.poll() for process in processes]
+            failed = [index for index, code in enumerate(codes) if code not in (None, 0)]
+            if failed:
+                # A worker died, the others would wait on it forever
+                for process in processes:
+                    if process.poll() is None:
+                        process.kill()
+                with open(os.path.join(work_dir, f"worker_{failed[0]}.log")) as f:
+                    tail = [line.strip() for line in f if line.strip()][-1:] or ["no output"]
+                raise RuntimeError(f"worker {failed[0]} exited with code {codes[failed[0]]}: {tail[0]}")
+            if all(code == 0 for code in codes):
+                reader.join()
+                while not lines.empty():
+                    for key, value in json.loads(lines.get()).items():
+                        history.setdefault(key, []).append(value)
+                break
+        if not history:
+            raise RuntimeError("workers finished without reporting any epoch")
+        history.pop('epoch', None)
+        callback = get_tf().keras.callbacks.History()
+        callback.history = history
+        return callback
+
+    @staticmethod
+    def _run_worker(config_path, index):
+        """
+        Worker process body, started with TF_CONFIG describing the cluster
+        Args:
+            config_path (str): JSON training configuration
+            index (int): Worker index, 0 is the chief
+        """
+        with open(config_path) as f:
+            config = json.load(f)
+        tf = get_tf()
+        # Share the CPUs between workers instead of oversubscribing them
+        tf.config.threading.set_intra_op_parallelism_threads(config['threads'])
+        tf.config.threading.set_inter_op_parallelism_threads(2)
+        strategy = tf.distribute.MultiWorkerMirroredStrategy()
+        num_workers = config['num_workers']
+        batch_size = config['per_worker_batch_size']
+        global_batch_size = batch_size * num_workers
+
+        # Shard the samples: worker i takes every num_workers-th sample of each split
+        X = np.load(os.path.join(config['data_dir'], "X.npy"), mmap_mode='r')
+        y = np.load(os.path.join(config['data_dir'], "y.npy"), mmap_mode='r')
+        split_at = int(math.ceil(len(X) * (1.0 - config['validation_split'])))
+        train_indices = np.arange(index, split_at, num_workers)
+        val_indices = np.arange(split_at + index, len(X), num_workers)
+        X_shard, y_shard = np.ascontiguousarray(X[train_indices]), np.ascontiguousarray(y[train_indices])
+        X_val, y_val = np.ascontiguousarray(X[val_indices]), np.ascontiguousarray(y[val_indices])
+        # Every worker must run the same number of steps, so use the smallest shard
+        steps_per_epoch = max((split_at // num_workers) // batch_size, 1)
+        options = tf.data.Options()
+        # Samples are already sharded per worker
+        options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+        train_data = ModelTrainer.make_dataset(X_shard, y_shard, np.arange(len(X_shard)), batch_size,
+                                               shuffle_buffer=10000).repeat().with_options(options)
+        train_iterator = iter(strategy.experimental_distribute_dataset(train_data))
+        val_data = ModelTrainer.make_dataset(X_val, y_val, np.arange(len(X_val)), batch_size)
+
+        with strategy.scope():
+            model = ModelTrainer.build_model(use_attention=config['use_attention'])
+            model.optimizer.learning_rate.assign(config['learning_rate'])
+            model.optimizer.build(model.trainable_variables)
+        loss_fn = tf.keras.losses.SparseCategoricalCrossentropy(reduction='none')
+
+        def sums(labels, probabilities):
+            # Loss sum, correct predictions and sample count of one batch
+            losses = loss_fn(labels, probabilities)
+            correct = tf.equal(tf.argmax(probabilities, axis=1), tf.cast(labels, tf.int64))
+            return tf.stack([tf.reduce_sum(losses), tf.reduce_sum(tf.cast(correct, tf.float32)),
+                             tf.cast(tf.size(losses), tf.float32)])
+
+        @tf.function
+        def train_step(iterator):
+            def step_fn(features, labels):
+                with tf.GradientTape() as tape:
+                    probabilities = model(features, training=True)
+                    batch_sums = sums(labels, probabilities)
+                    # Mean over the global batch, the optimizer sums gradients across workers
+                    loss = batch_sums[0] / global_batch_size
+                gradients = tape.gradient(loss, model.trainable_variables)
+                model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+                return batch_sums
+            return strategy.reduce('SUM', strategy.run(step_fn, args=next(iterator)), axis=None)
+
+        @tf.function
+        def eval_step(features, labels):
+            return sums(labels, model(features, training=False))
+
+        # Same plateau and early-stopping rules as ModelTrainer.train_model; their inputs
+        # are all-reduced, so every worker takes the same decisions
+        callbacks = tf.keras.callbacks.CallbackList([
+            tf.keras.callbacks.EarlyStopping(patience=5, restore_best_weights=True),
+            tf.keras.callbacks.ReduceLROnPlateau(factor=0.2, patience=5),
+        ], model=model)
+        callbacks.on_train_begin()
+        for epoch in range(config['epochs']):
+            epoch_start = time.perf_counter()
+            train_sums = np.zeros(3)
+            step_times = []
+            for _ in range(steps_per_epoch):
+                step_start = time.perf_counter()
+                train_sums += train_step(train_iterator).numpy()
+                step_times.append(time.perf_counter() - step_start)
+            # Validate the local shard, then sum over workers
+            val_sums = np.zeros(3, dtype='float32')
+            for features, labels in val_data:
+                val_sums += eval_step(features, labels).numpy()
+            val_sums = strategy.reduce('SUM', strategy.experimental_distribute_values_from_function(
+                lambda context: tf.constant(val_sums)), axis=None).numpy()
+            epoch_time = time.perf_counter() - epoch_start
+            step_ms = np.array(step_times) * 1000
+            logs = {
+                'epoch': epoch,
+                'loss': float(train_sums[0] / train_sums[2]),
+                'accuracy': float(train_sums[1] / train_sums[2]),
+                'val_loss': float(val_sums[0] / max(val_sums[2], 1)),
+                'val_accuracy': float(val_sums[1] / max(val_sums[2], 1)),
+                'epoch_time': epoch_time,
+                'samples_per_sec': float(train_sums[2] / epoch_time),
+                'step_time_p50_ms': float(np.percentile(step_ms, 50)),
+                'step_time_p90_ms': float(np.percentile(step_ms, 90)),
+                'step_time_p99_ms': float(np.percentile(step_ms, 99)),
+                'train_time': float(step_ms.sum() / 1000),
+                'peak_memory_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                                   if resource is not None else float('nan')),
+            }
+            callbacks.on_epoch_end(epoch, logs)
+            logs['val_time'] = epoch_time - logs['train_time']
+            logs['overhead_time'] = 0.0
+            logs['learning_rate'] = float(tf.keras.ops.convert_to_numpy(model.optimizer.learning_rate))
+            if index == 0:
+                print(json.dumps(logs), flush=True)
+            if model.stop_training:
+                break
+        # Restores the best weights when early stopping triggered
+        callbacks.on_train_end()
+        # Only the chief writes the artifact, same format as ModelTrainer.save_model
+        if index == 0 and ModelTrainer.save_model(model, config['model_path']) is None:
+            sys.exit(1)
+
+# Worker process entry point: python -m classes.distributed_trainer <config.json> <index>
+if __name__ == "__main__":
+    DistributedTrainer._run_worker(sys.argv[1], int(sys.argv[2]))
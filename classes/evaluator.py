@@ -0,0 +1,196 @@
+"""
+Evaluator Module
+"""
+# Import required libraries
+import time
+import threading
+import numpy as np
+from classes.config import get_setting
+from classes.reporting import get_reporter
+from classes.lru_cache import LRUCache, content_digest
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.tflite_model import TFLiteModel
+
+# Test set evaluation
+class Evaluator:
+    """
+    Streams a test set through the model in batches and accumulates the confusion
+    matrix, loss and top-k hits with vectorised NumPy, so the full per-class report
+    costs one pass over the data. Reports are cached by (model weights, dataset) hash,
+    shared across reruns and sessions.
+    """
+    # Process-wide instance shared by all sessions
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=16):
+        """
+        Args:
+            max_entries (int): Maximum number of cached reports
+        """
+        self.cache = LRUCache(max_entries=max_entries)
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide evaluator, sized from the EVALUATION_CACHE_ENTRIES secret
+        Returns:
+            Evaluator: Shared evaluator instance
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_entries=int(get_setting("EVALUATION_CACHE_ENTRIES", 16)))
+            return cls._shared
+
+    @staticmethod
+    def model_fingerprint(model):
+        """
+        Hashes a model's weights, so a retrained or fine-tuned model gets a new key
+        Args:
+            model (tf.keras.Model or TFLiteModel): Model
+        Returns:
+            str: Hex digest
+        """
+        if isinstance(model, TFLiteModel):
+            return content_digest(model.model_content)
+        return content_digest(*(np.ascontiguousarray(weight).tobytes() for weight in model.get_weights()))
+
+    @staticmethod
+    def dataset_fingerprint(X, y):
+        """
+        Hashes a dataset's arrays
+        Args:
+            X (np.array): Features
+            y (np.array): Labels
+        Returns:
+            str: Hex digest
+        """
+        X = np.ascontiguousarray(X)
+        y = np.ascontiguousarray(y)
+        return content_digest(str((X.dtype, X.shape)).encode(), X.data.cast('B'), y.astype(np.int64).tobytes())
+
+    def evaluate(self, model, X_test, y_test, **evaluate_kwargs):
+        """
+        Returns the cached report for this model and dataset, evaluating on a miss
+        Args:
+            model (tf.keras.Model or TFLiteModel): Model
+            X_test (np.array): Test features
+            y_test (np.array): Test labels
+            **evaluate_kwargs: Extra Evaluator.evaluate_model arguments (batch_size, top_k)
+        Returns:
+            dict: Evaluation report, or None if evaluation failed
+        """
+        key = Evaluator._key(model, X_test, y_test, evaluate_kwargs)
+        report = self.cache.get(key)
+        if report is None:
+            report = Evaluator.evaluate_model(model, X_test, y_test, **evaluate_kwargs)
+            if report is not None:
+                self.cache.put(key, report)
+        return report
+
+    def cached(self, model, X_test, y_test, **evaluate_kwargs):
+        """
+        Returns the cached report without evaluating
+        Returns:
+            dict: Evaluation report, or None if this model and dataset were not evaluated yet
+        """
+        key = Evaluator._key(model, X_test, y_test, evaluate_kwargs)
+        return self.cache.get(key) if key in self.cache else None
+
+    @staticmethod
+    def _key(model, X_test, y_test, evaluate_kwargs):
+        """
+        Cache key of a report, evaluation options change the report so they are part of it
+        """
+        return (Evaluator.model_fingerprint(model), Evaluator.dataset_fingerprint(X_test, y_test),
+                repr(sorted(evaluate_kwargs.items())))
+
+    @staticmethod
+    def evaluate_model(model, X_test, y_test, batch_size=512, top_k=(1, 3, 5)):
+        """
+        Evaluates a model batch by batch
+        Args:
+            model (tf.keras.Model or TFLiteModel): Model
+            X_test (np.array): Test features, float32 in [0,1] or raw uint8 pixels
+            y_test (np.array): Zero based test labels
+            batch_size (int): Samples per inference call
+            top_k (tuple): k values for top-k accuracy
+        Returns:
+            dict: loss, accuracy, top_k accuracies, confusion matrix (true x predicted),
+                per-class precision, recall, f1 and support, samples and evaluation time
+        """
+        reporter = get_reporter()
+        progress = None
+        try:
+            start = time.perf_counter()
+            num_classes = len(Predictor.characters)
+            y_test = np.asarray(y_test).astype(np.int64)
+            if len(y_test) == 0 or len(y_test) != len(X_test):
+                raise ValueError("Test features and labels must be non-empty and of equal length")
+            if y_test.min() < 0 or y_test.max() >= num_classes:
+                raise ValueError(f"Test labels must be in [0, {num_classes - 1}]")
+            # Keras models run through the traced inference function, not predict()'s per-call setup
+            predict = Predictor.get_inference_fn(model)
+            confusion = np.zeros(num_classes * num_classes, dtype=np.int64)
+            top_k_hits = np.zeros(len(top_k), dtype=np.int64)
+            loss_sum = 0.0
+            progress = reporter.progress()
+            for batch_start in range(0, len(y_test), batch_size):
+                labels = y_test[batch_start:batch_start + batch_size]
+                batch = ModelTrainer.as_model_input(X_test[batch_start:batch_start + batch_size])
+                probabilities = np.asarray(predict(batch.astype('float32', copy=False)))
+                true_probabilities = probabilities[np.arange(len(labels)), labels]
+                loss_sum += float(-np.log(np.clip(true_probabilities, 1e-7, 1.0)).sum())
+                # Rank of the true class: how many classes scored strictly higher
+                rank = (probabilities > true_probabilities[:, None]).sum(axis=1)
+                top_k_hits += (rank[None, :] < np.asarray(top_k)[:, None]).sum(axis=1)
+                # Flattened (true, predicted) pairs counted in one bincount
+                confusion += np.bincount(labels * num_classes + probabilities.argmax(axis=1),
+                                         minlength=num_classes * num_classes)
+                done = min(batch_start + batch_size, len(y_test))
+                progress.update(done / len(y_test), f"Evaluated {done}/{len(y_test)} samples")
+            progress.clear()
+            confusion = confusion.reshape(num_classes, num_classes)
+            true_positives = np.diag(confusion)
+            support = confusion.sum(axis=1)
+            predicted = confusion.sum(axis=0)
+            # Classes that were never predicted (or never present) get 0
+            precision = np.divide(true_positives, predicted, out=np.zeros(num_classes), where=predicted > 0)
+            recall = np.divide(true_positives, support, out=np.zeros(num_classes), where=support > 0)
+            f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(num_classes),
+                           where=(precision + recall) > 0)
+            return {
+                'loss': loss_sum / len(y_test),
+                'accuracy': float(true_positives.sum() / len(y_test)),
+                'top_k': {k: float(hits / len(y_test)) for k, hits in zip(top_k, top_k_hits)},
+                'confusion': confusion,
+                'precision': precision,
+                'recall': recall,
+                'f1': f1,
+                'support': support,
+                'samples': len(y_test),
+                'eval_time': time.perf_counter() - start,
+            }
+        except Exception as e:
+            if progress is not None:
+                progress.clear()
+            reporter.error(f"Evaluation error: {str(e)}")
+            return None
+
+    @staticmethod
+    def per_class_table(report):
+        """
+        Per-character rows for display
+        Args:
+            report (dict): Evaluation report
+        Returns:
+            list: One dict per character with precision, recall, f1 and support
+        """
+        return [{
+            "Character": character,
+            "Precision": f"{report['precision'][i]:.2%}",
+            "Recall": f"{report['recall'][i]:.2%}",
+            "F1": f"{report['f1'][i]:.2%}",
+            "Support": int(report['support'][i]),
+        } for i, character in enumerate(Predictor.characters)]
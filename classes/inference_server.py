@@ -0,0 +1,232 @@
+"""
+InferenceServer Module
+"""
+# Import required libraries
+import io
+import json
+import base64
+import threading
+import email.parser
+import email.policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from PIL import Image
+from classes.config import get_setting
+from classes.data_handler import DataHandler
+from classes.micro_batcher import MicroBatcher
+from classes.predictor import Predictor
+
+# HTTP prediction service
+class InferenceServer:
+    """
+    Standard-library HTTP service around a loaded model. Each request is decoded
+    and preprocessed on its own handler thread; inference runs through a shared
+    MicroBatcher, so concurrent requests are answered from one batched model call.
+
+    Endpoints:
+        POST /predict  JSON {"image": base64} or {"images": [base64, ...]}, or multipart/form-data files
+        GET  /health   {"status": "ok"}
+        GET  /stats    Request and batching counters
+    """
+
+    def __init__(self, model, host="127.0.0.1", port=8000, max_batch_size=32, max_wait_ms=5.0, top_k=3,
+                 max_request_mb=None):
+        """
+        Args:
+            model: Loaded Keras or TFLite model
+            host (str): Interface to listen on
+            port (int): Port, 0 picks a free one
+            max_batch_size (int): Samples per inference call, 1 disables batching
+            max_wait_ms (float): Longest time a request waits for others to join its batch
+            top_k (int): Ranked labels returned per image
+            max_request_mb (int): Largest accepted request body, defaults to the MAX_UPLOAD_SIZE secret
+        """
+        # Held for the server's lifetime, the cached inference function must not outlive it
+        self.model = model
+        self.batcher = MicroBatcher(Predictor.get_inference_fn(model), max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms)
+        self.top_k = top_k
+        self.max_request_bytes = int(float(max_request_mb or get_setting("MAX_UPLOAD_SIZE", 50)) * 1024 * 1024)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        server = self
+
+        class Handler(InferenceRequestHandler):
+            inference_server = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """
+        Base URL the server listens on
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Serves requests on a background thread
+        Returns:
+            InferenceServer: self
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serves requests on the calling thread until interrupted
+        """
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def stop(self):
+        """
+        Stops a server started with start()
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        """
+        Returns request and batching counters
+        Returns:
+            dict: requests, errors, batches, samples and mean_batch_size
+        """
+        with self._lock:
+            counters = {'requests': self.requests, 'errors': self.errors}
+        return dict(counters, **self.batcher.stats())
+
+    def predict(self, images):
+        """
+        Predicts decoded images through the micro-batcher
+        Args:
+            images (list): (name, image bytes) pairs
+        Returns:
+            dict: predictions (name, class, label, confidence, top_k) and names of images that failed to decode
+        """
+        names, futures, failed = [], [], []
+        for name, image_bytes in images:
+            try:
+                processed_array, _ = DataHandler.preprocess_image(Image.open(io.BytesIO(image_bytes)))
+            except Exception:
+                processed_array = None
+            if processed_array is None:
+                failed.append(name)
+                continue
+            # Queue every image before waiting, so images of one request share a batch
+            names.append(name)
+            futures.append(self.batcher.submit(processed_array))
+        probabilities = (np.stack([future.result() for future in futures]) if futures
+                         else np.empty((0, len(Predictor.characters)), dtype='float32'))
+        ranked = Predictor.rank_predictions(probabilities, names, failed, top_k=self.top_k)
+        return {
+            'predictions': [{
+                'name': name,
+                'class': int(ranked['classes'][i]),
+                'label': ranked['top_k_labels'][i][0],
+                'confidence': float(ranked['confidences'][i]),
+                'top_k': [{'label': label, 'confidence': float(confidence)} for label, confidence
+                          in zip(ranked['top_k_labels'][i], ranked['top_k_confidences'][i])],
+            } for i, name in enumerate(names)],
+            'failed': failed,
+        }
+
+    @staticmethod
+    def decode_request(content_type, body):
+        """
+        Extracts images from a request body
+        Args:
+            content_type (str): Content-Type header
+            body (bytes): Request body
+        Returns:
+            list: (name, image bytes) pairs
+        Raises:
+            ValueError: If the body is not valid JSON or multipart input
+        """
+        if content_type.startswith("multipart/form-data"):
+            # Parse the form with the email package, the header carries the boundary
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+            if not message.is_multipart():
+                raise ValueError("Malformed multipart body")
+            images = [(part.get_filename() or part.get_param('name', header='content-disposition') or f"image_{i}",
+                       part.get_payload(decode=True))
+                      for i, part in enumerate(message.iter_parts())]
+        elif content_type.startswith("application/json"):
+            payload = json.loads(body)
+            encoded = payload['images'] if 'images' in payload else [payload['image']]
+            images = [(f"image_{i}", base64.b64decode(data, validate=True)) for i, data in enumerate(encoded)]
+        else:
+            raise ValueError(f"Unsupported content type: {content_type or 'none'}")
+        if not images:
+            raise ValueError("No images in request")
+        return images
+
+# Request handler
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the InferenceServer it is bound to
+    """
+    inference_server = None
+    # Keep-alive lets load generators reuse connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == "/stats":
+            self._send_json(200, self.inference_server.stats())
+        else:
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        server = self.inference_server
+        if self.path != "/predict":
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > server.max_request_bytes:
+            self.close_connection = True
+            self._send_json(413, {'error': "Request body too large"})
+            return
+        body = self.rfile.read(length)
+        try:
+            images = InferenceServer.decode_request(self.headers.get('Content-Type', ""), body)
+        except (ValueError, KeyError, TypeError) as e:
+            with server._lock:
+                server.errors += 1
+            self._send_json(400, {'error': f"Invalid request: {str(e)}"})
+            return
+        try:
+            result = server.predict(images)
+        except Exception as e:
+            with server._lock:
+                server.errors += 1
+            self._send_json(500, {'error': f"Prediction error: {str(e)}"})
+            return
+        with server._lock:
+            server.requests += 1
+        self._send_json(200, result)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the output under load
+        pass
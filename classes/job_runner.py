@@ -0,0 +1,388 @@
+"""
+JobRunner Module
+"""
+# Import required libraries
+import os
+import time
+import uuid
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from types import SimpleNamespace
+import numpy as np
+from classes.config import get_setting
+
+# Job states
+QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = 'queued', 'running', 'finished', 'failed', 'cancelled'
+
+# One training job
+class TrainingJob:
+    """
+    State of a training job as seen by the app process, updated from the worker's messages
+    """
+
+    def __init__(self, job_id, options, data_dir):
+        self.id = job_id
+        self.options = options
+        self.data_dir = data_dir
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        # Per-epoch logs streamed by the worker
+        self.epochs = []
+        self.progress = 0.0
+        self.message = ""
+        self.model_path = None
+        self.history = None
+        # Per-layer cost of the trained model, when the job was profiled
+        self.layer_profile = None
+        self.error = None
+        self.process = None
+
+    @property
+    def active(self):
+        """
+        True while the job is queued or running
+        """
+        return self.status in (QUEUED, RUNNING)
+
+    def snapshot(self):
+        """
+        Summary of the job for listing
+        Returns:
+            dict: id, status, progress, epochs done, last validation accuracy, elapsed seconds and error
+        """
+        last = self.epochs[-1] if self.epochs else {}
+        end = self.finished or time.time()
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'epochs': len(self.epochs),
+            'val_accuracy': last.get('val_accuracy'),
+            'elapsed': end - self.started if self.started else 0.0,
+            'message': self.message,
+            'error': self.error,
+        }
+
+    def training_history(self):
+        """
+        History of a finished job in the same shape as tf.keras.callbacks.History
+        Returns:
+            SimpleNamespace: With .history (metric name to per-epoch values) and .epoch
+        """
+        history = self.history or {}
+        return SimpleNamespace(history=history, epoch=list(range(len(history.get('loss', [])))))
+
+# Background training
+class JobRunner:
+    """
+    Runs training jobs in worker processes, at most max_concurrent at a time, so the
+    Streamlit script thread stays responsive. Workers stream progress and epoch metrics
+    back over a queue; they run at a lower CPU priority with a capped thread count so
+    prediction requests served by the app process are not starved.
+    """
+    # Process-wide instance shared by all sessions
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_concurrent=1, threads_per_job=None, niceness=10):
+        """
+        Args:
+            max_concurrent (int): Jobs allowed to run at the same time, the rest wait in the queue
+            threads_per_job (int): TensorFlow threads of each job, defaults to an even share of the CPUs
+            niceness (int): Added to each worker's nice value (POSIX), 0 keeps the app's priority
+        """
+        self.max_concurrent = max_concurrent
+        self.threads_per_job = threads_per_job or max((os.cpu_count() or 1) // max_concurrent, 1)
+        self.niceness = niceness
+        # Spawned workers start clean instead of forking the app (and its TensorFlow state)
+        self._context = multiprocessing.get_context('spawn')
+        self._messages = self._context.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._dispatcher = None
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide runner, configured from the TRAINING_JOBS,
+        TRAINING_JOB_THREADS and TRAINING_JOB_NICE secrets
+        Returns:
+            JobRunner: Shared runner instance
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                threads = get_setting("TRAINING_JOB_THREADS", None)
+                cls._shared = cls(max_concurrent=int(get_setting("TRAINING_JOBS", 1)),
+                                  threads_per_job=int(threads) if threads else None,
+                                  niceness=int(get_setting("TRAINING_JOB_NICE", 10)))
+            return cls._shared
+
+    def submit(self, X_train, y_train, **options):
+        """
+        Queues a training job
+        Args:
+            X_train (np.array): Training features, None with a manifest
+            y_train (np.array): Training labels, None with a manifest
+            **options: epochs, batch_size, use_attention, use_tf_data, jit_compile, steps_per_execution,
+                checkpoint_dir, base_model_path or base_model_bytes (a .keras file, stored with the job's
+                data) and learning_rate (fine-tuning), num_workers and lr_scaling
+                (data-parallel training), profile_dir and profile_batches (profiling), manifest and
+                shard_threads (sharded dataset streamed from its files instead of X_train/y_train)
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex[:8]
+        # Workers read the arrays from disk rather than through the queue
+        data_dir = tempfile.mkdtemp(prefix=f"job_{job_id}_")
+        if not options.get('manifest'):
+            np.save(os.path.join(data_dir, "X.npy"), np.asarray(X_train))
+            np.save(os.path.join(data_dir, "y.npy"), np.asarray(y_train))
+        base_model_bytes = options.pop('base_model_bytes', None)
+        if base_model_bytes is not None:
+            # Removed with the rest of the job's data when it finishes
+            options['base_model_path'] = os.path.join(data_dir, "base_model.keras")
+            with open(options['base_model_path'], 'wb') as f:
+                f.write(base_model_bytes)
+        with self._lock:
+            self._jobs[job_id] = TrainingJob(job_id, options, data_dir)
+            self._schedule()
+            # Follow the workers' messages from a background thread
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Returns a job by id, or None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids=None):
+        """
+        Lists jobs, newest first
+        Args:
+            job_ids (list): Only these jobs (e.g. the ones of one session), all if None
+        Returns:
+            list: Job snapshots
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job_ids is None or job.id in job_ids]
+            return [job.snapshot() for job in reversed(jobs)]
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job
+        Args:
+            job_id (str): Job id
+        Returns:
+            bool: True if the job was cancelled
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            if job.process is not None and job.process.is_alive():
+                # The worker leads its own process group, so data-parallel workers stop too
+                try:
+                    os.killpg(job.process.pid, signal.SIGTERM)
+                except (AttributeError, OSError):
+                    job.process.terminate()
+            self._finish(job, CANCELLED)
+            self._schedule()
+            return True
+
+    def _schedule(self):
+        """
+        Starts queued jobs while there are free slots (caller holds the lock)
+        """
+        running = sum(job.status == RUNNING for job in self._jobs.values())
+        for job in self._jobs.values():
+            if running >= self.max_concurrent:
+                break
+            if job.status == QUEUED:
+                job.process = self._context.Process(
+                    target=_run_job, args=(job.id, job.data_dir, job.options, self._messages,
+                                           self.threads_per_job, self.niceness), daemon=True)
+                job.process.start()
+                job.status = RUNNING
+                job.started = time.time()
+                running += 1
+
+    def _finish(self, job, status, error=None):
+        """
+        Marks a job done and removes its data (caller holds the lock)
+        """
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        shutil.rmtree(job.data_dir, ignore_errors=True)
+
+    def _dispatch(self):
+        """
+        Applies worker messages to the jobs and notices workers that died
+        """
+        while True:
+            try:
+                kind, job_id, payload = self._messages.get(timeout=0.5)
+            except queue.Empty:
+                kind = None
+            with self._lock:
+                job = self._jobs.get(job_id) if kind else None
+                # Late messages of cancelled jobs are ignored
+                if job is not None and job.status == RUNNING:
+                    if kind == 'progress':
+                        job.progress, job.message = payload
+                    elif kind == 'epoch':
+                        job.epochs.append(payload)
+                    elif kind == 'done':
+                        job.model_path, job.history, job.layer_profile = payload
+                        job.progress = 1.0
+                        self._finish(job, FINISHED)
+                    elif kind == 'failed':
+                        self._finish(job, FAILED, payload)
+                # Workers that exited without reporting (killed, crashed)
+                for other in self._jobs.values():
+                    if (other.status == RUNNING and not other.process.is_alive()
+                            and other.process.exitcode not in (None, 0)):
+                        self._finish(other, FAILED, f"worker exited with code {other.process.exitcode}")
+                self._schedule()
+                if not any(job.active for job in self._jobs.values()) and self._messages.empty():
+                    # Nothing left to follow, submit() starts a new dispatcher
+                    self._dispatcher = None
+                    return
+
+# Reporter used inside job workers
+class QueueReporter:
+    """
+    Forwards progress and errors of the training classes to the app process
+    """
+
+    def __init__(self, messages, job_id):
+        self.messages = messages
+        self.job_id = job_id
+        self.last_error = None
+
+    def error(self, message):
+        self.last_error = message
+
+    def warning(self, message):
+        pass
+
+    def info(self, message):
+        pass
+
+    def progress(self):
+        return QueueProgress(self)
+
+    def metrics(self, title, values):
+        pass
+
+    def image(self, image, caption=None):
+        pass
+
+    def text(self, message):
+        pass
+
+# Progress handle used inside job workers
+class QueueProgress:
+    """
+    Sends progress updates to the app process
+    """
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+
+    def update(self, fraction, text=None):
+        self.reporter.messages.put(('progress', self.reporter.job_id, (fraction, text or "")))
+
+    def clear(self):
+        pass
+
+def _run_job(job_id, data_dir, options, messages, threads, niceness):
+    """
+    Worker process body: trains, saves the model and reports back
+    Args:
+        job_id (str): Job id
+        data_dir (str): Directory with X.npy and y.npy (empty for manifest jobs)
+        options (dict): Options given to JobRunner.submit
+        messages (multiprocessing.Queue): Messages to the app process
+        threads (int): TensorFlow threads
+        niceness (int): Nice increment
+    """
+    # Own process group, so cancelling also stops data-parallel worker processes
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+    from classes.reporting import set_reporter
+    from classes.tf_loader import get_tf
+    from classes.model_trainer import ModelTrainer
+    from classes.distributed_trainer import DistributedTrainer
+    from classes.profiler import ModelProfiler
+    from classes.sharded_dataset import ShardedDataset
+    reporter = QueueReporter(messages, job_id)
+    set_reporter(reporter)
+    tf = get_tf()
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+    if options.get('manifest'):
+        # Shards are streamed from their own files
+        shard_options = {'threads': options['shard_threads']} if options.get('shard_threads') else {}
+        X_train, y_train = ShardedDataset.from_manifest(options['manifest'], **shard_options), None
+        if X_train is None:
+            messages.put(('failed', job_id, reporter.last_error or "invalid manifest"))
+            return
+    else:
+        X_train = np.load(os.path.join(data_dir, "X.npy"))
+        y_train = np.load(os.path.join(data_dir, "y.npy"))
+    epochs = options.get('epochs', 20)
+    batch_size = options.get('batch_size', 128)
+
+    def send_epoch(epoch, logs):
+        messages.put(('epoch', job_id, {key: float(value) for key, value in logs.items()}))
+
+    try:
+        model_path = layer_profile = None
+        if options.get('num_workers', 1) > 1:
+            # Data-parallel training, the workers save the model themselves
+            model_path, history = DistributedTrainer.train_model(
+                X_train, y_train, num_workers=options['num_workers'], per_worker_batch_size=batch_size,
+                epochs=epochs, use_attention=options.get('use_attention', False),
+                lr_scaling=options.get('lr_scaling', 'linear'), epoch_callback=send_epoch)
+        else:
+            train_kwargs = dict(epochs=epochs, batch_size=batch_size, use_tf_data=options.get('use_tf_data', False),
+                                checkpoint_dir=options.get('checkpoint_dir'), profile_dir=options.get('profile_dir'),
+                                profile_batches=options.get('profile_batches', ModelProfiler.DEFAULT_BATCHES),
+                                callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=send_epoch)])
+            if options.get('base_model_path'):
+                # Continue training an existing model
+                model = ModelTrainer.load_model(options['base_model_path'])
+                history = model and ModelTrainer.fine_tune(model, X_train, y_train,
+                                                           learning_rate=options.get('learning_rate', 1e-4),
+                                                           **train_kwargs)
+            else:
+                model = ModelTrainer.build_model(use_attention=options.get('use_attention', False),
+                                                 jit_compile=options.get('jit_compile', 'auto'),
+                                                 steps_per_execution=options.get('steps_per_execution', 1))
+                history = model and ModelTrainer.train_model(model, X_train, y_train, **train_kwargs)
+            if history:
+                model_path = ModelTrainer.save_model(model)
+                if options.get('profile_dir'):
+                    layer_profile = ModelProfiler.layer_profile(model)
+        if history and model_path:
+            messages.put(('done', job_id, (model_path, {key: [float(value) for value in values]
+                                                        for key, values in history.history.items()},
+                                           layer_profile)))
+        else:
+            messages.put(('failed', job_id, reporter.last_error or "training failed"))
+    except Exception as e:
+        messages.put(('failed', job_id, str(e)))
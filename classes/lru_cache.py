@@ -0,0 +1,156 @@
+"""
+LRUCache Module
+"""
+# Import required libraries
+import hashlib
+import threading
+from collections import OrderedDict
+
+def content_digest(*contents):
+    """
+    Hashes raw contents into a cache key
+    Args:
+        *contents (bytes): Byte strings to hash together
+    Returns:
+        str: Hex digest
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for content in contents:
+        # Length prefix keeps (a, bc) and (ab, c) apart
+        hasher.update(len(content).to_bytes(8, 'little'))
+        hasher.update(content)
+    return hasher.hexdigest()
+
+# Bounded in-memory cache
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and/or total size.
+    Shared across Streamlit sessions, so every access goes through a lock.
+    """
+
+    def __init__(self, max_bytes=None, max_entries=None, sizeof=None):
+        """
+        Args:
+            max_bytes (int): Total size budget, None for no size limit
+            max_entries (int): Maximum number of entries, None for no count limit
+            sizeof (callable): Returns the size of a value in bytes, used when put() gets no size
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sizeof = sizeof or (lambda value: 0)
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Looks up a key and marks it as most recently used
+        Args:
+            key (hashable): Cache key
+            default: Value returned on a miss
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=None):
+        """
+        Stores a value, evicting least recently used entries to stay in budget
+        Args:
+            key (hashable): Cache key
+            value: Value to store
+            size (int): Size of value in bytes, computed with sizeof if None
+        Returns:
+            bool: False if the value alone exceeds the size budget and was not stored
+        """
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            # Replace any previous value for this key
+            self.pop(key)
+            # Values larger than the whole budget are never stored
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            # Evict from the least recently used end
+            while self._over_budget():
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def pop(self, key, default=None):
+        """
+        Removes a key without counting a hit or miss
+        Args:
+            key (hashable): Cache key
+            default: Value returned if key is absent
+        Returns:
+            Removed value or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value, size = self._entries.pop(key)
+            self.total_bytes -= size
+            return value
+
+    def keys(self):
+        """
+        Lists the keys, least recently used first, without counting hits
+        Returns:
+            list: Snapshot of the keys
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        """
+        Removes all entries, counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """
+        Returns cache counters
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries, bytes and max_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _over_budget(self):
+        """
+        Checks whether the cache exceeds either limit
+        """
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
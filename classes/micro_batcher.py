@@ -0,0 +1,101 @@
+"""
+MicroBatcher Module
+"""
+# Import required libraries
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from classes.reporting import get_reporter
+
+# Dynamic request batching
+class MicroBatcher:
+    """
+    Collects single-sample requests from many threads into one inference call.
+    A batch is sent when it holds max_batch_size samples or when the oldest
+    request has waited max_wait_ms, so a lone request pays at most max_wait_ms
+    extra while concurrent requests share one model invocation.
+    """
+
+    def __init__(self, inference_fn, max_batch_size=32, max_wait_ms=5.0):
+        """
+        Args:
+            inference_fn (callable): Maps a (N, 1, 32, 32, 1) float32 array to (N, num_classes) probabilities
+            max_batch_size (int): Samples per inference call, 1 disables batching
+            max_wait_ms (float): Longest time a request waits for others to join its batch
+        """
+        self.inference_fn = inference_fn
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        self._requests = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.samples = 0
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, sample):
+        """
+        Queues one preprocessed sample
+        Args:
+            sample (np.array): (1, 1, 32, 32, 1) float32 input
+        Returns:
+            Future: Resolves to the (num_classes,) probabilities of the sample
+        """
+        future = Future()
+        self._requests.put((sample, future))
+        return future
+
+    def predict(self, sample, timeout=None):
+        """
+        Predicts one sample, blocking until its batch has run
+        Args:
+            sample (np.array): (1, 1, 32, 32, 1) float32 input
+            timeout (float): Seconds to wait, None waits indefinitely
+        Returns:
+            np.array: (num_classes,) probabilities
+        """
+        return self.submit(sample).result(timeout)
+
+    def stats(self):
+        """
+        Returns batching counters
+        Returns:
+            dict: batches, samples and mean_batch_size
+        """
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'samples': self.samples,
+                'mean_batch_size': self.samples / self.batches if self.batches else 0.0,
+            }
+
+    def _run(self):
+        """
+        Batching loop: waits for a first request, then gathers more until the batch is full or the wait is over
+        """
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Take what is already queued even when the wait is over
+                    batch.append(self._requests.get(timeout=remaining) if remaining > 0
+                                 else self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            samples, futures = zip(*batch)
+            try:
+                probabilities = np.asarray(self.inference_fn(np.concatenate(samples)))
+            except Exception as e:
+                get_reporter().error(f"Batch inference error: {str(e)}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            with self._stats_lock:
+                self.batches += 1
+                self.samples += len(batch)
+            for future, row in zip(futures, probabilities):
+                future.set_result(row)
@@ -0,0 +1,149 @@
+"""
+ModelCache Module
+"""
+# Import required libraries
+import io
+import os
+import zipfile
+import tempfile
+import threading
+import numpy as np
+from classes.config import get_setting
+from classes.reporting import get_reporter
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.tflite_model import TFLiteModel
+from classes.numpy_model import NumpyModel
+from classes.lru_cache import LRUCache, content_digest
+
+# Loaded model caching
+class ModelCache:
+    """
+    Cache of loaded Keras (or TFLite / NumPy) models keyed by a content hash of the uploaded bytes,
+    shared across Streamlit reruns and sessions so a model is deserialised once
+    """
+    # Process-wide instance shared by all sessions
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=4, max_mb=512):
+        """
+        Args:
+            max_entries (int): Maximum number of cached models
+            max_mb (int): Memory budget for model weights in MB
+        """
+        self.cache = LRUCache(max_bytes=int(max_mb * 1024 * 1024), max_entries=max_entries,
+                              sizeof=ModelCache.model_size)
+        # Serialise loads so concurrent sessions don't load the same model twice
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide cache, sized from the MODEL_CACHE_ENTRIES and MODEL_CACHE_MB secrets
+        Returns:
+            ModelCache: Shared cache instance
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_entries=int(get_setting("MODEL_CACHE_ENTRIES", 4)),
+                                  max_mb=int(get_setting("MODEL_CACHE_MB", 512)))
+            return cls._shared
+
+    @staticmethod
+    def model_size(model):
+        """
+        Estimates the memory held by a model's weights
+        Args:
+            model (tf.keras.Model): Loaded model
+        Returns:
+            int: Size in bytes
+        """
+        if isinstance(model, (TFLiteModel, NumpyModel)):
+            return model.size_bytes
+        return sum(int(np.prod(weight.shape)) * np.dtype(weight.dtype).itemsize for weight in model.weights)
+
+    def load(self, uploaded_model):
+        """
+        Returns the cached model for these bytes, loading and warming it up on a miss
+        Args:
+            uploaded_model (UploadedFile or bytes): Uploaded .keras, .tflite or .npz file
+        Returns:
+            tf.keras.Model: Loaded model or None if loading failed
+        """
+        model_bytes = uploaded_model if isinstance(uploaded_model, (bytes, bytearray)) else uploaded_model.getvalue()
+        key = content_digest(model_bytes)
+        model = self.cache.get(key)
+        if model is not None:
+            return model
+        with self._load_lock:
+            # Another session may have loaded it while we waited
+            if key in self.cache:
+                return self.cache.get(key)
+            model = self._load_from_bytes(model_bytes)
+            if model is None:
+                return None
+            ModelCache.warm_up(model)
+            self.cache.put(key, model)
+            return model
+
+    def stats(self):
+        """
+        Returns hit/miss counters and memory use
+        Returns:
+            dict: LRUCache statistics
+        """
+        return self.cache.stats()
+
+    @staticmethod
+    def warm_up(model):
+        """
+        Runs one inference so graph tracing happens before the first real prediction
+        Args:
+            model (tf.keras.Model): Loaded model
+        """
+        sample = np.zeros((1, 1, 32, 32, 1), dtype='float32')
+        model.predict(sample, verbose=0)
+        # Trace the low-latency single-sample path as well
+        if not isinstance(model, (TFLiteModel, NumpyModel)):
+            Predictor.get_predict_fn(model)(sample)
+
+    @staticmethod
+    def _load_from_bytes(model_bytes):
+        """
+        Loads a model from raw .keras, .tflite or .npz bytes
+        Args:
+            model_bytes (bytes): .keras, .tflite or .npz file contents
+        Returns:
+            tf.keras.Model, TFLiteModel or NumpyModel: Loaded model or None if loading failed
+        """
+        # TFLite flatbuffers carry the TFL3 identifier at offset 4
+        if model_bytes[4:8] == b'TFL3':
+            try:
+                return TFLiteModel(model_content=bytes(model_bytes))
+            except Exception as e:
+                get_reporter().error(f"Model loading error: {str(e)}")
+                return None
+        # .keras files are zip archives too, NumPy exports are told apart by their program entry
+        if model_bytes[:2] == b'PK':
+            with zipfile.ZipFile(io.BytesIO(model_bytes)) as archive:
+                is_numpy = 'program.npy' in archive.namelist()
+            if is_numpy:
+                try:
+                    return NumpyModel(io.BytesIO(model_bytes))
+                except Exception as e:
+                    get_reporter().error(f"Model loading error: {str(e)}")
+                    return None
+        # Save uploaded model to temporary file
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.keras') as tmp:
+            tmp.write(model_bytes)
+            tmp_path = tmp.name
+        try:
+            # Load using ModelTrainer's load_model method
+            return ModelTrainer.load_model(tmp_path)
+        finally:
+            # Clean up temp file
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -1,236 +1,841 @@
-
-"""
-ModelTrainner Module
-"""
-# Import required libraries
-import os
-import streamlit as st
-import tensorflow as tf
-import tempfile
-
-# Model training operations
-class ModelTrainer:
-    """
-    Handles model building and training operations with optional attention
-    """
-    
-    @staticmethod
-    def build_model(input_shape=(1, 32, 32, 1), num_classes=28, use_attention=False):
-        """
-        Constructs the LSTM-CNN hybrid model architecture with optional attention       
-        Args:
-            input_shape (tuple): Input tensor shape
-            num_classes (int): Number of output classes
-            use_attention (bool): Whether to add attention mechanism          
-        Returns:
-            tf.keras.Model: Compiled TensorFlow model
-        """
-        # Try building model
-        try:   
-            # Check GPU availability via secrets
-            if st.secrets.get("ENABLE_GPU", "False").lower() == "true":
-                gpus = tf.config.list_physical_devices('GPU')
-                if gpus:
-                    # Set GPU memory limit (4GB)
-                    memory_limit = int(st.secrets.get("GPU_MEMORY_LIMIT", 4096))
-                    tf.config.set_logical_device_configuration(
-                        gpus[0],
-                        [tf.config.LogicalDeviceConfiguration(memory_limit=memory_limit)]
-                    )
-            # Define the squeeze operation as a named function
-            def squeeze_operation(x):
-                return tf.squeeze(x, axis=1)
-            # Define input layer
-            inputs = tf.keras.layers.Input(shape=input_shape)
-            # Use the named function in lambda to remove the extra sequence dimension (of size 1) so that the input becomes (32,32,1
-            x = tf.keras.layers.Lambda(squeeze_operation, name="squeeze_layer")(inputs)
-            # CNN Feature Maps Blocks
-            ## First CNN block
-            x = tf.keras.layers.Conv2D(32, (3,3), activation='relu', padding='same')(x)
-            x = tf.keras.layers.BatchNormalization()(x)
-            # Poolint to (16,16,32)
-            x = tf.keras.layers.MaxPooling2D((2,2))(x)
-            # Second CNN block
-            x = tf.keras.layers.Conv2D(64, (3,3), activation='relu', padding='same')(x)
-            x = tf.keras.layers.BatchNormalization()(x)
-            # Pooling to (8,8,64)
-            x = tf.keras.layers.MaxPooling2D((2,2))(x)
-            
-            # Third CNN block
-            x = tf.keras.layers.Conv2D(128, (3,3), activation='relu', padding='same')(x)
-            x = tf.keras.layers.BatchNormalization()(x)
-            # Now (8,8,128)
-            x = tf.keras.layers.Dropout(0.3)(x)
-            
-            # Prepare for LSTM  Sequence Formation (batch, height, width, channels)
-            ## Consider a width dimension as time steps.
-            shape = tf.keras.backend.int_shape(x) 
-            x = tf.keras.layers.Reshape((shape[2], shape[1]*shape[3]))(x)
-            # LSTM Layers to capture sequential dependencies
-            x = tf.keras.layers.LSTM(128, return_sequences = use_attention)(x)
-            # Add attention mechanism if selected
-            if use_attention:
-                # Attention mechanism
-                attention = tf.keras.layers.Attention()([x, x])
-                x = tf.keras.layers.Concatenate()([x, attention])
-                x = tf.keras.layers.GlobalAveragePooling1D()(x)
-            else:
-                x = tf.keras.layers.Dropout(0.3)(x)
-            
-            # Fully Connected Layer outputs the predicted probability distribution over the 28 classes.
-            outputs = tf.keras.layers.Dense(num_classes, activation='softmax')(x)
-        
-            # Create and compile model
-            model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
-            model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
-            return model
-        # Handle any errors
-        except Exception as e:
-            # Show error message
-            st.error(f"Model building error: {str(e)}")
-            # Return empty value
-            return None
-        
-    @staticmethod
-    def load_model(model_path):
-        """
-        Safely loads a saved model with custom Lambda layer handling
-        Args:
-            model_path (str): Path to the saved model
-        Returns:
-            tf.keras.Model: Loaded model or None if failed
-        """
-        try:
-            # Define the squeeze function exactly as in the original model
-            def squeeze_operation(x):
-                return tf.squeeze(x, axis=1)
-            
-            # Register custom objects
-            custom_objects = {
-                'squeeze_operation': squeeze_operation,
-                'squeeze_layer': tf.keras.layers.Lambda(squeeze_operation)
-            }
-            
-            # Load with custom objects and safe_mode=False
-            model = tf.keras.models.load_model(
-                model_path,
-                custom_objects=custom_objects,
-                safe_mode=False
-            )
-            return model
-        except Exception as e:
-            st.error(f"Model loading error: {str(e)}")
-            return None
-
-    @staticmethod
-    def train_model(model, X_train, y_train, epochs=20, batch_size=128):
-        """
-        Trains the model with progress tracking       
-        Args:
-            model (tf.keras.Model): Model to train
-            X_train (np.array): Training features
-            y_train (np.array): Training labels
-            epochs (int): Number of training epochs
-            batch_size (int): Training batch size   
-        Returns:
-            tf.keras.History: Training history object
-        """
-        try:
-            # Configure training callbacks
-            callbacks = [
-                # Stop training if no improvement after 5 epochs
-                tf.keras.callbacks.EarlyStopping(patience=5, restore_best_weights=True),
-                # Reduce learning rate if plateau detected
-                tf.keras.callbacks.ReduceLROnPlateau(factor=0.2, patience=5)
-            ]         
-            # Initialise progress indicators 
-            # Visual progress bar
-            progress_bar = st.progress(0)
-            # Dynamic text display
-            status_text = st.empty()  
-            metrics_container = st.empty()        
-            class TrainingCallback(tf.keras.callbacks.Callback):
-                """
-                    Custom callback to update Streamlit UI during training.
-                    This executes at the end of each epoch to:
-                    1. Update the progress bar
-                    2. Display current metrics
-                    3. Provide real-time feedback
-                """
-                def on_epoch_end(self, epoch, logs=None):
-                    """
-                    Called at the end of each training epoch.
-                    
-                    Args:
-                        epoch (int): Current epoch index (0-based)
-                        logs (dict): Metrics dictionary containing:
-                            - loss: Training loss
-                            - accuracy: Training accuracy
-                            - val_loss: Validation loss 
-                            - val_accuracy: Validation accuracy
-                    """
-                    # Calculate progress percentage (0-1)
-                    progress = (epoch + 1) / epochs
-                    # Update progress bar
-                    progress_bar.progress(progress)
-                    # Update status text with formatted metrics
-                    status_text.text(
-                        f"Epoch {epoch+1}/{epochs} - "
-                        f"Loss: {logs['loss']:.4f}, "
-                        f"Acc: {logs['accuracy']:.4f}, "
-                        f"Val Loss: {logs['val_loss']:.4f}, "
-                        f"Val Acc: {logs['val_accuracy']:.4f}"
-                    )   
-            # Start model training
-            history = model.fit(
-                X_train, y_train,
-                epochs=epochs,
-                batch_size=batch_size,
-                validation_split=0.2,
-                # Combine default and custom callbacks and Suppress default logging
-                callbacks=callbacks + [TrainingCallback()], verbose=0
-            )  
-            # Clean up UI elements after training completes         
-            progress_bar.empty()
-            status_text.empty()
-            # Add validation metrics display
-            # Display final metrics
-            with metrics_container.expander("📊 Final Training Metrics", expanded=True):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Training Accuracy", f"{history.history['accuracy'][-1]:.2%}")
-                    st.metric("Training Loss", f"{history.history['loss'][-1]:.4f}")
-                with col2:
-                    st.metric("Validation Accuracy", f"{history.history['val_accuracy'][-1]:.2%}")
-                    st.metric("Validation Loss", f"{history.history['val_loss'][-1]:.4f}")
-            return history
-        except Exception as e:
-            # Clean up UI elements if error occurs
-            progress_bar.empty()
-            status_text.empty()
-            st.error(f"Training error: {str(e)}")
-            return None
-
-    @staticmethod
-    def save_model(model):
-        """
-        Saves the trained model to a temporary directory in Streamlit Cloud.
-        Args:
-            model (tf.keras.Model): The trained model to be saved.
-            Returns:
-                str: The path where the model is saved, or None if an error occurs.
-        """
-        try:
-            # Creates a temporary directory using a temporary directory in Streamlit Cloud (files will be lost after the session ends)
-            model_dir = tempfile.mkdtemp()  
-            # Define the model name and format and join them with the temparary directory
-            model_path = os.path.join(model_dir, "model.keras")
-            # Save the model to the temporary path
-            model.save(model_path)
-            # Return the path where the model is saved
-            return model_path
-        except Exception as e:
-            # Log the error message
-            st.error(f"Error saving model: {str(e)}")
-            # Return None to indicate failure
-            return None
\ No newline at end of file
+
+"""
+ModelTrainner Module
+"""
+# Import required libraries
+import os
+import json
+import math
+import time
+import numpy as np
+import tempfile
+from classes.config import get_setting
+from classes.reporting import get_reporter
+from classes.sharded_dataset import ShardedDataset
+from classes.tf_loader import get_tf
+# resource is POSIX only, peak RSS is recorded as NaN elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Model training operations
+class ModelTrainer:
+    """
+    Handles model building and training operations with optional attention
+    """
+    # Supported TFLite export modes
+    TFLITE_QUANTIZATIONS = (None, 'dynamic', 'float16', 'int8')
+    
+    @staticmethod
+    def build_model(input_shape=(1, 32, 32, 1), num_classes=28, use_attention=False,
+                    jit_compile='auto', steps_per_execution=1):
+        """
+        Constructs the LSTM-CNN hybrid model architecture with optional attention       
+        Args:
+            input_shape (tuple): Input tensor shape
+            num_classes (int): Number of output classes
+            use_attention (bool): Whether to add attention mechanism          
+            jit_compile (bool or str): Compile the train/predict steps with XLA,
+                'auto' keeps the Keras default (XLA on GPU machines only)
+            steps_per_execution (int): Training steps run per tf.function call
+        Returns:
+            tf.keras.Model: Compiled TensorFlow model
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        # Try building model
+        try:   
+            # Check GPU availability via secrets
+            if get_setting("ENABLE_GPU", "False").lower() == "true":
+                gpus = tf.config.list_physical_devices('GPU')
+                if gpus:
+                    # Set GPU memory limit (4GB)
+                    memory_limit = int(get_setting("GPU_MEMORY_LIMIT", 4096))
+                    tf.config.set_logical_device_configuration(
+                        gpus[0],
+                        [tf.config.LogicalDeviceConfiguration(memory_limit=memory_limit)]
+                    )
+            # Define the squeeze operation as a named function
+            def squeeze_operation(x):
+                return tf.squeeze(x, axis=1)
+            # Define input layer
+            inputs = tf.keras.layers.Input(shape=input_shape)
+            # Use the named function in lambda to remove the extra sequence dimension (of size 1) so that the input becomes (32,32,1
+            x = tf.keras.layers.Lambda(squeeze_operation, name="squeeze_layer")(inputs)
+            # CNN Feature Maps Blocks
+            ## First CNN block
+            x = tf.keras.layers.Conv2D(32, (3,3), activation='relu', padding='same')(x)
+            x = tf.keras.layers.BatchNormalization()(x)
+            # Poolint to (16,16,32)
+            x = tf.keras.layers.MaxPooling2D((2,2))(x)
+            # Second CNN block
+            x = tf.keras.layers.Conv2D(64, (3,3), activation='relu', padding='same')(x)
+            x = tf.keras.layers.BatchNormalization()(x)
+            # Pooling to (8,8,64)
+            x = tf.keras.layers.MaxPooling2D((2,2))(x)
+            
+            # Third CNN block
+            x = tf.keras.layers.Conv2D(128, (3,3), activation='relu', padding='same')(x)
+            x = tf.keras.layers.BatchNormalization()(x)
+            # Now (8,8,128)
+            x = tf.keras.layers.Dropout(0.3)(x)
+            
+            # Prepare for LSTM  Sequence Formation (batch, height, width, channels)
+            ## Consider a width dimension as time steps.
+            shape = tf.keras.backend.int_shape(x) 
+            x = tf.keras.layers.Reshape((shape[2], shape[1]*shape[3]))(x)
+            # LSTM Layers to capture sequential dependencies
+            x = tf.keras.layers.LSTM(128, return_sequences = use_attention)(x)
+            # Add attention mechanism if selected
+            if use_attention:
+                # Attention mechanism
+                attention = tf.keras.layers.Attention()([x, x])
+                x = tf.keras.layers.Concatenate()([x, attention])
+                x = tf.keras.layers.GlobalAveragePooling1D()(x)
+            else:
+                x = tf.keras.layers.Dropout(0.3)(x)
+            
+            # Fully Connected Layer outputs the predicted probability distribution over the 28 classes.
+            outputs = tf.keras.layers.Dense(num_classes, activation='softmax')(x)
+        
+            # Create and compile model
+            model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+            ModelTrainer.compile_model(model, jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+            return model
+        # Handle any errors
+        except Exception as e:
+            # Show error message
+            get_reporter().error(f"Model building error: {str(e)}")
+            # Return empty value
+            return None
+        
+    @staticmethod
+    def compile_model(model, jit_compile='auto', steps_per_execution=1):
+        """
+        Compiles (or recompiles) the model with the training configuration.
+        XLA fuses each step into one kernel program and several steps per call
+        cut per-step Python dispatch, which dominates on CPU for a model this small.
+        Args:
+            model (tf.keras.Model): Model to compile
+            jit_compile (bool or str): Compile the train/predict steps with XLA, or 'auto'
+            steps_per_execution (int): Training steps run per tf.function call
+        Returns:
+            tf.keras.Model: The same model
+        """
+        model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'],
+                      jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+        return model
+
+    @staticmethod
+    def compile_mode(model):
+        """
+        Describes how a model is compiled, for reports
+        Args:
+            model (tf.keras.Model): Compiled model
+        Returns:
+            str: e.g. "XLA, 16 steps/call" or "default"
+        """
+        parts = []
+        if getattr(model, 'jit_compile', False):
+            parts.append("XLA")
+        steps = int(getattr(model, 'steps_per_execution', 1) or 1)
+        if steps > 1:
+            parts.append(f"{steps} steps/call")
+        return ", ".join(parts) or "default"
+
+    @staticmethod
+    def load_model(model_path):
+        """
+        Safely loads a saved model with custom Lambda layer handling
+        Args:
+            model_path (str): Path to the saved model
+        Returns:
+            tf.keras.Model: Loaded model or None if failed
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        try:
+            # Define the squeeze function exactly as in the original model
+            def squeeze_operation(x):
+                return tf.squeeze(x, axis=1)
+            
+            # Register custom objects
+            custom_objects = {
+                'squeeze_operation': squeeze_operation,
+                'squeeze_layer': tf.keras.layers.Lambda(squeeze_operation)
+            }
+            
+            # Load with custom objects and safe_mode=False
+            model = tf.keras.models.load_model(
+                model_path,
+                custom_objects=custom_objects,
+                safe_mode=False
+            )
+            return model
+        except Exception as e:
+            get_reporter().error(f"Model loading error: {str(e)}")
+            return None
+
+    @staticmethod
+    def train_model(model, X_train, y_train, epochs=20, batch_size=128,
+                    use_tf_data=False, shuffle_buffer=10000, validation_split=0.2,
+                    checkpoint_dir=None, checkpoint_freq='epoch', callbacks=None,
+                    profile_dir=None, profile_batches=(2, 6)):
+        """
+        Trains the model with progress tracking       
+        Args:
+            model (tf.keras.Model): Model to train
+            X_train (np.array or ShardedDataset): Training features, float32 in [0,1] or raw uint8 pixels,
+                or a sharded dataset streamed through tf.data (its own validation shards are used)
+            y_train (np.array): Training labels, None with a ShardedDataset
+            epochs (int): Number of training epochs
+            batch_size (int): Training batch size   
+            use_tf_data (bool): Stream batches through a tf.data pipeline instead of NumPy arrays
+            shuffle_buffer (int): Shuffle buffer size (in samples) for the tf.data pipeline
+            validation_split (float): Fraction of samples (taken from the end) used for validation
+            checkpoint_dir (str): Back up weights and optimizer state here while training; a run
+                started again with the same directory resumes from its last checkpoint.
+                The directory is removed when training completes
+            checkpoint_freq (str or int): 'epoch', or a number of batches between checkpoints
+            callbacks (list): Extra Keras callbacks, their epoch logs include the timing entries below
+            profile_dir (str): Write a TensorFlow profiler trace of the profile_batches window
+                of the first epoch here (TensorBoard log directory), None disables profiling
+            profile_batches (tuple): First and last batch traced
+        Returns:
+            tf.keras.History: Training history object (including epochs from before a resume), with per-epoch epoch_time, samples_per_sec,
+                step_time_p50/p90/p99_ms, train_time, val_time, overhead_time, peak_memory_mb
+                and learning_rate entries next to the loss and accuracy curves
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        reporter = get_reporter()
+        progress = None
+        extra_callbacks = list(callbacks or [])
+        try:
+            # Configure training callbacks
+            callbacks = [
+                # Stop training if no improvement after 5 epochs
+                tf.keras.callbacks.EarlyStopping(patience=5, restore_best_weights=True),
+                # Reduce learning rate if plateau detected
+                tf.keras.callbacks.ReduceLROnPlateau(factor=0.2, patience=5)
+            ]
+            # History of the epochs completed before this run resumed
+            previous_history = {}
+            backup = []
+            if checkpoint_dir:
+                # Restores weights, optimizer state and the epoch counter when a checkpoint exists.
+                # Runs after TrainingCallback, so the history on disk is never behind the weights
+                backup = [tf.keras.callbacks.BackupAndRestore(checkpoint_dir, save_freq=checkpoint_freq)]
+                previous_history = ModelTrainer._read_checkpoint_history(checkpoint_dir)
+            if profile_dir:
+                # Trace only a window of steps, tracing every step slows training down
+                callbacks.append(tf.keras.callbacks.TensorBoard(log_dir=profile_dir, histogram_freq=0,
+                                                                write_graph=False,
+                                                                profile_batch=tuple(profile_batches)))
+            # Initialise progress indicator (progress bar and status text in the app)
+            progress = reporter.progress()
+            # Sharded datasets are streamed, their size is only known after a pass
+            streaming = isinstance(X_train, ShardedDataset)
+            # Training samples per epoch, the validation fraction is taken from the end (floored as in Keras)
+            split_at = None if streaming else int(math.floor(len(X_train) * (1.0 - validation_split)))
+            gpus = tf.config.list_physical_devices('GPU')
+            class TrainingCallback(tf.keras.callbacks.Callback):
+                """
+                    Custom callback to report progress during training.
+                    This executes at the end of each epoch to:
+                    1. Update the progress bar
+                    2. Display current metrics
+                    3. Provide real-time feedback
+                    4. Record throughput, timing and memory in the history
+                """
+                # Completed training calls, XLA compiles the step before the first one finishes
+                train_calls = 0
+
+                def on_epoch_begin(self, epoch, logs=None):
+                    self.epoch_start = time.perf_counter()
+                    self.step_times = []
+                    self.val_time = 0.0
+                    if gpus:
+                        tf.config.experimental.reset_memory_stats('GPU:0')
+
+                def on_train_batch_begin(self, batch, logs=None):
+                    self.step_start = time.perf_counter()
+
+                def on_train_batch_end(self, batch, logs=None):
+                    # Input fetch plus forward/backward pass of one call (steps_per_execution steps)
+                    self.step_times.append(time.perf_counter() - self.step_start)
+                    self.train_calls += 1
+
+                def on_test_begin(self, logs=None):
+                    self.val_start = time.perf_counter()
+
+                def on_test_end(self, logs=None):
+                    self.val_time += time.perf_counter() - self.val_start
+
+                def on_epoch_end(self, epoch, logs=None):
+                    """
+                    Called at the end of each training epoch.
+                    
+                    Args:
+                        epoch (int): Current epoch index (0-based)
+                        logs (dict): Metrics dictionary containing:
+                            - loss: Training loss
+                            - accuracy: Training accuracy
+                            - val_loss: Validation loss 
+                            - val_accuracy: Validation accuracy
+                    """
+                    # Update progress (0-1) and status text with formatted metrics
+                    progress.update(
+                        (epoch + 1) / epochs,
+                        f"Epoch {epoch+1}/{epochs} - "
+                        f"Loss: {logs['loss']:.4f}, "
+                        f"Acc: {logs['accuracy']:.4f}, "
+                        f"Val Loss: {logs['val_loss']:.4f}, "
+                        f"Val Acc: {logs['val_accuracy']:.4f}"
+                    )
+                    # Extra history entries, plotted on the results page
+                    epoch_time = time.perf_counter() - self.epoch_start
+                    call_seconds = np.array(self.step_times or [0.0])
+                    # Per-step times, each call runs steps_per_execution steps
+                    step_ms = call_seconds * 1000 / max(int(self.model.steps_per_execution or 1), 1)
+                    logs['epoch_time'] = epoch_time
+                    logs['samples_per_sec'] = (X_train.pass_rows['train'] if streaming else split_at) / epoch_time
+                    logs['step_time_p50_ms'] = float(np.percentile(step_ms, 50))
+                    logs['step_time_p90_ms'] = float(np.percentile(step_ms, 90))
+                    logs['step_time_p99_ms'] = float(np.percentile(step_ms, 99))
+                    # Train steps, validation, and the rest (callbacks, loop overhead)
+                    logs['train_time'] = float(call_seconds.sum())
+                    logs['val_time'] = self.val_time
+                    logs['overhead_time'] = max(epoch_time - logs['train_time'] - self.val_time, 0.0)
+                    # Process peak RSS so far (ru_maxrss is in KB on Linux)
+                    logs['peak_memory_mb'] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                                              if resource is not None else float('nan'))
+                    if gpus:
+                        logs['peak_gpu_memory_mb'] = tf.config.experimental.get_memory_info('GPU:0')['peak'] / 2**20
+                    # Learning rate after ReduceLROnPlateau has run for this epoch
+                    logs['learning_rate'] = float(tf.keras.ops.convert_to_numpy(self.model.optimizer.learning_rate))
+                    if checkpoint_dir:
+                        # Keep the curves next to the checkpoint so a resumed run shows every epoch
+                        for key, value in logs.items():
+                            previous_history.setdefault(key, []).append(float(value))
+                        ModelTrainer._write_checkpoint_history(checkpoint_dir, previous_history)
+            if streaming:
+                # Shards are read and mixed by reader threads, batches are normalised in the pipeline
+                train_data = ModelTrainer.make_shard_dataset(X_train, 'train', batch_size)
+                val_data = ModelTrainer.make_shard_dataset(X_train, 'validation', batch_size)
+                fit_args = dict(x=train_data, validation_data=val_data)
+            elif use_tf_data:
+                # Index-based split, same samples as validation_split (the last fraction)
+                indices = np.arange(len(X_train))
+                train_data = ModelTrainer.make_dataset(X_train, y_train, indices[:split_at],
+                                                       batch_size, shuffle_buffer=shuffle_buffer)
+                val_data = ModelTrainer.make_dataset(X_train, y_train, indices[split_at:], batch_size)
+                fit_args = dict(x=train_data, validation_data=val_data)
+            else:
+                # Raw pixels are normalised up front for in-memory training
+                X_train = ModelTrainer.as_model_input(X_train)
+                fit_args = dict(x=X_train, y=y_train, batch_size=batch_size, validation_split=validation_split)
+            training_callback = TrainingCallback()
+            try:
+                # Start model training
+                history = model.fit(
+                    epochs=epochs,
+                    # Combine default and custom callbacks and Suppress default logging
+                    callbacks=callbacks + [training_callback] + extra_callbacks + backup, verbose=0, **fit_args
+                )
+            except (tf.errors.InvalidArgumentError, tf.errors.UnimplementedError) as e:
+                # Only retry when XLA compilation is the likely cause: a compiled model that failed before its
+                # first training call finished, so no epoch has run and the callbacks start over cleanly
+                if not getattr(model, 'jit_compile', False) or training_callback.train_calls:
+                    raise
+                reporter.warning(f"XLA compilation failed, training without it: {str(e)}")
+                ModelTrainer.compile_model(model, jit_compile=False,
+                                           steps_per_execution=model.steps_per_execution)
+                history = model.fit(
+                    epochs=epochs,
+                    callbacks=callbacks + [TrainingCallback()] + extra_callbacks + backup, verbose=0, **fit_args
+                )
+            # Clean up progress indicator after training completes         
+            progress.clear()
+            if checkpoint_dir:
+                # Curves of the whole run, not just the epochs since the last resume
+                history.history = previous_history
+            # The first epoch includes tracing (and XLA compilation), later epochs show the steady state
+            epoch_times = history.history['epoch_time']
+            steady_epoch_time = np.median(epoch_times[1:] or epoch_times)
+            # Display final metrics
+            reporter.metrics("📊 Final Training Metrics", {
+                "Training Accuracy": f"{history.history['accuracy'][-1]:.2%}",
+                "Training Loss": f"{history.history['loss'][-1]:.4f}",
+                "Validation Accuracy": f"{history.history['val_accuracy'][-1]:.2%}",
+                "Validation Loss": f"{history.history['val_loss'][-1]:.4f}",
+                "Throughput": f"{np.mean(history.history['samples_per_sec']):.0f} samples/s",
+                "Step Time p50": f"{np.median(history.history['step_time_p50_ms']):.1f} ms",
+                "Compile Mode": ModelTrainer.compile_mode(model),
+                "Epoch Time (first / steady)": f"{epoch_times[0]:.2f}s / {steady_epoch_time:.2f}s",
+            })
+            return history
+        except Exception as e:
+            # Clean up progress indicator if error occurs
+            if progress is not None:
+                progress.clear()
+            reporter.error(f"Training error: {str(e)}")
+            return None
+
+    @staticmethod
+    def fine_tune(model, X_train, y_train, epochs=5, learning_rate=1e-4, **train_kwargs):
+        """
+        Continues training an existing (loaded) model on new data instead of starting over
+        Args:
+            model (tf.keras.Model): Trained model, e.g. from load_model
+            X_train (np.array or ShardedDataset): New training features
+            y_train (np.array): New training labels
+            epochs (int): Number of fine-tuning epochs
+            learning_rate (float): Learning rate for fine-tuning, None keeps the saved one
+            **train_kwargs: Passed to train_model (batch_size, use_tf_data, checkpoint_dir, ...)
+        Returns:
+            tf.keras.History: Training history object
+        """
+        try:
+            # Models saved without a training configuration need one first
+            if getattr(model, 'optimizer', None) is None:
+                ModelTrainer.compile_model(model)
+            if learning_rate is not None:
+                model.optimizer.learning_rate.assign(learning_rate)
+        except Exception as e:
+            get_reporter().error(f"Fine-tuning error: {str(e)}")
+            return None
+        return ModelTrainer.train_model(model, X_train, y_train, epochs=epochs, **train_kwargs)
+
+    @staticmethod
+    def checkpoint_path(run_key):
+        """
+        Checkpoint directory of a training run
+        Args:
+            run_key (str): Identifies the run (data and options), the same key resumes the same run
+        Returns:
+            str: Directory under CHECKPOINT_DIR (system temp directory by default)
+        """
+        root = get_setting("CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "ahcr_checkpoints"))
+        return os.path.join(root, run_key)
+
+    @staticmethod
+    def checkpoint_epoch(checkpoint_dir):
+        """
+        Number of epochs saved in a checkpoint
+        Args:
+            checkpoint_dir (str): Checkpoint directory passed to train_model
+        Returns:
+            int: Completed epochs, or None when there is no checkpoint
+        """
+        try:
+            with open(os.path.join(checkpoint_dir, "training_metadata.json")) as f:
+                return int(json.load(f)["epoch"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _read_checkpoint_history(checkpoint_dir):
+        """
+        History of the epochs covered by the checkpoint, empty when there is none
+        """
+        epoch = ModelTrainer.checkpoint_epoch(checkpoint_dir)
+        if not epoch:
+            return {}
+        try:
+            with open(os.path.join(checkpoint_dir, "history.json")) as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop epochs logged after the last weights backup
+        return {key: values[:epoch] for key, values in history.items()}
+
+    @staticmethod
+    def _write_checkpoint_history(checkpoint_dir, history):
+        """
+        Writes the history next to the checkpoint (atomically, a crash keeps the previous file)
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        path = os.path.join(checkpoint_dir, "history.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(history, f)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def as_model_input(X):
+        """
+        Converts raw uint8 pixels to normalised float32 model input
+        Args:
+            X (np.array): uint8 pixels or float32 features
+        Returns:
+            np.array: (N, 1, 32, 32, 1) float32 features
+        """
+        if X.dtype == np.uint8:
+            return X.reshape(-1, 1, 32, 32, 1).astype('float32') / 255.0
+        return X.reshape(-1, 1, 32, 32, 1)
+
+    @staticmethod
+    def make_dataset(X, y, indices, batch_size, shuffle_buffer=None):
+        """
+        Builds a tf.data pipeline over a subset of samples without copying them.
+        Samples stay in their stored dtype (uint8 for raw pixels) in the NumPy
+        array (a memory-mapped one works too); batches of indices gather their
+        rows from it and are normalised and reshaped in a parallel map.
+        Args:
+            X (np.array): Features, (N, 1024) or (N, 1, 32, 32, 1), uint8 or float32
+            y (np.array): Zero based labels
+            indices (np.array): Sample indices in this split
+            batch_size (int): Batch size
+            shuffle_buffer (int): Shuffle buffer size in samples, None disables shuffling
+        Returns:
+            tf.data.Dataset: Batched (features, labels) dataset
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        # Only raw pixels need scaling to [0,1]
+        scale = 1.0 / 255.0 if X.dtype == np.uint8 else 1.0
+
+        def gather(batch_indices):
+            # Copies just this batch's rows, the arrays are never turned into graph constants
+            return X[batch_indices], y[batch_indices]
+
+        def load_batch(batch_indices):
+            # Gather, normalise and reshape one batch
+            features, labels = tf.numpy_function(gather, [batch_indices],
+                                                 [tf.as_dtype(X.dtype), tf.as_dtype(y.dtype)])
+            features = tf.reshape(tf.cast(features, tf.float32) * scale, (-1, 1, 32, 32, 1))
+            labels.set_shape((None,) + y.shape[1:])
+            return features, labels
+
+        dataset = tf.data.Dataset.from_tensor_slices(indices)
+        # Shuffle indices only, so the buffer stays small whatever the sample size
+        if shuffle_buffer:
+            dataset = dataset.shuffle(min(shuffle_buffer, len(indices)), reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+        dataset = dataset.map(load_batch, num_parallel_calls=tf.data.AUTOTUNE)
+        # Overlap input preparation with training steps
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+    @staticmethod
+    def make_shard_dataset(shards, split, batch_size):
+        """
+        Builds a tf.data pipeline over one split of a sharded dataset. Each epoch
+        starts a new pass of the ShardedDataset.batches generator, so no more than
+        its few buffered chunks are in memory whatever the size of the corpus.
+        Args:
+            shards (ShardedDataset): Sharded dataset
+            split (str): 'train' or 'validation'
+            batch_size (int): Batch size
+        Returns:
+            tf.data.Dataset: Batched (features, labels) dataset
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        dataset = tf.data.Dataset.from_generator(
+            lambda: shards.batches(split, batch_size),
+            output_signature=(tf.TensorSpec((None, 1024), tf.uint8), tf.TensorSpec((None,), tf.int64)))
+
+        def normalise(features, labels):
+            # Normalise and reshape one batch
+            features = tf.reshape(tf.cast(features, tf.float32) / 255.0, (-1, 1, 32, 32, 1))
+            return features, labels
+
+        dataset = dataset.map(normalise, num_parallel_calls=tf.data.AUTOTUNE)
+        # Overlap shard reading with training steps
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+    @staticmethod
+    def save_model(model, model_path=None):
+        """
+        Saves the trained model to a temporary directory in Streamlit Cloud.
+        Args:
+            model (tf.keras.Model): The trained model to be saved.
+            model_path (str): Where to save the model, a new temporary directory if None.
+            Returns:
+                str: The path where the model is saved, or None if an error occurs.
+        """
+        try:
+            if model_path is None:
+                # Creates a temporary directory using a temporary directory in Streamlit Cloud (files will be lost after the session ends)
+                model_dir = tempfile.mkdtemp()  
+                # Define the model name and format and join them with the temparary directory
+                model_path = os.path.join(model_dir, "model.keras")
+            # Save the model to the temporary path
+            model.save(model_path)
+            # Return the path where the model is saved
+            return model_path
+        except Exception as e:
+            # Log the error message
+            get_reporter().error(f"Error saving model: {str(e)}")
+            # Return None to indicate failure
+            return None
+
+    @staticmethod
+    def export_tflite(model, output_path=None, quantization=None, calibration_data=None,
+                      num_calibration_samples=200):
+        """
+        Exports a model built by build_model to TFLite
+        Args:
+            model (tf.keras.Model): Trained model
+            output_path (str): Where to write the .tflite file, a temporary path if None
+            quantization (str): None (float32), 'dynamic' (int8 weights), 'float16' or 'int8' (full integer)
+            calibration_data (np.array): Training samples for int8 calibration (uint8 or float32)
+            num_calibration_samples (int): Number of calibration samples drawn from calibration_data
+        Returns:
+            str: Path of the exported model, or None if an error occurs
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        try:
+            if quantization not in ModelTrainer.TFLITE_QUANTIZATIONS:
+                raise ValueError(f"Unknown quantization {quantization}, use one of {ModelTrainer.TFLITE_QUANTIZATIONS}")
+            if quantization == 'int8' and calibration_data is None:
+                raise ValueError("int8 quantization needs calibration data")
+            # Full-integer calibration crashes on the fused LSTM kernel, so export an unrolled copy
+            export_model = ModelTrainer._unrolled_copy(model) if quantization == 'int8' else model
+            # Export a serving graph with a fixed batch of 1 so the LSTM converts to builtin ops
+            archive = tf.keras.export.ExportArchive()
+            archive.track(export_model)
+            archive.add_endpoint(
+                'serve', lambda x: export_model(x, training=False),
+                input_signature=[tf.TensorSpec((1, 1, 32, 32, 1), tf.float32)]
+            )
+            # The SavedModel is only an intermediate, the converter reads it until convert() returns
+            with tempfile.TemporaryDirectory() as saved_model_dir:
+                archive.write_out(saved_model_dir, verbose=False)
+                converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+                # Configure quantization
+                if quantization is not None:
+                    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                if quantization == 'float16':
+                    converter.target_spec.supported_types = [tf.float16]
+                elif quantization == 'int8':
+                    # Calibrate activation ranges on a random sample of the training data
+                    samples = ModelTrainer.as_model_input(calibration_data)
+                    picked = np.random.default_rng(0).permutation(len(samples))[:num_calibration_samples]
+
+                    def representative_dataset():
+                        for index in picked:
+                            yield [samples[index:index + 1]]
+
+                    converter.representative_dataset = representative_dataset
+                    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+                    converter.inference_input_type = tf.int8
+                    converter.inference_output_type = tf.int8
+                tflite_bytes = converter.convert()
+            # Write the flatbuffer
+            if output_path is None:
+                output_path = os.path.join(tempfile.mkdtemp(), f"model_{quantization or 'float32'}.tflite")
+            with open(output_path, 'wb') as f:
+                f.write(tflite_bytes)
+            return output_path
+        except Exception as e:
+            get_reporter().error(f"TFLite export error: {str(e)}")
+            return None
+
+    @staticmethod
+    def _unrolled_copy(model):
+        """
+        Clones a model with its LSTM layers unrolled, sharing no state with the original
+        Args:
+            model (tf.keras.Model): Trained model
+        Returns:
+            tf.keras.Model: Clone with identical weights
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        def clone_layer(layer):
+            if isinstance(layer, tf.keras.layers.LSTM):
+                return tf.keras.layers.LSTM.from_config({**layer.get_config(), 'unroll': True})
+            # Other layers (including the squeeze Lambda) are reused as they are
+            return layer
+        clone = tf.keras.models.clone_model(model, clone_function=clone_layer)
+        clone.set_weights(model.get_weights())
+        return clone
+
+    @staticmethod
+    def export_numpy(model, output_path=None):
+        """
+        Exports a model built by build_model as a NumPy program (.npz) for NumpyModel.
+        BatchNormalization is applied in inference mode: the one before the LSTM is folded
+        exactly into the LSTM input kernel and bias; the others follow a ReLU (and precede
+        zero padding and pooling), so they stay as a per-channel scale and shift after the conv.
+        Args:
+            model (tf.keras.Model): Trained model
+            output_path (str): Where to write the .npz file, a temporary path if None
+        Returns:
+            str: Path of the exported model, or None if an error occurs
+        """
+        # Import here to avoid a circular import at module load
+        from classes.numpy_model import NumpyModel
+        try:
+            layers = [layer for layer in model.layers if type(layer).__name__ not in ('InputLayer', 'Dropout')]
+            program, arrays = [], {}
+            # BatchNormalization waiting to be folded into the next LSTM
+            pending_affine = None
+
+            def add(op, **op_arrays):
+                for name, value in op_arrays.items():
+                    arrays[f"{len(program)}.{name}"] = np.asarray(value, dtype='float32')
+                program.append(op)
+
+            for position, layer in enumerate(layers):
+                kind = type(layer).__name__
+                if kind == 'Lambda' and layer.name == 'squeeze_layer':
+                    add({'op': 'squeeze', 'axis': 1})
+                elif kind == 'Conv2D':
+                    if layer.strides != (1, 1) or layer.padding != 'same' or layer.dilation_rate != (1, 1):
+                        raise ValueError(f"Unsupported convolution {layer.name}")
+                    kernel, bias = layer.get_weights()
+                    add({'op': 'conv2d', 'activation': layer.activation.__name__, 'epilogue': False},
+                        kernel=kernel, bias=bias)
+                elif kind == 'BatchNormalization':
+                    # Inference-mode normalisation as y = x * scale + shift
+                    variance = np.asarray(layer.moving_variance)
+                    scale = (np.asarray(layer.gamma) if layer.scale else 1.0) / np.sqrt(variance + layer.epsilon)
+                    shift = (np.asarray(layer.beta) if layer.center else 0.0) - np.asarray(layer.moving_mean) * scale
+                    following = [type(later).__name__ for later in layers[position + 1:position + 3]]
+                    if following == ['Reshape', 'LSTM']:
+                        pending_affine = (scale, shift)
+                    elif program and program[-1]['op'] == 'conv2d' and not program[-1]['epilogue']:
+                        index = len(program) - 1
+                        program[index]['epilogue'] = True
+                        arrays[f"{index}.scale"] = scale.astype('float32')
+                        arrays[f"{index}.shift"] = shift.astype('float32')
+                    else:
+                        raise ValueError(f"Unsupported BatchNormalization position: {layer.name}")
+                elif kind == 'MaxPooling2D':
+                    if tuple(layer.strides) != tuple(layer.pool_size) or layer.padding != 'valid':
+                        raise ValueError(f"Unsupported pooling {layer.name}")
+                    add({'op': 'maxpool', 'pool_size': list(layer.pool_size)})
+                elif kind == 'Reshape':
+                    add({'op': 'reshape', 'shape': list(layer.target_shape)})
+                elif kind == 'LSTM':
+                    if layer.activation.__name__ != 'tanh' or layer.recurrent_activation.__name__ != 'sigmoid':
+                        raise ValueError(f"Unsupported LSTM activations in {layer.name}")
+                    kernel, recurrent_kernel, bias = layer.get_weights()
+                    if pending_affine is not None:
+                        # Channels are the fastest axis of the reshaped features, so the
+                        # per-channel affine repeats along the feature axis
+                        scale, shift = (np.tile(values, kernel.shape[0] // len(values)) for values in pending_affine)
+                        bias = bias + shift @ kernel
+                        kernel = kernel * scale[:, None]
+                        pending_affine = None
+                    add({'op': 'lstm', 'return_sequences': bool(layer.return_sequences)},
+                        kernel=kernel, recurrent_kernel=recurrent_kernel, bias=bias)
+                elif kind == 'Attention':
+                    if layer.score_mode != 'dot':
+                        raise ValueError(f"Unsupported attention {layer.name}")
+                    if layer.use_scale:
+                        add({'op': 'attention', 'use_scale': True}, scale=np.asarray(layer.scale))
+                    else:
+                        add({'op': 'attention', 'use_scale': False})
+                elif kind == 'Concatenate':
+                    add({'op': 'concatenate'})
+                elif kind == 'GlobalAveragePooling1D':
+                    add({'op': 'gap1d'})
+                elif kind == 'Dense':
+                    kernel, bias = layer.get_weights()
+                    add({'op': 'dense', 'activation': layer.activation.__name__}, kernel=kernel, bias=bias)
+                else:
+                    raise ValueError(f"Unsupported layer {layer.name} ({kind})")
+            if output_path is None:
+                output_path = os.path.join(tempfile.mkdtemp(), "model.npz")
+            NumpyModel(program=program, arrays=arrays).save(output_path)
+            return output_path
+        except Exception as e:
+            get_reporter().error(f"NumPy export error: {str(e)}")
+            return None
+
+    @staticmethod
+    def _p50_latency_ms(predict, X, runs):
+        """
+        Times single-sample calls, as served on the predict page
+        Args:
+            predict (callable): Maps a (1, 1, 32, 32, 1) float32 array to probabilities
+            X (np.array): Model input, one sample per call
+            runs (int): Calls timed, at most one per sample
+        Returns:
+            float: Median latency in ms, None without samples
+        """
+        timings = []
+        for i in range(min(runs, len(X))):
+            start = time.perf_counter()
+            predict(X[i:i + 1])
+            timings.append(time.perf_counter() - start)
+        return float(np.percentile(timings, 50) * 1000) if timings else None
+
+    @staticmethod
+    def compare_tflite(model, tflite_path, X_test, y_test, latency_runs=100):
+        """
+        Reports accuracy, per-sample latency and size of a TFLite export against the Keras model
+        Args:
+            model (tf.keras.Model): Keras model the export was made from
+            tflite_path (str): Exported .tflite file
+            X_test (np.array): Held-out features (uint8 or float32)
+            y_test (np.array): Held-out zero based labels
+            latency_runs (int): Single-sample predictions timed per backend
+        Returns:
+            dict: Accuracy, agreement, p50 latency (ms) and size (MB) for both backends
+        """
+        # Import here to avoid a circular import at module load
+        from classes.predictor import Predictor
+        from classes.tflite_model import TFLiteModel
+        X_test = ModelTrainer.as_model_input(X_test)
+        tflite_model = TFLiteModel(tflite_path)
+        keras_probs = Predictor.predict_array(model, X_test)
+        tflite_probs = tflite_model.predict(X_test)
+
+        keras_fn = Predictor.get_predict_fn(model)
+        keras_fn(X_test[:1])
+        # Keras model size measured as a saved .keras file
+        with tempfile.TemporaryDirectory() as directory:
+            keras_path = os.path.join(directory, "model.keras")
+            model.save(keras_path)
+            keras_size = os.path.getsize(keras_path)
+        return {
+            'keras_accuracy': float(np.mean(keras_probs.argmax(axis=1) == y_test)),
+            'tflite_accuracy': float(np.mean(tflite_probs.argmax(axis=1) == y_test)),
+            'agreement': float(np.mean(keras_probs.argmax(axis=1) == tflite_probs.argmax(axis=1))),
+            'keras_latency_ms': ModelTrainer._p50_latency_ms(lambda x: keras_fn(x).numpy(), X_test, latency_runs),
+            'tflite_latency_ms': ModelTrainer._p50_latency_ms(tflite_model.predict, X_test, latency_runs),
+            'keras_size_mb': keras_size / 2**20,
+            'tflite_size_mb': tflite_model.size_bytes / 2**20,
+        }
+
+    @staticmethod
+    def compare_numpy(model, numpy_path, X_test, y_test, latency_runs=100):
+        """
+        Reports output error, agreement, per-sample latency and load time of a NumPy export against the Keras model
+        Args:
+            model (tf.keras.Model): Keras model the export was made from
+            numpy_path (str): Exported .npz file
+            X_test (np.array): Held-out features (uint8 or float32)
+            y_test (np.array): Held-out zero based labels
+            latency_runs (int): Single-sample predictions timed per backend
+        Returns:
+            dict: Max absolute difference, accuracy, agreement, p50 latency (ms) and load time (ms)
+        """
+        # Import here to avoid a circular import at module load
+        from classes.predictor import Predictor
+        from classes.numpy_model import NumpyModel
+        X_test = ModelTrainer.as_model_input(X_test)
+        start = time.perf_counter()
+        numpy_model = NumpyModel(numpy_path)
+        load_ms = (time.perf_counter() - start) * 1000
+        keras_probs = Predictor.predict_array(model, X_test)
+        numpy_probs = numpy_model.predict(X_test)
+
+        keras_fn = Predictor.get_predict_fn(model)
+        keras_fn(X_test[:1])
+        return {
+            'max_abs_diff': float(np.max(np.abs(keras_probs - numpy_probs))) if len(X_test) else 0.0,
+            'keras_accuracy': float(np.mean(keras_probs.argmax(axis=1) == y_test)),
+            'numpy_accuracy': float(np.mean(numpy_probs.argmax(axis=1) == y_test)),
+            'agreement': float(np.mean(keras_probs.argmax(axis=1) == numpy_probs.argmax(axis=1))),
+            'keras_latency_ms': ModelTrainer._p50_latency_ms(lambda x: keras_fn(x).numpy(), X_test, latency_runs),
+            'numpy_latency_ms': ModelTrainer._p50_latency_ms(numpy_model.predict, X_test, latency_runs),
+            'numpy_load_ms': load_ms,
+        }
+
@@ -0,0 +1,179 @@
+"""
+NumpyModel Module
+"""
+# Import required libraries
+import json
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# TensorFlow-free inference backend
+class NumpyModel:
+    """
+    Runs a model exported by ModelTrainer.export_numpy with NumPy only, behind the
+    same predict()/evaluate() interface as a Keras model. Loading an .npz takes
+    milliseconds and needs neither TensorFlow nor unsafe Lambda deserialisation,
+    so prediction workers start fast and stay small.
+
+    The .npz holds a 'program' (JSON list of ops) and the arrays of each op, named
+    '<op index>.<array>'. Ops: squeeze, conv2d (with an optional per-channel affine
+    epilogue from a following BatchNormalization), maxpool, reshape, lstm,
+    attention, concatenate, gap1d and dense.
+    """
+    # Format version written by ModelTrainer.export_numpy
+    FORMAT_VERSION = 1
+
+    def __init__(self, model_path=None, program=None, arrays=None):
+        """
+        Args:
+            model_path (str or file-like): Exported .npz file
+            program (list): Op list, used with arrays instead of model_path
+            arrays (dict): Op arrays keyed '<op index>.<array>'
+        """
+        if model_path is not None:
+            with np.load(model_path, allow_pickle=False) as data:
+                header = json.loads(str(data['program']))
+                arrays = {key: data[key] for key in data.files if key != 'program'}
+            if header.get('version') != NumpyModel.FORMAT_VERSION:
+                raise ValueError(f"Unsupported NumPy model format: {header.get('version')}")
+            program = header['ops']
+        self.program = program
+        # predict() only reads these, so one instance serves concurrent threads
+        self.arrays = {key: np.asarray(value, dtype='float32') for key, value in arrays.items()}
+
+    def save(self, model_path):
+        """
+        Writes the model as .npz
+        Args:
+            model_path (str or file-like): Output file
+        """
+        header = json.dumps({'version': NumpyModel.FORMAT_VERSION, 'ops': self.program})
+        np.savez(model_path, program=np.array(header), **self.arrays)
+
+    @property
+    def size_bytes(self):
+        """
+        Size of the weights in bytes
+        """
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def get_weights(self):
+        """
+        Weight arrays in a stable order, as Keras get_weights() (used for fingerprints)
+        """
+        return [self.arrays[key] for key in sorted(self.arrays)]
+
+    def predict(self, x, verbose=0):
+        """
+        Predicts class probabilities
+        Args:
+            x (np.array): (N, 1, 32, 32, 1) float32 input
+            verbose (int): Ignored, kept for Keras compatibility
+        Returns:
+            np.array: (N, num_classes) float32 probabilities
+        """
+        x = np.asarray(x, dtype='float32')
+        saved = None
+        for index, op in enumerate(self.program):
+            kind = op['op']
+            weight = lambda name: self.arrays[f"{index}.{name}"]
+            if kind == 'squeeze':
+                x = x.reshape(x.shape[:op['axis']] + x.shape[op['axis'] + 1:])
+            elif kind == 'conv2d':
+                x = NumpyModel._activation(NumpyModel._conv2d(x, weight('kernel'), weight('bias')), op['activation'])
+                if op['epilogue']:
+                    # BatchNormalization after the activation, in inference mode
+                    x = x * weight('scale') + weight('shift')
+            elif kind == 'maxpool':
+                pool_h, pool_w = op['pool_size']
+                n, h, w, c = x.shape
+                x = x[:, :h - h % pool_h, :w - w % pool_w]
+                x = x.reshape(n, h // pool_h, pool_h, w // pool_w, pool_w, c).max(axis=(2, 4))
+            elif kind == 'reshape':
+                x = x.reshape((len(x),) + tuple(op['shape']))
+            elif kind == 'lstm':
+                x = NumpyModel._lstm(x, weight('kernel'), weight('recurrent_kernel'), weight('bias'),
+                                     op['return_sequences'])
+            elif kind == 'attention':
+                # Self-attention: query, key and value are the same sequence
+                saved = x
+                scores = x @ x.transpose(0, 2, 1)
+                if op['use_scale']:
+                    scores = scores * weight('scale')
+                x = NumpyModel._softmax(scores) @ x
+            elif kind == 'concatenate':
+                x = np.concatenate([saved, x], axis=-1)
+            elif kind == 'gap1d':
+                x = x.mean(axis=1)
+            elif kind == 'dense':
+                x = NumpyModel._activation(x @ weight('kernel') + weight('bias'), op['activation'])
+            else:
+                raise ValueError(f"Unknown op: {kind}")
+        return x.astype('float32', copy=False)
+
+    def evaluate(self, X, y, verbose=0):
+        """
+        Computes sparse categorical crossentropy and accuracy
+        Args:
+            X (np.array): (N, 1, 32, 32, 1) float32 input
+            y (np.array): Zero based labels
+            verbose (int): Ignored, kept for Keras compatibility
+        Returns:
+            list: [loss, accuracy]
+        """
+        probabilities = self.predict(X)
+        y = np.asarray(y).astype(int)
+        picked = probabilities[np.arange(len(y)), y]
+        loss = float(-np.mean(np.log(np.clip(picked, 1e-7, 1.0))))
+        accuracy = float(np.mean(probabilities.argmax(axis=1) == y))
+        return [loss, accuracy]
+
+    @staticmethod
+    def _conv2d(x, kernel, bias):
+        """
+        Stride-1 'same' convolution as one matrix product over 3x3 windows
+        """
+        kernel_h, kernel_w = kernel.shape[:2]
+        top, left = (kernel_h - 1) // 2, (kernel_w - 1) // 2
+        padded = np.pad(x, ((0, 0), (top, kernel_h - 1 - top), (left, kernel_w - 1 - left), (0, 0)))
+        # (N, H, W, C, kh, kw) view, no copy until the product
+        windows = sliding_window_view(padded, (kernel_h, kernel_w), axis=(1, 2))
+        return np.tensordot(windows, kernel, axes=([4, 5, 3], [0, 1, 2])) + bias
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent_kernel, bias, return_sequences):
+        """
+        Keras LSTM (gate order i, f, c, o; tanh and sigmoid) from zero state
+        """
+        units = recurrent_kernel.shape[0]
+        # Input projections of all time steps in one product
+        projected = x @ kernel + bias
+        h = np.zeros((len(x), units), dtype='float32')
+        c = np.zeros((len(x), units), dtype='float32')
+        outputs = []
+        for step in range(x.shape[1]):
+            z = projected[:, step] + h @ recurrent_kernel
+            i = NumpyModel._sigmoid(z[:, :units])
+            f = NumpyModel._sigmoid(z[:, units:2 * units])
+            c = f * c + i * np.tanh(z[:, 2 * units:3 * units])
+            h = NumpyModel._sigmoid(z[:, 3 * units:]) * np.tanh(c)
+            outputs.append(h)
+        return np.stack(outputs, axis=1) if return_sequences else h
+
+    @staticmethod
+    def _sigmoid(x):
+        return 1.0 / (1.0 + np.exp(-x))
+
+    @staticmethod
+    def _softmax(x):
+        exp = np.exp(x - x.max(axis=-1, keepdims=True))
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    @staticmethod
+    def _activation(x, name):
+        if name == 'relu':
+            return np.maximum(x, 0.0)
+        if name == 'softmax':
+            return NumpyModel._softmax(x)
+        if name == 'linear':
+            return x
+        raise ValueError(f"Unsupported activation: {name}")
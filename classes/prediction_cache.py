@@ -0,0 +1,140 @@
+"""
+PredictionCache Module
+"""
+# Import required libraries
+import threading
+import weakref
+import numpy as np
+from classes.config import get_setting
+from classes.evaluator import Evaluator
+from classes.lru_cache import LRUCache, content_digest
+
+# Inference result caching
+class PredictionCache:
+    """
+    Cache of class probabilities keyed by (model fingerprint, hash of the preprocessed
+    32x32 input quantized to uint8). Re-submitted drawings and images, or the same
+    sample sent from the predict page and a batch job, skip the forward pass. Entries
+    of a model stop matching as soon as another model is used; use_model() drops them
+    once the last session predicting with that model has moved to another one.
+    """
+    # Process-wide instance shared by all sessions
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=4096):
+        """
+        Args:
+            max_entries (int): Maximum number of cached predictions
+        """
+        self.cache = LRUCache(max_entries=max_entries)
+        # Weight hashes per loaded model object, hashed once per model
+        self._fingerprints = weakref.WeakKeyDictionary()
+        self._fingerprint_lock = threading.Lock()
+        # Fingerprint of the model each session currently predicts with
+        self._session_models = {}
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process-wide cache, sized from the PREDICTION_CACHE_ENTRIES secret
+        Returns:
+            PredictionCache: Shared cache instance
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_entries=int(get_setting("PREDICTION_CACHE_ENTRIES", 4096)))
+            return cls._shared
+
+    def model_fingerprint(self, model):
+        """
+        Returns the weight hash of a model, computed on first use
+        Args:
+            model: Loaded Keras or TFLite model
+        Returns:
+            str: Hex digest
+        """
+        with self._fingerprint_lock:
+            fingerprint = self._fingerprints.get(model)
+            if fingerprint is None:
+                fingerprint = Evaluator.model_fingerprint(model)
+                self._fingerprints[model] = fingerprint
+            return fingerprint
+
+    @staticmethod
+    def input_keys(processed_array):
+        """
+        Hashes each preprocessed sample
+        Args:
+            processed_array (np.array): (N, 1, 32, 32, 1) float32 input in [0,1]
+        Returns:
+            list: One hex digest per sample
+        """
+        # Preprocessed pixels are multiples of 1/255, so uint8 quantization is lossless
+        quantized = np.rint(np.asarray(processed_array).reshape(len(processed_array), -1) * 255.0).astype(np.uint8)
+        return [content_digest(row.tobytes()) for row in quantized]
+
+    def predict(self, model, processed_array, inference_fn):
+        """
+        Returns probabilities for a preprocessed array, running inference only on uncached samples
+        Args:
+            model: Loaded model, used for the fingerprint
+            processed_array (np.array): (N, 1, 32, 32, 1) float32 input
+            inference_fn (callable): Maps an input array to (N, num_classes) probabilities
+        Returns:
+            np.array: (N, num_classes) float32 probabilities
+        """
+        if len(processed_array) == 0:
+            return np.asarray(inference_fn(processed_array), dtype='float32')
+        fingerprint = self.model_fingerprint(model)
+        keys = [(fingerprint, key) for key in PredictionCache.input_keys(processed_array)]
+        cached = [self.cache.get(key) for key in keys]
+        misses = [i for i, probabilities in enumerate(cached) if probabilities is None]
+        if misses:
+            computed = np.asarray(inference_fn(np.asarray(processed_array)[misses]), dtype='float32')
+            for i, probabilities in zip(misses, computed):
+                # Own copy per entry, frozen because cached rows are shared
+                probabilities = probabilities.copy()
+                probabilities.flags.writeable = False
+                self.cache.put(keys[i], probabilities)
+                cached[i] = probabilities
+        return np.stack(cached)
+
+    def invalidate(self, model_fingerprint):
+        """
+        Drops the entries of one model
+        Args:
+            model_fingerprint (str): Fingerprint returned by model_fingerprint()
+        Returns:
+            int: Number of removed entries
+        """
+        stale = [key for key in self.cache.keys() if key[0] == model_fingerprint]
+        for key in stale:
+            self.cache.pop(key)
+        return len(stale)
+
+    def use_model(self, session_id, model_fingerprint):
+        """
+        Records the model a session predicts with. When the session switches models, the
+        previous model's entries are dropped unless another session still uses it.
+        Args:
+            session_id (str): Stable id of the session
+            model_fingerprint (str): Fingerprint returned by model_fingerprint()
+        Returns:
+            int: Number of removed entries
+        """
+        with self._session_lock:
+            previous = self._session_models.get(session_id)
+            self._session_models[session_id] = model_fingerprint
+            if previous is None or previous == model_fingerprint or previous in self._session_models.values():
+                return 0
+            return self.invalidate(previous)
+
+    def stats(self):
+        """
+        Returns hit/miss counters
+        Returns:
+            dict: LRUCache statistics
+        """
+        return self.cache.stats()
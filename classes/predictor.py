@@ -1,91 +1,338 @@
-
-"""
-Predictorr Module
-"""
-# Import required libraries
-import numpy as np
-import streamlit as st
-import tensorflow as tf
-from classes.data_handler import DataHandler
-from PIL import Image
-
-# Prediction operations
-class Predictor:
-    """
-    Handles Prediction operations
-    """
-    # Class attribute with Arabic character labels
-    characters =[ 'أ', 'ب', 'ت', 'ث', 'ج', 'ح', 'خ', 'د', 'ذ', 'ر', 'ز',
-        'س', 'ش', 'ص', 'ض', 'ط', 'ظ', 'ع', 'غ', 'ف', 'ق', 'ك',
-        'ل', 'م', 'ن', 'ه', 'و', 'ي'
-    ]
-
-    @staticmethod
-    def load_model(model_path):
-        """
-        Helper method to load model with custom objects
-        """
-        try:
-            # Enable unsafe deserialization only for this load
-            tf.keras.config.enable_unsafe_deserialization()
-            # Define the squeeze function exactly as in ModelTrainer class to desirialize Lambda 
-            def squeeze_layer(x):
-                return tf.squeeze(x, axis=1)
-            custom_objects = {
-            "squeeze_layer": squeeze_layer,
-            "Lambda": tf.keras.layers.Lambda(squeeze_layer)
-            }
-            
-            model = tf.keras.models.load_model(
-                model_path,
-                custom_objects=custom_objects,
-                safe_mode=False
-            )
-            return model
-        except Exception as e:
-            st.error(f"Model loading error: {str(e)}")
-            return None
-        finally:
-            # Reset to default safe mode
-            tf.keras.config.disable_unsafe_deserialization()
-
-    @staticmethod
-    def predict_image(model, image):
-        """
-        Makes prediction on a single image 
-        Args:
-            model (tf.keras.Model): Trained model 
-            image (PIL.Image): Input image    
-        Returns:
-            tuple: (predicted_class, confidence, processed_img)
-        """
-        try:
-            processed_array, processed_img = DataHandler.preprocess_image(image)
-            if processed_array is None:
-                return None, None, None
-                
-            prediction = model.predict(processed_array, verbose=0)
-            pred_class = np.argmax(prediction)
-            confidence = np.max(prediction)
-            return pred_class, confidence, processed_img
-        except Exception as e:
-            st.error(f"Prediction error: {str(e)}")
-            return None, None, None
-
-    @staticmethod
-    def display_results(image, pred_class, confidence, characters):
-        """
-        Displays prediction results with visualization
-        
-        Args:
-            image (PIL.Image): Processed input image
-            pred_class (int): Predicted class index
-            confidence (float): Prediction confidence
-            characters (list): List of class labels
-        """
-        try:
-            st.image(image.resize((128, 128)), caption="Processed Image")
-            st.write(f"**Predicted:** {characters[pred_class]}")
-            st.write(f"**Confidence:** {confidence*100:.2f}%")
-        except Exception as e:
-            st.error(f"Result display error: {str(e)}")
\ No newline at end of file
+
+"""
+Predictorr Module
+"""
+# Import required libraries
+import time
+import weakref
+import threading
+import numpy as np
+from classes.reporting import get_reporter
+from classes.data_handler import DataHandler
+from classes.preprocess_pool import PreprocessPool
+from classes.segmenter import Segmenter
+from classes.profiler import ModelProfiler
+from classes.tflite_model import TFLiteModel
+from classes.numpy_model import NumpyModel
+from classes.tf_loader import get_tf, is_keras_model
+from PIL import Image
+
+# Prediction operations
+class Predictor:
+    """
+    Handles Prediction operations
+    """
+    # Class attribute with Arabic character labels
+    characters =[ 'أ', 'ب', 'ت', 'ث', 'ج', 'ح', 'خ', 'د', 'ذ', 'ر', 'ز',
+        'س', 'ش', 'ص', 'ض', 'ط', 'ظ', 'ع', 'غ', 'ف', 'ق', 'ك',
+        'ل', 'م', 'ن', 'ه', 'و', 'ي'
+    ]
+    # Traced inference functions per model, dropped when the model is garbage collected
+    # (the functions only hold a weak reference to their model)
+    _predict_fns = weakref.WeakKeyDictionary()
+    _predict_fns_lock = threading.Lock()
+
+    @staticmethod
+    def load_model(model_path, backend='keras'):
+        """
+        Helper method to load model with custom objects
+        Args:
+            model_path (str): Path to a .keras model, a .tflite model for the tflite backend
+                or a .npz export for the numpy backend
+            backend (str): 'keras', 'tflite' (TFLite interpreter) or 'numpy' (NumpyModel)
+        Returns:
+            tf.keras.Model, TFLiteModel or NumpyModel: Loaded model or None if failed
+        """
+        # TFLite models run through the interpreter with the same predict() interface
+        if backend == 'tflite':
+            try:
+                return TFLiteModel(model_path)
+            except Exception as e:
+                get_reporter().error(f"Model loading error: {str(e)}")
+                return None
+        # NumPy exports load without importing TensorFlow
+        if backend == 'numpy':
+            try:
+                return NumpyModel(model_path)
+            except Exception as e:
+                get_reporter().error(f"Model loading error: {str(e)}")
+                return None
+        # Import TensorFlow on first use
+        tf = get_tf()
+        try:
+            # Enable unsafe deserialization only for this load
+            tf.keras.config.enable_unsafe_deserialization()
+            # Define the squeeze function exactly as in ModelTrainer class to desirialize Lambda 
+            def squeeze_layer(x):
+                return tf.squeeze(x, axis=1)
+            custom_objects = {
+            "squeeze_layer": squeeze_layer,
+            "Lambda": tf.keras.layers.Lambda(squeeze_layer)
+            }
+            
+            model = tf.keras.models.load_model(
+                model_path,
+                custom_objects=custom_objects,
+                safe_mode=False
+            )
+            return model
+        except Exception as e:
+            get_reporter().error(f"Model loading error: {str(e)}")
+            return None
+        finally:
+            # Reset to default safe mode
+            tf.keras.config.disable_unsafe_deserialization()
+
+    @staticmethod
+    def get_predict_fn(model):
+        """
+        Returns a traced inference function for low-latency predictions.
+        Keras predict() builds a data adapter, callbacks and a step loop on every
+        call, which dominates the cost of a single 32x32 sample; this callable is
+        traced once with a fixed (None, 1, 32, 32, 1) float32 signature and reused.
+        The cached tf.function only holds a weak reference to the model, so the cache
+        never keeps a model alive; the returned callable holds a strong one, so it
+        stays usable for as long as the caller keeps it.
+        Args:
+            model (tf.keras.Model): Trained model
+        Returns:
+            callable: Maps a (N, 1, 32, 32, 1) float32 array to (N, num_classes) probabilities,
+                its traced attribute is the shared tf.function
+        """
+        # Import TensorFlow on first use
+        tf = get_tf()
+        # Sessions and the inference server ask from several threads, trace once per model
+        with Predictor._predict_fns_lock:
+            traced_fn = Predictor._predict_fns.get(model)
+            if traced_fn is None:
+                # A strong reference here would keep the cache key alive forever
+                model_ref = weakref.ref(model)
+
+                @tf.function(input_signature=[tf.TensorSpec((None, 1, 32, 32, 1), tf.float32)])
+                def traced_fn(inputs):
+                    return model_ref()(inputs, training=False)
+                Predictor._predict_fns[model] = traced_fn
+
+        def predict_fn(inputs):
+            return traced_fn(inputs)
+        # The caller's handle owns the model, only the cache entry is weak
+        predict_fn.model = model
+        predict_fn.traced = traced_fn
+        return predict_fn
+
+    @staticmethod
+    def get_inference_fn(model):
+        """
+        Returns a batch inference callable for any backend: the traced function
+        for Keras models, predict() for others (e.g. TFLiteModel). The callable
+        keeps the model alive as long as it is referenced.
+        Args:
+            model: Trained model
+        Returns:
+            callable: Maps a (N, 1, 32, 32, 1) float32 array to (N, num_classes) NumPy probabilities
+        """
+        if is_keras_model(model):
+            predict_fn = Predictor.get_predict_fn(model)
+            return lambda inputs: predict_fn(inputs).numpy()
+        return lambda inputs: model.predict(inputs, verbose=0)
+
+    @staticmethod
+    def predict_image(model, image, fast=False, cache=None, profile_dir=None):
+        """
+        Makes prediction on a single image 
+        Args:
+            model (tf.keras.Model): Trained model 
+            image (PIL.Image): Input image    
+            fast (bool): Use the traced inference function instead of model.predict
+            cache (PredictionCache): Reuse the result of an identical preprocessed input, None disables caching
+            profile_dir (str): Write a TensorFlow profiler trace of the inference here, None disables profiling
+        Returns:
+            tuple: (predicted_class, confidence, processed_img)
+        """
+        try:
+            processed_array, processed_img = DataHandler.preprocess_image(image)
+            if processed_array is None:
+                return None, None, None
+                
+            # The traced path only applies to Keras models, other backends keep predict()
+            if fast and is_keras_model(model):
+                inference_fn = lambda inputs: Predictor.get_predict_fn(model)(inputs).numpy()
+            else:
+                inference_fn = lambda inputs: model.predict(inputs, verbose=0)
+            with ModelProfiler.trace(profile_dir):
+                if cache is not None:
+                    prediction = cache.predict(model, processed_array, inference_fn)
+                else:
+                    prediction = inference_fn(processed_array)
+            pred_class = np.argmax(prediction)
+            confidence = np.max(prediction)
+            return pred_class, confidence, processed_img
+        except Exception as e:
+            get_reporter().error(f"Prediction error: {str(e)}")
+            return None, None, None
+
+    @staticmethod
+    def predict_batch(model, source, batch_size=256, top_k=3, workers=0, queue_depth=None, cache=None):
+        """
+        Makes predictions on many images in batched inference calls
+        Args:
+            model (tf.keras.Model): Trained model
+            source: List of images, a directory, a zip archive or uploaded files
+                    (anything accepted by DataHandler.iter_images)
+            batch_size (int): Number of samples per inference call
+            top_k (int): Number of ranked labels returned per image
+            workers (int): Preprocessing threads, 0 preprocesses serially before inference
+            queue_depth (int): Preprocessed batches allowed in flight ahead of inference
+            cache (PredictionCache): Only run inference on images not predicted before, None disables caching
+        Returns:
+            dict: names, classes, confidences, top_k_classes, top_k_labels and
+                  top_k_confidences as arrays, failed image names and per-stage
+                  timings in seconds; None on error
+        """
+        try:
+            start = time.perf_counter()
+            if workers:
+                # Decode on a thread pool and run inference on each batch as it arrives
+                pool = PreprocessPool(workers=workers, queue_depth=queue_depth, batch_size=batch_size)
+                names, failed, probabilities, inference_time = [], [], [], 0.0
+                for batch_names, batch_array, batch_failed in pool.iter_batches(source):
+                    inference_start = time.perf_counter()
+                    probabilities.append(Predictor.predict_array(model, batch_array, batch_size, cache))
+                    inference_time += time.perf_counter() - inference_start
+                    names.extend(batch_names)
+                    failed.extend(batch_failed)
+                probabilities = (np.concatenate(probabilities) if probabilities
+                                 else Predictor.predict_array(model, np.empty((0, 1, 32, 32, 1), 'float32')))
+                timings = dict(pool.timings)
+            else:
+                # Preprocess everything into one contiguous (N,1,32,32,1) array
+                names, processed_array, failed = DataHandler.preprocess_images(source)
+                preprocess_time = time.perf_counter() - start
+                inference_start = time.perf_counter()
+                probabilities = Predictor.predict_array(model, processed_array, batch_size, cache)
+                inference_time = time.perf_counter() - inference_start
+                timings = {'preprocess': preprocess_time, 'images': len(names)}
+            results = Predictor.rank_predictions(probabilities, names, failed, top_k)
+            timings['inference'] = inference_time
+            timings['total'] = time.perf_counter() - start
+            results['timings'] = timings
+            return results
+        except Exception as e:
+            get_reporter().error(f"Batch prediction error: {str(e)}")
+            return None
+
+    @staticmethod
+    def predict_segmented(model, image, batch_size=256, top_k=3, cache=None, **segment_options):
+        """
+        Segments a word or line image into characters and predicts all of them in one batched call
+        Args:
+            model (tf.keras.Model): Trained model
+            image (PIL.Image): Scanned word, line or page
+            batch_size (int): Number of samples per inference call
+            top_k (int): Number of ranked labels returned per character
+            cache (PredictionCache): Only run inference on crops not predicted before, None disables caching
+            **segment_options: min_area, diacritic_ratio, split_ratio and word_gap for Segmenter.segment
+        Returns:
+            dict: rank_predictions arrays per character in reading order, plus 'regions'
+                  (bbox, line, word), the recognised 'text' and per-stage 'timings'; None on error
+        """
+        try:
+            start = time.perf_counter()
+            segmentation = Segmenter.segment(image, **segment_options)
+            processed_array = DataHandler.to_model_input(segmentation['crops'])
+            segment_time = time.perf_counter() - start
+            inference_start = time.perf_counter()
+            probabilities = Predictor.predict_array(model, processed_array, batch_size, cache)
+            inference_time = time.perf_counter() - inference_start
+            regions = segmentation['regions']
+            names = [f"line {region['line'] + 1}, char {index + 1}" for index, region in enumerate(regions)]
+            results = Predictor.rank_predictions(probabilities, names, [], top_k)
+            # Characters are already in reading order, words and lines only add separators
+            text = ""
+            for index, (region, label) in enumerate(zip(regions, results['top_k_labels'][:, 0])):
+                if index:
+                    previous = regions[index - 1]
+                    if region['line'] != previous['line']:
+                        text += "\n"
+                    elif region['word'] != previous['word']:
+                        text += " "
+                text += label
+            results['regions'] = regions
+            results['text'] = text
+            results['timings'] = {'segment': segment_time, 'inference': inference_time,
+                                  'total': time.perf_counter() - start, 'characters': len(regions)}
+            return results
+        except Exception as e:
+            get_reporter().error(f"Segmented prediction error: {str(e)}")
+            return None
+
+    @staticmethod
+    def predict_array(model, processed_array, batch_size=256, cache=None):
+        """
+        Runs inference over a preprocessed array in fixed-size batches
+        Args:
+            model (tf.keras.Model): Trained model
+            processed_array (np.array): (N, 1, 32, 32, 1) float32 input
+            batch_size (int): Number of samples per inference call
+            cache (PredictionCache): Look samples up first and only run inference on the misses
+        Returns:
+            np.array: (N, num_classes) class probabilities
+        """
+        if cache is not None and len(processed_array):
+            return cache.predict(model, processed_array,
+                                 lambda misses: Predictor.predict_array(model, misses, batch_size))
+        probabilities = None
+        for start in range(0, len(processed_array), batch_size):
+            batch_probs = model.predict(processed_array[start:start + batch_size], verbose=0)
+            # Allocate the output once the class count is known
+            if probabilities is None:
+                probabilities = np.empty((len(processed_array), batch_probs.shape[-1]), dtype='float32')
+            probabilities[start:start + len(batch_probs)] = batch_probs
+        if probabilities is None:
+            probabilities = np.empty((0, len(Predictor.characters)), dtype='float32')
+        return probabilities
+
+    @staticmethod
+    def rank_predictions(probabilities, names, failed, top_k=3):
+        """
+        Turns class probabilities into ranked predictions
+        Args:
+            probabilities (np.array): (N, num_classes) class probabilities
+            names (list): Image names in the same order
+            failed (list): Names of images that could not be processed
+            top_k (int): Number of ranked labels per image
+        Returns:
+            dict: Arrays of classes, confidences and top-k classes/labels/confidences
+        """
+        top_k = min(top_k, probabilities.shape[1])
+        # Highest probabilities first
+        top_k_classes = np.argsort(-probabilities, axis=1)[:, :top_k]
+        top_k_confidences = np.take_along_axis(probabilities, top_k_classes, axis=1)
+        return {
+            'names': np.array(names, dtype=object),
+            'classes': top_k_classes[:, 0],
+            'confidences': top_k_confidences[:, 0],
+            'top_k_classes': top_k_classes,
+            'top_k_labels': np.array(Predictor.characters, dtype=object)[top_k_classes],
+            'top_k_confidences': top_k_confidences,
+            'failed': list(failed),
+        }
+
+    @staticmethod
+    def display_results(image, pred_class, confidence, characters):
+        """
+        Displays prediction results with visualization
+        
+        Args:
+            image (PIL.Image): Processed input image
+            pred_class (int): Predicted class index
+            confidence (float): Prediction confidence
+            characters (list): List of class labels
+        """
+        try:
+            reporter = get_reporter()
+            reporter.image(image.resize((128, 128)), caption="Processed Image")
+            reporter.text(f"**Predicted:** {characters[pred_class]}")
+            reporter.text(f"**Confidence:** {confidence*100:.2f}%")
+        except Exception as e:
+            get_reporter().error(f"Result display error: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+PreprocessPool Module
+"""
+# Import required libraries
+import os
+import time
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from classes.data_handler import DataHandler
+
+# Parallel image preprocessing
+class PreprocessPool:
+    """
+    Decodes and preprocesses bulk image inputs on a thread pool and streams
+    ready batches in input order, so decoding overlaps with inference.
+    PIL releases the GIL while decoding and resizing, so threads scale on CPU.
+    After a run, timings holds seconds spent reading the source, preprocessing
+    (summed over workers) and waiting for batches, plus image and batch counts.
+    """
+
+    def __init__(self, workers=None, queue_depth=None, batch_size=256):
+        """
+        Args:
+            workers (int): Number of worker threads, defaults to the CPU count
+            queue_depth (int): Maximum batches in flight ahead of the consumer, defaults to 2 x workers
+            batch_size (int): Images per preprocessed batch
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth or 2 * self.workers
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.timings = {}
+
+    def iter_batches(self, source):
+        """
+        Yields preprocessed batches as they become ready
+        Args:
+            source: Anything accepted by DataHandler.iter_images
+        Yields:
+            tuple: (names, processed_array, failed) per batch, processed_array is (n, 1, 32, 32, 1) float32
+        """
+        # Reset per-stage timings for this run
+        self.timings = {'read': 0.0, 'preprocess': 0.0, 'wait': 0.0, 'images': 0, 'batches': 0}
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in self._chunks(source):
+                pending.append(executor.submit(self._process_chunk, chunk))
+                # Hand over the oldest batch once the queue is full
+                if len(pending) >= self.queue_depth:
+                    yield self._collect(pending.popleft())
+            # Drain the remaining batches
+            while pending:
+                yield self._collect(pending.popleft())
+
+    def _chunks(self, source):
+        """
+        Splits the image source into fixed-size chunks of (name, image)
+        Args:
+            source: Anything accepted by DataHandler.iter_images
+        Yields:
+            list: Up to batch_size (name, image) pairs
+        """
+        images = DataHandler.iter_images(source)
+        index = 0
+        while True:
+            start = time.perf_counter()
+            chunk = list(itertools.islice(images, self.batch_size))
+            self.timings['read'] += time.perf_counter() - start
+            if not chunk:
+                return
+            # Give unnamed images a stable name from their position
+            chunk = [(name if name is not None else f"image_{index + i}", image)
+                     for i, (name, image) in enumerate(chunk)]
+            index += len(chunk)
+            yield chunk
+
+    def _process_chunk(self, chunk):
+        """
+        Decodes, resizes and normalises one chunk (runs on a worker thread)
+        Args:
+            chunk (list): (name, image) pairs
+        Returns:
+            tuple: (names, processed_array, failed)
+        """
+        start = time.perf_counter()
+        names, failed = [], []
+        pixels = np.empty((len(chunk), 32, 32), dtype=np.uint8)
+        for name, image in chunk:
+            try:
+                if image is None:
+                    raise ValueError(f"Cannot open {name}")
+                pixels[len(names)] = np.asarray(DataHandler.resize_image(image))
+                names.append(name)
+            # Skip images that cannot be decoded
+            except Exception:
+                failed.append(name)
+        processed_array = DataHandler.to_model_input(pixels[:len(names)])
+        with self._lock:
+            self.timings['preprocess'] += time.perf_counter() - start
+        return names, processed_array, failed
+
+    def _collect(self, future):
+        """
+        Waits for a batch and records how long the consumer was blocked
+        Args:
+            future (Future): Pending chunk result
+        Returns:
+            tuple: (names, processed_array, failed)
+        """
+        start = time.perf_counter()
+        names, processed_array, failed = future.result()
+        self.timings['wait'] += time.perf_counter() - start
+        self.timings['images'] += len(names)
+        self.timings['batches'] += 1
+        return names, processed_array, failed
@@ -0,0 +1,190 @@
+"""
+ModelProfiler Module
+"""
+# Import required libraries
+import os
+import time
+import tempfile
+import contextlib
+import numpy as np
+from classes.config import get_setting
+from classes.tf_loader import get_tf
+
+# Layer-level cost measurement
+class ModelProfiler:
+    """
+    Opt-in profiling for training and inference: TensorFlow profiler traces written
+    to a run directory (open them with TensorBoard's Profile tab), and a per-layer
+    latency and FLOPs breakdown of the model that the results page renders, so an
+    architecture change can be judged on cost as well as accuracy.
+    """
+    # Training batches traced by default, as (first, last)
+    DEFAULT_BATCHES = (2, 6)
+
+    @staticmethod
+    def run_dir(name=None):
+        """
+        Creates a directory for one profiling run under the PROFILE_DIR secret
+        Args:
+            name (str): Run name, a timestamp if None
+        Returns:
+            str: Directory path
+        """
+        base = get_setting("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "ahcr_profiles"))
+        path = os.path.join(base, name or time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    @contextlib.contextmanager
+    def trace(profile_dir):
+        """
+        Records a TensorFlow profiler trace of the enclosed code, does nothing when profile_dir is None
+        Args:
+            profile_dir (str): Run directory for the trace
+        """
+        if not profile_dir:
+            yield
+            return
+        tf = get_tf()
+        tf.profiler.experimental.start(profile_dir)
+        try:
+            yield
+        finally:
+            tf.profiler.experimental.stop()
+
+    @staticmethod
+    def layer_flops(layer, inputs, output):
+        """
+        Counts the floating-point operations of one layer call (a multiply-add is 2)
+        Args:
+            layer (tf.keras.layers.Layer): Layer
+            inputs (list): Input arrays of the call
+            output (np.array): Output array of the call
+        Returns:
+            int: FLOPs for the whole batch
+        """
+        kind = type(layer).__name__
+        size = int(np.prod(output.shape))
+        if kind == 'Conv2D':
+            kernel_h, kernel_w, channels_in, _ = layer.kernel.shape
+            return size * (2 * kernel_h * kernel_w * channels_in + 1)
+        if kind == 'Dense':
+            return size * (2 * inputs[0].shape[-1] + 1)
+        if kind == 'BatchNormalization':
+            # Inference mode: one scale and one shift per element
+            return 2 * size
+        if kind == 'MaxPooling2D':
+            return size * int(np.prod(layer.pool_size))
+        if kind == 'LSTM':
+            batch, steps, features = inputs[0].shape
+            units = layer.units
+            # Four gates of input and recurrent products, then about 10 element-wise ops per unit
+            return batch * steps * (2 * 4 * units * (features + units) + 10 * units)
+        if kind == 'Attention':
+            batch, steps, features = inputs[0].shape
+            # Scores, softmax and the weighted sum of the values
+            return batch * steps * steps * (4 * features + 3)
+        if kind == 'GlobalAveragePooling1D':
+            return int(np.prod(inputs[0].shape))
+        # Reshapes, concatenation, squeeze, dropout and inputs only move data
+        return 0
+
+    @staticmethod
+    def layer_block(kind, conv_index, after_lstm):
+        """
+        Names the part of the architecture a layer belongs to
+        Args:
+            kind (str): Layer class name
+            conv_index (int): Number of Conv2D layers up to and including this one
+            after_lstm (bool): Whether the LSTM comes before this layer
+        Returns:
+            str: Block name
+        """
+        if kind in ('InputLayer', 'Lambda'):
+            return "Input"
+        if kind in ('Reshape', 'LSTM'):
+            return kind
+        if kind in ('Attention', 'Concatenate', 'GlobalAveragePooling1D'):
+            return "Attention"
+        if kind == 'Dense' or after_lstm:
+            return "Classifier"
+        return f"CNN block {conv_index}"
+
+    @staticmethod
+    def layer_profile(model, batch_size=1, runs=20, warmup=3):
+        """
+        Times every layer on its real inputs and counts its FLOPs
+        Args:
+            model (tf.keras.Model): Functional Keras model
+            batch_size (int): Samples per call
+            runs (int): Timed calls per layer, the median is reported
+            warmup (int): Untimed calls per layer (tracing)
+        Returns:
+            dict: 'layers' list of {layer, type, block, output_shape, params, flops, latency_ms, share},
+                  'model_latency_ms' of the whole compiled model and 'batch_size'
+        """
+        tf = get_tf()
+        rng = np.random.default_rng(0)
+        sample = rng.random((batch_size,) + tuple(model.inputs[0].shape[1:])).astype('float32')
+        layers = list(model.layers)
+        # Every layer's output for the sample, to feed each layer its real inputs
+        extractor = tf.keras.Model(model.input, [layer.output for layer in layers])
+        outputs = extractor(sample, training=False)
+        values = {id(layer.output): value for layer, value in zip(layers, outputs)}
+
+        def median_ms(fn, args):
+            for _ in range(warmup):
+                fn(*args)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                # .numpy() waits for the result
+                np.asarray(fn(*args))
+                timings.append(time.perf_counter() - start)
+            return float(np.median(timings) * 1000)
+
+        rows, conv_index, after_lstm = [], 0, False
+        for layer, output in zip(layers, outputs):
+            kind = type(layer).__name__
+            conv_index += kind == 'Conv2D'
+            after_lstm = after_lstm or kind == 'LSTM'
+            if kind == 'InputLayer':
+                continue
+            symbolic = layer.input if isinstance(layer.input, (list, tuple)) else [layer.input]
+            inputs = [values[id(tensor)] for tensor in symbolic]
+            call = tf.function(lambda *args, layer=layer: layer(list(args) if len(args) > 1 else args[0],
+                                                                training=False))
+            rows.append({
+                'layer': layer.name,
+                'type': kind,
+                'block': ModelProfiler.layer_block(kind, conv_index, after_lstm and kind != 'LSTM'),
+                'output_shape': tuple(output.shape[1:]),
+                'params': int(layer.count_params()),
+                'flops': int(ModelProfiler.layer_flops(layer, [np.asarray(value) for value in inputs],
+                                                       np.asarray(output))),
+                'latency_ms': median_ms(call, inputs),
+            })
+        total = sum(row['latency_ms'] for row in rows) or 1.0
+        for row in rows:
+            row['share'] = row['latency_ms'] / total
+        # Whole-model latency for reference, per-layer calls add dispatch overhead
+        model_fn = tf.function(lambda x: model(x, training=False))
+        return {'layers': rows, 'model_latency_ms': median_ms(model_fn, [sample]), 'batch_size': batch_size}
+
+    @staticmethod
+    def block_summary(profile):
+        """
+        Sums a layer profile per architecture block
+        Args:
+            profile (dict): Result of layer_profile
+        Returns:
+            list: {block, latency_ms, share, flops, params} rows in model order
+        """
+        blocks = {}
+        for row in profile['layers']:
+            block = blocks.setdefault(row['block'], {'block': row['block'], 'latency_ms': 0.0, 'share': 0.0,
+                                                     'flops': 0, 'params': 0})
+            for key in ('latency_ms', 'share', 'flops', 'params'):
+                block[key] += row[key]
+        return list(blocks.values())
@@ -0,0 +1,193 @@
+"""
+Reporting Module
+"""
+# Import required libraries
+import sys
+import threading
+
+# Console output sink
+class ConsoleReporter:
+    """
+    Progress and message sink used by DataHandler, ModelTrainer and Predictor.
+    This default writes plain text to stderr, so the classes run in batch jobs
+    without the Streamlit runtime; the app installs a StreamlitReporter.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Args:
+            stream (file-like): Output stream, defaults to stderr
+        """
+        self.stream = stream
+
+    def _write(self, text):
+        stream = self.stream or sys.stderr
+        stream.write(text + "\n")
+        stream.flush()
+
+    def error(self, message):
+        """
+        Reports an error message
+        """
+        self._write(f"ERROR: {message}")
+
+    def warning(self, message):
+        """
+        Reports a warning message
+        """
+        self._write(f"WARNING: {message}")
+
+    def info(self, message):
+        """
+        Reports an informational message
+        """
+        self._write(message)
+
+    def progress(self):
+        """
+        Starts a progress indicator
+        Returns:
+            ConsoleProgress: Handle with update() and clear()
+        """
+        return ConsoleProgress(self)
+
+    def metrics(self, title, values):
+        """
+        Shows a group of final metrics
+        Args:
+            title (str): Group title
+            values (dict): Metric label to formatted value
+        """
+        self._write(title)
+        for label, value in values.items():
+            self._write(f"  {label}: {value}")
+
+    def image(self, image, caption=None):
+        """
+        Shows an image, consoles only report its caption
+        """
+        if caption:
+            self._write(f"[image] {caption}")
+
+    def text(self, message):
+        """
+        Shows a line of (markdown) text
+        """
+        self._write(message.replace("**", ""))
+
+# Console progress handle
+class ConsoleProgress:
+    """
+    Progress handle that writes one status line per update
+    """
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+
+    def update(self, fraction, text=None):
+        """
+        Updates progress
+        Args:
+            fraction (float): Completed fraction in [0, 1]
+            text (str): Status line
+        """
+        self.reporter._write(f"[{fraction:>4.0%}] {text}" if text else f"[{fraction:>4.0%}]")
+
+    def clear(self):
+        """
+        Removes the indicator (nothing to remove on a console)
+        """
+
+# Streamlit output sink
+class StreamlitReporter:
+    """
+    Reports through Streamlit elements, used by the web app.
+    Streamlit is imported on first use so the module stays importable headless.
+    """
+
+    @property
+    def st(self):
+        import streamlit as st
+        return st
+
+    def error(self, message):
+        self.st.error(message)
+
+    def warning(self, message):
+        self.st.warning(message)
+
+    def info(self, message):
+        self.st.info(message)
+
+    def progress(self):
+        """
+        Starts a progress bar with a status line below it
+        Returns:
+            StreamlitProgress: Handle with update() and clear()
+        """
+        return StreamlitProgress(self.st)
+
+    def metrics(self, title, values):
+        """
+        Shows final metrics in an expander, split over two columns
+        """
+        items = list(values.items())
+        half = (len(items) + 1) // 2
+        with self.st.expander(title, expanded=True):
+            col1, col2 = self.st.columns(2)
+            for column, column_items in ((col1, items[:half]), (col2, items[half:])):
+                with column:
+                    for label, value in column_items:
+                        self.st.metric(label, value)
+
+    def image(self, image, caption=None):
+        self.st.image(image, caption=caption)
+
+    def text(self, message):
+        self.st.write(message)
+
+# Streamlit progress handle
+class StreamlitProgress:
+    """
+    Progress bar plus status text placeholder
+    """
+
+    def __init__(self, st):
+        # Visual progress bar
+        self.progress_bar = st.progress(0)
+        # Dynamic text display
+        self.status_text = st.empty()
+
+    def update(self, fraction, text=None):
+        self.progress_bar.progress(min(max(fraction, 0.0), 1.0))
+        if text is not None:
+            self.status_text.text(text)
+
+    def clear(self):
+        self.progress_bar.empty()
+        self.status_text.empty()
+
+# Active sink, shared by all callers in the process
+_reporter = ConsoleReporter()
+_reporter_lock = threading.Lock()
+
+def get_reporter():
+    """
+    Returns the active reporter
+    Returns:
+        ConsoleReporter or StreamlitReporter: Current sink
+    """
+    return _reporter
+
+def set_reporter(reporter):
+    """
+    Installs a reporter for the whole process
+    Args:
+        reporter: Object with error/warning/info/progress/metrics/image/text methods
+    Returns:
+        The previously active reporter
+    """
+    global _reporter
+    with _reporter_lock:
+        previous, _reporter = _reporter, reporter
+    return previous
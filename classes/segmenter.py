@@ -0,0 +1,309 @@
+"""
+Segmenter Module
+"""
+# Import required libraries
+import numpy as np
+from PIL import Image
+
+# Word and line image segmentation
+class Segmenter:
+    """
+    Cuts scanned words and lines into character crops for the model:
+    Otsu binarization, run-length connected-component labelling with union-find,
+    splitting of wide cursive components at vertical projection minima, merging
+    of dots and other diacritics into the letter below or above them, line
+    grouping and right-to-left ordering. Every stage works on ink runs or
+    components rather than pixels in Python, so a page with hundreds of
+    characters segments in linear time.
+    """
+    # Components smaller than this many pixels are treated as noise
+    MIN_AREA = 8
+    # Components below this fraction of the median component area are diacritics
+    DIACRITIC_RATIO = 0.3
+    # Main bodies wider than this many times the median height are split
+    SPLIT_RATIO = 1.6
+    # Gaps wider than this fraction of the median height separate words
+    WORD_GAP = 0.5
+    # Blank border around each crop, as a fraction of its longest side
+    CROP_MARGIN = 0.15
+
+    @staticmethod
+    def otsu_threshold(gray):
+        """
+        Picks the grey level that maximises the between-class variance
+        Args:
+            gray (np.array): uint8 grayscale pixels
+        Returns:
+            int: Threshold, pixels <= threshold form the dark class
+        """
+        histogram = np.bincount(np.asarray(gray, dtype=np.uint8).ravel(), minlength=256).astype('float64')
+        levels = np.arange(256)
+        # Class weights and means for every candidate threshold at once
+        weight_dark = np.cumsum(histogram)
+        weight_light = weight_dark[-1] - weight_dark
+        cumulative_mean = np.cumsum(histogram * levels)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_dark = cumulative_mean / weight_dark
+            mean_light = (cumulative_mean[-1] - cumulative_mean) / weight_light
+            between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+        return int(np.argmax(np.nan_to_num(between)))
+
+    @staticmethod
+    def binarize(image):
+        """
+        Separates ink from background
+        Args:
+            image (PIL.Image): Scanned word or line
+        Returns:
+            tuple: (ink, threshold) boolean (H, W) ink mask and the Otsu threshold
+        """
+        gray = np.asarray(image.convert("L"))
+        threshold = Segmenter.otsu_threshold(gray)
+        ink = gray <= threshold
+        # Light ink on a dark background: ink is the minority class
+        if ink.mean() > 0.5:
+            ink = ~ink
+        return ink, threshold
+
+    @staticmethod
+    def find_runs(ink):
+        """
+        Finds the horizontal ink runs of every row
+        Args:
+            ink (np.array): Boolean (H, W) ink mask
+        Returns:
+            tuple: (rows, starts, ends) arrays in row-major order, ends exclusive
+        """
+        height, width = ink.shape
+        padded = np.zeros((height, width + 2), dtype=np.int8)
+        padded[:, 1:-1] = ink
+        edges = np.diff(padded, axis=1)
+        # nonzero walks rows in order, so starts and ends pair up
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        return rows, starts, ends
+
+    @staticmethod
+    def label_runs(rows, starts, ends, width):
+        """
+        Groups ink runs into 8-connected components
+        Args:
+            rows (np.array): Row of each run
+            starts (np.array): First column of each run
+            ends (np.array): Column after the last of each run
+            width (int): Image width
+        Returns:
+            tuple: (labels, count) component label of each run and the number of components
+        """
+        count = len(rows)
+        if count == 0:
+            return np.empty(0, dtype=np.int64), 0
+        # Runs keyed by (row, column) stay sorted, so the runs of the previous row that touch
+        # a run (diagonals included) form one contiguous index range found by binary search
+        stride = width + 2
+        start_keys = rows * stride + starts
+        end_keys = rows * stride + ends
+        previous_row = (rows - 1) * stride
+        first = np.searchsorted(end_keys, previous_row + starts, side='left')
+        last = np.searchsorted(start_keys, previous_row + ends, side='right')
+        touching = np.maximum(last - first, 0)
+        below = np.repeat(np.arange(count), touching)
+        above = np.repeat(first - (np.cumsum(touching) - touching), touching) + np.arange(touching.sum())
+        # Union-find over the touching pairs, linking to the smaller root
+        parent = list(range(count))
+        for a, b in zip(above.tolist(), below.tolist()):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        # Flatten every run onto its root by pointer jumping
+        parent = np.array(parent)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        _, labels = np.unique(parent, return_inverse=True)
+        return labels, int(labels.max()) + 1
+
+    @staticmethod
+    def label_components(ink):
+        """
+        Labels the 8-connected ink components of a mask
+        Args:
+            ink (np.array): Boolean (H, W) ink mask
+        Returns:
+            tuple: (label_image, count) int32 labels (0 is background, components from 1) and the component count
+        """
+        height, width = ink.shape
+        rows, starts, ends = Segmenter.find_runs(ink)
+        labels, count = Segmenter.label_runs(rows, starts, ends, width)
+        label_image = np.zeros((height, width), dtype=np.int32)
+        # Paint every run in one scatter
+        lengths = ends - starts
+        offsets = np.repeat(rows * width + starts - (np.cumsum(lengths) - lengths), lengths)
+        label_image.flat[offsets + np.arange(lengths.sum())] = np.repeat(labels + 1, lengths)
+        return label_image, count
+
+    @staticmethod
+    def component_boxes(label_image, count):
+        """
+        Measures every labelled component
+        Args:
+            label_image (np.array): Labels from label_components
+            count (int): Number of components
+        Returns:
+            tuple: (boxes, areas) int (count, 4) x0, y0, x1, y1 boxes (exclusive ends) and pixel counts
+        """
+        ys, xs = np.nonzero(label_image)
+        labels = label_image[ys, xs] - 1
+        boxes = np.empty((count, 4), dtype=np.int64)
+        boxes[:, :2] = np.iinfo(np.int64).max
+        boxes[:, 2:] = -1
+        np.minimum.at(boxes[:, 0], labels, xs)
+        np.minimum.at(boxes[:, 1], labels, ys)
+        np.maximum.at(boxes[:, 2], labels, xs + 1)
+        np.maximum.at(boxes[:, 3], labels, ys + 1)
+        return boxes, np.bincount(labels, minlength=count)
+
+    @staticmethod
+    def segment(image, min_area=None, diacritic_ratio=None, split_ratio=None, word_gap=None):
+        """
+        Segments a word, line or page image into ordered character crops
+        Args:
+            image (PIL.Image): Scanned handwriting, dark ink on a light background or the reverse
+            min_area (int): Components below this many pixels are dropped as noise
+            diacritic_ratio (float): Components below this fraction of the median area join the nearest letter
+            split_ratio (float): Letters wider than this many median heights are split, 0 disables splitting
+            word_gap (float): Horizontal gap, in median heights, that starts a new word
+        Returns:
+            dict: 'crops' (N, 32, 32) uint8 images ready for DataHandler.to_model_input,
+                  'regions' list of {'bbox', 'line', 'word'} in reading order (lines top to
+                  bottom, characters right to left), 'lines', 'components' and 'threshold'
+        """
+        min_area = Segmenter.MIN_AREA if min_area is None else min_area
+        diacritic_ratio = Segmenter.DIACRITIC_RATIO if diacritic_ratio is None else diacritic_ratio
+        split_ratio = Segmenter.SPLIT_RATIO if split_ratio is None else split_ratio
+        word_gap = Segmenter.WORD_GAP if word_gap is None else word_gap
+        ink, threshold = Segmenter.binarize(image)
+        label_image, count = Segmenter.label_components(ink)
+        boxes, areas = Segmenter.component_boxes(label_image, count)
+        result = {'crops': np.empty((0, 32, 32), dtype=np.uint8), 'regions': [], 'lines': 0,
+                  'components': count, 'threshold': threshold}
+        # Drop specks
+        kept = np.flatnonzero(areas >= min_area)
+        if len(kept) == 0:
+            return result
+        # Letter bodies versus dots, hamzas and other small marks
+        is_main = areas[kept] >= diacritic_ratio * np.median(areas[kept])
+        mains, marks = kept[is_main], kept[~is_main]
+        reference_height = float(np.median(boxes[mains, 3] - boxes[mains, 1]))
+
+        # Character regions as lists of (component, x0, x1) parts, split bodies keep a column range
+        regions = []
+        for component in mains:
+            x0, y0, x1, y1 = boxes[component]
+            cuts = [x0, x1]
+            if split_ratio and x1 - x0 > split_ratio * reference_height:
+                columns = (label_image[y0:y1, x0:x1] == component + 1).sum(axis=0)
+                cuts = [x0 + cut for cut in Segmenter._split_columns(columns, split_ratio * reference_height)]
+            for left, right in zip(cuts[:-1], cuts[1:]):
+                rows = np.flatnonzero((label_image[y0:y1, left:right] == component + 1).any(axis=1))
+                if len(rows):
+                    regions.append({'parts': [(component, left, right)],
+                                    'bbox': [left, y0 + rows[0], right, y0 + rows[-1] + 1]})
+
+        # Lines: sweep bodies top to bottom, a body whose centre falls inside the current band joins it
+        order = sorted(range(len(regions)), key=lambda i: regions[i]['bbox'][1] + regions[i]['bbox'][3])
+        lines = []
+        for i in order:
+            _, y0, _, y1 = regions[i]['bbox']
+            if lines and (y0 + y1) / 2 < lines[-1]['bottom']:
+                lines[-1]['members'].append(i)
+                lines[-1]['bottom'] = max(lines[-1]['bottom'], y1)
+            else:
+                lines.append({'top': y0, 'bottom': y1, 'members': [i]})
+        for number, line in enumerate(lines):
+            line['top'] = min(regions[i]['bbox'][1] for i in line['members'])
+            # Bodies of the line sorted by centre column, for diacritic lookups
+            line['members'].sort(key=lambda i: regions[i]['bbox'][0] + regions[i]['bbox'][2])
+            line['centres'] = np.array([(regions[i]['bbox'][0] + regions[i]['bbox'][2]) / 2 for i in line['members']])
+            for i in line['members']:
+                regions[i]['line'] = number
+
+        # Diacritics join the nearest line vertically, then the body whose columns overlap them most
+        line_centres = np.array([(line['top'] + line['bottom']) / 2 for line in lines])
+        for component in marks:
+            x0, y0, x1, y1 = boxes[component]
+            line = lines[int(np.argmin(np.abs(line_centres - (y0 + y1) / 2)))]
+            position = int(np.searchsorted(line['centres'], (x0 + x1) / 2))
+            candidates = [line['members'][j] for j in (position - 1, position) if 0 <= j < len(line['members'])]
+            target = max(candidates, key=lambda i: (min(x1, regions[i]['bbox'][2]) - max(x0, regions[i]['bbox'][0]),
+                                                    -abs(regions[i]['bbox'][0] + regions[i]['bbox'][2] - x0 - x1)))
+            regions[target]['parts'].append((component, x0, x1))
+            bbox = regions[target]['bbox']
+            regions[target]['bbox'] = [min(bbox[0], x0), min(bbox[1], y0), max(bbox[2], x1), max(bbox[3], y1)]
+
+        # Reading order: lines top to bottom, characters right to left, words split at wide gaps
+        ordered, crops = [], []
+        for number, line in enumerate(lines):
+            members = sorted(line['members'], key=lambda i: -regions[i]['bbox'][2])
+            word, previous_left = 0, None
+            for i in members:
+                x0, y0, x1, y1 = regions[i]['bbox']
+                if previous_left is not None and previous_left - x1 > word_gap * reference_height:
+                    word += 1
+                previous_left = x0 if previous_left is None else min(previous_left, x0)
+                ordered.append({'bbox': (int(x0), int(y0), int(x1), int(y1)), 'line': number, 'word': word})
+                crops.append(Segmenter._crop(label_image, regions[i]))
+        result.update(crops=np.stack(crops), regions=ordered, lines=len(lines))
+        return result
+
+    @staticmethod
+    def _split_columns(columns, max_width):
+        """
+        Cuts a column ink profile at its thinnest columns until no piece is wider than max_width
+        Args:
+            columns (np.array): Ink pixels per column
+            max_width (float): Widest piece left uncut
+        Returns:
+            list: Cut positions including 0 and len(columns)
+        """
+        pieces, cuts = [(0, len(columns))], [0, len(columns)]
+        while pieces:
+            left, right = pieces.pop()
+            if right - left <= max_width:
+                continue
+            # Only cut in the middle half so a piece never becomes a sliver
+            low, high = left + (right - left) // 4, right - (right - left) // 4
+            cut = low + int(np.argmin(columns[low:high]))
+            cuts.append(cut)
+            pieces.extend([(left, cut), (cut, right)])
+        return sorted(cuts)
+
+    @staticmethod
+    def _crop(label_image, region):
+        """
+        Renders one region as a centred 32x32 dark-on-light image
+        Args:
+            label_image (np.array): Labels from label_components
+            region (dict): Region with 'bbox' and (component, x0, x1) 'parts'
+        Returns:
+            np.array: (32, 32) uint8 pixels
+        """
+        x0, y0, x1, y1 = region['bbox']
+        window = label_image[y0:y1, x0:x1]
+        columns = np.arange(x0, x1)
+        ink = np.zeros(window.shape, dtype=bool)
+        for component, left, right in region['parts']:
+            ink |= (window == component + 1) & ((columns >= left) & (columns < right))[None, :]
+        # Pad to a square with a margin, as the training characters are centred
+        side = int(max(ink.shape) * (1 + 2 * Segmenter.CROP_MARGIN)) + 1
+        canvas = np.full((side, side), 255, dtype=np.uint8)
+        top, left = (side - ink.shape[0]) // 2, (side - ink.shape[1]) // 2
+        canvas[top:top + ink.shape[0], left:left + ink.shape[1]][ink] = 0
+        return np.asarray(Image.fromarray(canvas).resize((32, 32)))
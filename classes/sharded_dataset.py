@@ -0,0 +1,244 @@
+"""
+ShardedDataset Module
+"""
+# Import required libraries
+import os
+import json
+import queue
+import threading
+import numpy as np
+from classes.config import get_setting
+from classes.data_handler import DataHandler
+from classes.reporting import get_reporter
+
+# Streaming training data
+class ShardedDataset:
+    """
+    Training data spread over many feature/label shards listed in a JSON manifest.
+    A pass over a split is a stream: reader threads each parse one shard at a time
+    in fixed-size chunks, chunks of different shards are interleaved and their rows
+    mixed into batches, and only a few chunks per thread are held at once, so memory
+    stays constant whatever the size of the corpus.
+
+    Manifest format (paths are relative to the manifest file):
+        {"train": [{"features": "ahcd/train.csv", "labels": "ahcd/train_labels.csv"},
+                   {"features": "collected/part-000.npy", "labels": "collected/part-000_labels.npy"}],
+         "validation": [{"features": "ahcd/test.csv", "labels": "ahcd/test_labels.csv"}]}
+    A plain list is read as the train shards. A shard is a CSV pair as uploaded on the
+    train page, or an .npy pair of (N, 1024) pixels and (N,) labels 1-28.
+    """
+    # Shard file formats
+    FORMATS = ('.csv', '.npy')
+    # Reader threads when the SHARD_READ_THREADS secret is not set
+    DEFAULT_THREADS = 4
+
+    def __init__(self, train_shards, validation_shards, chunk_size=DataHandler.CHUNK_SIZE, threads=DEFAULT_THREADS,
+                 parser=None, seed=None):
+        """
+        Args:
+            train_shards (list): {'features', 'labels'} path pairs used for training
+            validation_shards (list): Path pairs used for validation
+            chunk_size (int): Rows read from a shard at a time
+            threads (int): Shards read in parallel, also the number of shards mixed into each batch
+            parser (str): CSV parser backend of DataHandler, None for the CSV_PARSER secret
+            seed (int): Seed of the shard order and row mixing, None for a random one
+        """
+        self.shards = {'train': list(train_shards), 'validation': list(validation_shards)}
+        self.chunk_size = chunk_size
+        self.threads = max(int(threads), 1)
+        self.parser = parser
+        self.rng = np.random.default_rng(seed)
+        # Rows yielded per split in total, and in the last complete pass
+        self.rows_read = {'train': 0, 'validation': 0}
+        self.pass_rows = {'train': None, 'validation': None}
+
+    @classmethod
+    def from_manifest(cls, manifest_path, validation_split=0.2, **options):
+        """
+        Reads and checks a manifest
+        Args:
+            manifest_path (str): JSON manifest file
+            validation_split (float): Fraction of the shards (taken from the end) held out for
+                validation when the manifest lists no validation shards
+            **options: chunk_size, parser and seed, threads defaults to the SHARD_READ_THREADS secret
+        Returns:
+            ShardedDataset: Reader, or None if the manifest is invalid
+        """
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if isinstance(manifest, list):
+                manifest = {'train': manifest}
+            base = os.path.dirname(os.path.abspath(manifest_path))
+            train = [cls._resolve_shard(shard, base) for shard in manifest.get('train', [])]
+            validation = [cls._resolve_shard(shard, base) for shard in manifest.get('validation', [])]
+            if not validation:
+                # Hold out whole shards from the end, like validation_split holds out the last samples
+                if len(train) < 2:
+                    raise ValueError("A manifest without validation shards needs at least two train shards")
+                held_out = min(max(int(round(len(train) * validation_split)), 1), len(train) - 1)
+                train, validation = train[:-held_out], train[-held_out:]
+            if not train:
+                raise ValueError("The manifest lists no train shards")
+            options.setdefault('threads', int(get_setting("SHARD_READ_THREADS", cls.DEFAULT_THREADS)))
+            return cls(train, validation, **options)
+        # Handle any errors
+        except Exception as e:
+            # Show error message
+            get_reporter().error(f"Manifest error: {str(e)}")
+            return None
+
+    @staticmethod
+    def _resolve_shard(shard, base):
+        """
+        Checks one manifest entry and makes its paths absolute
+        Args:
+            shard (dict): {'features', 'labels'} paths
+            base (str): Manifest directory
+        Returns:
+            dict: Shard with absolute paths
+        """
+        if not isinstance(shard, dict) or 'features' not in shard or 'labels' not in shard:
+            raise ValueError(f"Shards need 'features' and 'labels' paths, got {shard!r}")
+        paths = {key: os.path.join(base, shard[key]) for key in ('features', 'labels')}
+        formats = {os.path.splitext(path)[1].lower() for path in paths.values()}
+        if len(formats) != 1 or not formats <= set(ShardedDataset.FORMATS):
+            raise ValueError(f"Shards are CSV or .npy pairs, got {shard['features']} and {shard['labels']}")
+        for path in paths.values():
+            if not os.path.exists(path):
+                raise ValueError(f"Shard file not found: {path}")
+        return paths
+
+    def read_shard(self, shard):
+        """
+        Reads one shard chunk by chunk
+        Args:
+            shard (dict): {'features', 'labels'} absolute paths
+        Yields:
+            tuple: (X, y) uint8 pixels of shape (rows, 1024) and zero based labels
+        """
+        if not shard['features'].lower().endswith('.npy'):
+            yield from DataHandler.iter_chunks(shard['features'], shard['labels'], self.chunk_size, self.parser)
+            return
+        # Memory-mapped, only the rows of the current chunk are paged in
+        X = np.load(shard['features'], mmap_mode='r')
+        y = np.load(shard['labels'], mmap_mode='r').reshape(-1)
+        X = X.reshape(len(X), -1)
+        if X.shape[1] != 1024:
+            raise ValueError(f"Expected 1024 features, got {X.shape[1]} in {shard['features']}")
+        if X.dtype.kind not in 'iu':
+            raise ValueError(f"Expected integer pixels, got {X.dtype} in {shard['features']}")
+        if len(X) != len(y):
+            raise ValueError(f"Mismatched samples: {len(X)} features vs {len(y)} labels in {shard['features']}")
+        for start in range(0, len(X), self.chunk_size):
+            values = np.asarray(X[start:start + self.chunk_size])
+            # One range check for the whole chunk
+            if X.dtype != np.uint8 and (values.min() < 0 or values.max() > 255):
+                raise ValueError(f"Pixel values must be in the range 0-255 in {shard['features']}")
+            yield values.astype(np.uint8), np.asarray(y[start:start + self.chunk_size], dtype=np.int64) - 1
+
+    def batches(self, split='train', batch_size=128, shuffle=None):
+        """
+        One pass over a split as a stream of batches
+        Args:
+            split (str): 'train' or 'validation'
+            batch_size (int): Samples per batch, the last batch may be smaller
+            shuffle (bool): Shuffle the shard order and mix rows, defaults to True for training
+        Yields:
+            tuple: (X, y) uint8 pixels of shape (batch, 1024) and zero based labels
+        """
+        shuffle = split == 'train' if shuffle is None else shuffle
+        shards = list(self.shards[split])
+        if shuffle:
+            self.rng.shuffle(shards)
+        todo = queue.Queue()
+        for shard in shards:
+            todo.put(shard)
+        # Bounded, a reader waits while the trainer is behind
+        chunks = queue.Queue(maxsize=2 * self.threads)
+        stop = threading.Event()
+        readers = [threading.Thread(target=self._read_shards, args=(todo, chunks, stop), daemon=True)
+                   for _ in range(min(self.threads, len(shards)))]
+        for reader in readers:
+            reader.start()
+        # Rows of about one chunk per reader are mixed before batching
+        mix_rows = self.chunk_size * len(readers)
+        pending, pending_rows, done, rows = [], 0, 0, 0
+        try:
+            while done < len(readers):
+                item = chunks.get()
+                if item is None:
+                    done += 1
+                elif isinstance(item, Exception):
+                    raise ValueError(f"Shard read error: {str(item)}")
+                else:
+                    pending.append(item)
+                    pending_rows += len(item[0])
+                last = done == len(readers)
+                if pending_rows >= mix_rows or (last and pending_rows):
+                    X, y = self._mix(pending, shuffle)
+                    # Full batches go out, the remainder waits for the next chunks (or ends the pass)
+                    end = len(X) if last else len(X) - len(X) % batch_size
+                    for start in range(0, end, batch_size):
+                        batch = slice(start, min(start + batch_size, end))
+                        rows += batch.stop - batch.start
+                        yield X[batch], y[batch]
+                    pending, pending_rows = [(X[end:].copy(), y[end:].copy())], len(X) - end
+            self.rows_read[split] += rows
+            self.pass_rows[split] = rows
+        finally:
+            # Also reached when the consumer stops early, the readers see the event and exit
+            stop.set()
+
+    def _mix(self, pending, shuffle):
+        """
+        Concatenates pending chunks, shuffling their rows together when asked
+        Args:
+            pending (list): (X, y) chunks
+            shuffle (bool): Shuffle the rows
+        Returns:
+            tuple: (X, y)
+        """
+        X = np.concatenate([X for X, _ in pending])
+        y = np.concatenate([y for _, y in pending])
+        if shuffle:
+            order = self.rng.permutation(len(X))
+            X, y = X[order], y[order]
+        return X, y
+
+    def _read_shards(self, todo, chunks, stop):
+        """
+        Reader thread body: takes shards off the todo queue until none are left
+        Args:
+            todo (queue.Queue): Shards still to read
+            chunks (queue.Queue): Output chunks, an exception on failure and None when done
+            stop (threading.Event): Set when the consumer is gone
+        """
+        try:
+            while not stop.is_set():
+                try:
+                    shard = todo.get_nowait()
+                except queue.Empty:
+                    break
+                for chunk in self.read_shard(shard):
+                    if not self._put(chunks, chunk, stop):
+                        return
+        except Exception as e:
+            self._put(chunks, e, stop)
+            return
+        self._put(chunks, None, stop)
+
+    @staticmethod
+    def _put(chunks, item, stop):
+        """
+        Puts an item on the bounded queue unless the consumer has stopped
+        Returns:
+            bool: False once stopped
+        """
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,225 @@
+"""
+HyperparameterSweep Module
+"""
+# Import required libraries
+import io
+import os
+import time
+import shutil
+import itertools
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from classes.reporting import get_reporter
+
+# Hyperparameter search
+class HyperparameterSweep:
+    """
+    Trains one model per point of a search space in a pool of worker processes.
+    Trials publish their validation accuracy per epoch to shared memory; a trial
+    that falls more than a margin behind the best accuracy any trial reached at
+    the same epoch is stopped early (pruned), freeing its worker for the next trial.
+    """
+    # Options a search space may vary, with their defaults
+    DEFAULTS = {
+        'use_attention': False,
+        'batch_size': 128,
+        'epochs': 20,
+        'learning_rate': 1e-3,
+        'steps_per_execution': 1,
+    }
+
+    @staticmethod
+    def expand(space):
+        """
+        Lists every combination of a search space
+        Args:
+            space (dict): Option name to list of values, missing options use DEFAULTS
+        Returns:
+            list: One dict of options per trial
+        """
+        unknown = set(space) - set(HyperparameterSweep.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown sweep options: {', '.join(sorted(unknown))}")
+        names = list(space)
+        return [dict(HyperparameterSweep.DEFAULTS, **dict(zip(names, values)))
+                for values in itertools.product(*(space[name] for name in names))]
+
+    @staticmethod
+    def run(X_train, y_train, space, workers=None, prune_after=3, prune_margin=0.05,
+            threads_per_trial=None, validation_split=0.2):
+        """
+        Runs all trials of a search space in parallel
+        Args:
+            X_train (np.array): Training features, raw uint8 pixels or float32
+            y_train (np.array): Training labels
+            space (dict): Option name to list of values (see DEFAULTS)
+            workers (int): Trials trained at the same time, defaults to the CPU count
+            prune_after (int): Epochs every trial runs before it can be pruned, 0 disables pruning
+            prune_margin (float): Validation accuracy gap to the best trial that prunes a trial
+            threads_per_trial (int): TensorFlow threads per trial, defaults to an even share of the CPUs
+            validation_split (float): Fraction of samples used for validation
+        Returns:
+            list: One result dict per trial in search-space order (a failed trial has its message
+                in 'error'), or None if the sweep could not run
+        """
+        reporter = get_reporter()
+        progress = None
+        try:
+            trials = HyperparameterSweep.expand(space)
+            workers = min(workers or os.cpu_count() or 1, len(trials))
+            threads = threads_per_trial or max((os.cpu_count() or 1) // workers, 1)
+            # Spawned workers start without the parent's TensorFlow state
+            context = multiprocessing.get_context('spawn')
+            # Best validation accuracy reached at each epoch by any trial, shared by all workers
+            best = context.Array('d', [-1.0] * max(trial['epochs'] for trial in trials))
+            data_dir = tempfile.mkdtemp(prefix="sweep_")
+            try:
+                # Workers memory-map the arrays instead of receiving copies
+                np.save(os.path.join(data_dir, "X.npy"), np.asarray(X_train))
+                np.save(os.path.join(data_dir, "y.npy"), np.asarray(y_train))
+                results = [None] * len(trials)
+                progress = reporter.progress()
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                         initargs=(data_dir, best, threads)) as pool:
+                    futures = {pool.submit(_run_trial, trial, prune_after, prune_margin, validation_split): index
+                               for index, trial in enumerate(trials)}
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        index = futures[future]
+                        try:
+                            results[index] = future.result()
+                        except Exception as e:
+                            # One failed trial does not discard the others
+                            reporter.warning(f"Sweep trial failed: {str(e)}")
+                            results[index] = HyperparameterSweep._failed_result(trials[index], str(e))
+                        progress.update(done / len(trials), f"Trial {done}/{len(trials)} done")
+                progress.clear()
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+            return results
+        except Exception as e:
+            if progress is not None:
+                progress.clear()
+            reporter.error(f"Sweep error: {str(e)}")
+            return None
+
+    @staticmethod
+    def _failed_result(trial, error):
+        """
+        Result entry of a trial that raised
+        Args:
+            trial (dict): Options of the trial
+            error (str): Error message
+        Returns:
+            dict: The trial options with empty metrics and the error
+        """
+        return dict(trial, val_accuracy=None, epochs_run=0, train_time=0.0, samples_per_sec=None,
+                    pruned=False, error=error)
+
+    @staticmethod
+    def ranked(results, by='accuracy'):
+        """
+        Sorts trial results
+        Args:
+            results (list): Results of run()
+            by (str): 'accuracy' (best validation accuracy first) or 'time' (fastest training first)
+        Returns:
+            list: Sorted results, pruned trials after completed ones when sorting by accuracy,
+                failed trials last
+        """
+        if by == 'accuracy':
+            return sorted(results, key=lambda result: (bool(result.get('error')), result['pruned'],
+                                                       -(result['val_accuracy'] or 0.0)))
+        if by == 'time':
+            return sorted(results, key=lambda result: (bool(result.get('error')), result['train_time']))
+        raise ValueError(f"Unknown sort order: {by}")
+
+    @staticmethod
+    def table(results):
+        """
+        Rows for display or CSV export
+        Args:
+            results (list): Trial results
+        Returns:
+            list: One dict per trial
+        """
+        return [{
+            "Attention": "Yes" if result['use_attention'] else "No",
+            "Batch Size": result['batch_size'],
+            "Learning Rate": result['learning_rate'],
+            "Steps/Call": result['steps_per_execution'],
+            "Epochs": f"{result['epochs_run']}/{result['epochs']}",
+            "Val Accuracy": "-" if result.get('error') else f"{result['val_accuracy']:.2%}",
+            "Train Time (s)": "-" if result.get('error') else f"{result['train_time']:.1f}",
+            "Samples/s": "-" if result.get('error') else f"{result['samples_per_sec']:.0f}",
+            "Status": "failed" if result.get('error') else "pruned" if result['pruned'] else "completed",
+            "Error": result.get('error') or "",
+        } for result in results]
+
+# Per-worker state, set once by _init_worker
+_worker = {}
+
+def _init_worker(data_dir, best, threads):
+    """
+    Loads the shared data and limits TensorFlow threads in a pool worker
+    """
+    from classes.tf_loader import get_tf
+    tf = get_tf()
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+    _worker['X'] = np.load(os.path.join(data_dir, "X.npy"), mmap_mode='r')
+    _worker['y'] = np.load(os.path.join(data_dir, "y.npy"))
+    _worker['best'] = best
+
+def _run_trial(trial, prune_after, prune_margin, validation_split):
+    """
+    Trains one trial in a pool worker
+    Args:
+        trial (dict): Options of this trial
+        prune_after (int): Epochs before pruning is considered, 0 disables pruning
+        prune_margin (float): Accuracy gap to the best trial that prunes this one
+        validation_split (float): Fraction of samples used for validation
+    Returns:
+        dict: The trial options with val_accuracy, epochs_run, train_time, samples_per_sec, pruned and error
+    """
+    from classes.tf_loader import get_tf
+    from classes.model_trainer import ModelTrainer
+    from classes.reporting import ConsoleReporter, set_reporter
+    tf = get_tf()
+    # Trial progress stays out of the parent's output, errors are raised with the trial
+    output = io.StringIO()
+    set_reporter(ConsoleReporter(stream=output))
+    best = _worker['best']
+    state = {'pruned': False}
+
+    class PruningCallback(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            accuracy = float((logs or {}).get('val_accuracy', 0.0))
+            with best.get_lock():
+                leader = best[epoch]
+                best[epoch] = max(leader, accuracy)
+            # Compare with the best trial that reached this epoch before us
+            if prune_after and epoch + 1 >= prune_after and epoch + 1 < trial['epochs'] \
+                    and leader >= 0 and accuracy < leader - prune_margin:
+                state['pruned'] = True
+                self.model.stop_training = True
+
+    model = ModelTrainer.build_model(use_attention=trial['use_attention'],
+                                     steps_per_execution=trial['steps_per_execution'])
+    model.optimizer.learning_rate.assign(trial['learning_rate'])
+    start = time.perf_counter()
+    history = ModelTrainer.train_model(model, np.asarray(_worker['X']), _worker['y'], epochs=trial['epochs'],
+                                       batch_size=trial['batch_size'], validation_split=validation_split,
+                                       callbacks=[PruningCallback()])
+    train_time = time.perf_counter() - start
+    if history is None:
+        errors = [line for line in output.getvalue().splitlines() if line.startswith("ERROR: ")]
+        raise RuntimeError(f"Trial {trial} failed: {errors[-1] if errors else 'no history'}")
+    return dict(trial,
+                val_accuracy=max(history.history['val_accuracy']),
+                epochs_run=len(history.history['val_accuracy']),
+                train_time=train_time,
+                samples_per_sec=float(np.median(history.history['samples_per_sec'])),
+                pruned=state['pruned'],
+                error=None)
@@ -0,0 +1,31 @@
+"""
+TensorFlow Loader Module
+"""
+# Import required libraries
+import os
+import sys
+
+def get_tf():
+    """
+    Imports TensorFlow on first use, so pages and tools that never build or
+    run a Keras model don't pay the multi-second import at startup
+    Returns:
+        module: The tensorflow module
+    """
+    # Suppress TensorFlow C++ logs before the first import
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    # Import here, repeated calls hit the sys.modules cache
+    import tensorflow as tf
+    tf.get_logger().setLevel('ERROR')
+    return tf
+
+def is_keras_model(obj):
+    """
+    Checks for a Keras model without importing TensorFlow
+    Args:
+        obj: Any object
+    Returns:
+        bool: True for tf.keras models (a model object implies TensorFlow is already imported)
+    """
+    tf = sys.modules.get('tensorflow')
+    return tf is not None and isinstance(obj, tf.keras.Model)
@@ -0,0 +1,122 @@
+"""
+TFLiteModel Module
+"""
+# Import required libraries
+import threading
+import numpy as np
+from classes.tf_loader import get_tf
+
+# Prefer the standalone interpreter packages, fall back to full TensorFlow
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        Interpreter = None
+
+# TFLite inference backend
+class TFLiteModel:
+    """
+    Runs an exported .tflite model through the TFLite interpreter behind the same
+    predict()/evaluate() interface as a Keras model, so Predictor can use it as a backend
+    """
+
+    def __init__(self, model_path=None, model_content=None, num_threads=None):
+        """
+        Args:
+            model_path (str): Path to a .tflite file
+            model_content (bytes): .tflite flatbuffer contents, used instead of model_path
+            num_threads (int): Interpreter threads, None for the interpreter default
+        """
+        if model_content is None:
+            with open(model_path, 'rb') as f:
+                model_content = f.read()
+        self.model_content = model_content
+        interpreter_class = Interpreter
+        if interpreter_class is None:
+            interpreter_class = get_tf().lite.Interpreter
+        self.interpreter = interpreter_class(model_content=model_content, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        # The interpreter holds mutable tensors, one invocation at a time
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self):
+        """
+        Size of the flatbuffer in bytes
+        """
+        return len(self.model_content)
+
+    @property
+    def quantization(self):
+        """
+        Input dtype name, 'int8' for fully quantized models
+        """
+        return np.dtype(self.input_details['dtype']).name
+
+    def predict(self, x, verbose=0):
+        """
+        Predicts class probabilities
+        Args:
+            x (np.array): (N, 1, 32, 32, 1) float32 input
+            verbose (int): Ignored, kept for Keras compatibility
+        Returns:
+            np.array: (N, num_classes) float32 probabilities
+        """
+        x = np.asarray(x, dtype='float32')
+        # Exported graphs have a fixed batch dimension, run them batch by batch
+        batch = int(self.input_details['shape'][0])
+        outputs = []
+        with self._lock:
+            for start in range(0, len(x), batch):
+                chunk = x[start:start + batch]
+                padded = len(chunk) < batch
+                if padded:
+                    chunk = np.concatenate([chunk, np.zeros((batch - len(chunk),) + chunk.shape[1:], 'float32')])
+                self.interpreter.set_tensor(self.input_details['index'], self._quantize(chunk))
+                self.interpreter.invoke()
+                output = self._dequantize(self.interpreter.get_tensor(self.output_details['index']))
+                outputs.append(output[:len(x) - start] if padded else output)
+        if not outputs:
+            return np.empty((0, int(self.output_details['shape'][-1])), dtype='float32')
+        return np.concatenate(outputs)
+
+    def evaluate(self, X, y, verbose=0):
+        """
+        Computes sparse categorical crossentropy and accuracy
+        Args:
+            X (np.array): (N, 1, 32, 32, 1) float32 input
+            y (np.array): Zero based labels
+            verbose (int): Ignored, kept for Keras compatibility
+        Returns:
+            list: [loss, accuracy]
+        """
+        probabilities = self.predict(X)
+        y = np.asarray(y).astype(int)
+        picked = probabilities[np.arange(len(y)), y]
+        loss = float(-np.mean(np.log(np.clip(picked, 1e-7, 1.0))))
+        accuracy = float(np.mean(probabilities.argmax(axis=1) == y))
+        return [loss, accuracy]
+
+    def _quantize(self, x):
+        """
+        Maps float input to the interpreter input dtype
+        """
+        dtype = self.input_details['dtype']
+        if np.issubdtype(dtype, np.integer):
+            scale, zero_point = self.input_details['quantization']
+            info = np.iinfo(dtype)
+            return np.clip(np.round(x / scale + zero_point), info.min, info.max).astype(dtype)
+        return x.astype(dtype)
+
+    def _dequantize(self, output):
+        """
+        Maps interpreter output back to float probabilities
+        """
+        if np.issubdtype(output.dtype, np.integer):
+            scale, zero_point = self.output_details['quantization']
+            return (output.astype('float32') - zero_point) * scale
+        return output.astype('float32')
@@ -0,0 +1,452 @@
+"""
+Headless Command-Line Interface
+
+Runs training, hyperparameter sweeps, evaluation, bulk prediction, profiling, an HTTP
+prediction service and TFLite / NumPy export with the same DataHandler / ModelTrainer /
+Predictor classes as the web app, without the Streamlit runtime. Progress and
+errors go to stderr through ConsoleReporter.
+
+Usage:
+    python cli.py train --features train.csv --labels train_labels.csv --output model.keras
+    python cli.py train --manifest shards.json --shard-threads 4 --output model.keras
+    python cli.py evaluate --model model.keras --features test.csv --labels test_labels.csv
+    python cli.py sweep --features train.csv --labels train_labels.csv --attention off,on --batch-sizes 64,128
+    python cli.py predict --model model.keras scans/ crops.zip --output predictions.csv
+    python cli.py profile --model model.keras --batch-size 32 --trace-dir profiles/
+    python cli.py serve --model model.keras --port 8000 --max-batch-size 32 --max-wait-ms 5
+    python cli.py export --model model.keras --quantization int8 --features train.csv --labels train_labels.csv
+    python cli.py export --model model.keras --format npz --output model.npz
+"""
+# Import required libraries
+import os
+# Suppress TensorFlow warnings before it is imported
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+import argparse
+import csv
+import sys
+import time
+import numpy as np
+from classes.config import get_setting
+from classes.data_handler import DataHandler
+from classes.distributed_trainer import DistributedTrainer
+from classes.evaluator import Evaluator
+from classes.inference_server import InferenceServer
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.profiler import ModelProfiler
+from classes.sharded_dataset import ShardedDataset
+from classes.sweep import HyperparameterSweep
+from classes.reporting import ConsoleReporter, get_reporter, set_reporter
+
+def load_any_model(model_path):
+    """
+    Loads a .keras model, a .tflite model through the TFLite backend or a .npz export through the NumPy backend
+    Args:
+        model_path (str): Model file
+    Returns:
+        Loaded model or None
+    """
+    if model_path.endswith('.tflite'):
+        return Predictor.load_model(model_path, backend='tflite')
+    if model_path.endswith('.npz'):
+        return Predictor.load_model(model_path, backend='numpy')
+    return ModelTrainer.load_model(model_path)
+
+def load_dataset(args, dtype):
+    """
+    Loads a features/labels CSV pair named on the command line
+    Args:
+        args (argparse.Namespace): Parsed arguments with features, labels, chunk_size and parser
+        dtype (str): 'uint8' or 'float32'
+    Returns:
+        tuple: (X, y) or (None, None)
+    """
+    stats = {}
+    X, y = DataHandler.load_data(args.features, args.labels, chunk_size=args.chunk_size,
+                                 dtype=dtype, stats=stats, parser=args.parser)
+    if X is not None:
+        get_reporter().info(f"Loaded {stats['rows']} samples in {stats['seconds']:.2f}s "
+                            f"({stats['rows_per_sec']:.0f} rows/s, {stats['parser']} parser)")
+    return X, y
+
+def report_throughput(label, samples, seconds):
+    """
+    Prints the final throughput line
+    """
+    rate = samples / seconds if seconds > 0 else float('inf')
+    print(f"{label}: {samples} samples in {seconds:.2f}s ({rate:.1f} samples/s)")
+
+def cmd_train(args):
+    """
+    Builds, trains and saves a model
+    """
+    if args.manifest:
+        # Shards are streamed from their files, one pass per epoch
+        shard_options = {'threads': args.shard_threads} if args.shard_threads else {}
+        X, y = ShardedDataset.from_manifest(args.manifest, chunk_size=args.chunk_size or DataHandler.CHUNK_SIZE,
+                                            parser=args.parser, **shard_options), None
+    else:
+        X, y = load_dataset(args, 'uint8')
+    if X is None:
+        return 1
+    if args.workers > 1:
+        # Data-parallel training, --batch-size is the per-worker batch
+        start = time.perf_counter()
+        model_path, history = DistributedTrainer.train_model(
+            X, y, num_workers=args.workers, per_worker_batch_size=args.batch_size, epochs=args.epochs,
+            use_attention=args.attention, lr_scaling=args.lr_scaling, model_path=args.output)
+        seconds = time.perf_counter() - start
+        if history is None:
+            return 1
+        mode = f"{args.workers} workers"
+    else:
+        if args.base_model:
+            # Continue training an existing model
+            model = ModelTrainer.load_model(args.base_model)
+        else:
+            model = ModelTrainer.build_model(use_attention=args.attention, jit_compile=True if args.xla else 'auto',
+                                             steps_per_execution=args.steps_per_execution)
+        if model is None:
+            return 1
+        start = time.perf_counter()
+        profile_options = dict(profile_dir=args.profile_dir,
+                               profile_batches=tuple(int(batch) for batch in args.profile_batches.split(',')))
+        if args.base_model:
+            history = ModelTrainer.fine_tune(model, X, y, epochs=args.epochs, learning_rate=args.learning_rate,
+                                             batch_size=args.batch_size, use_tf_data=args.tf_data,
+                                             checkpoint_dir=args.checkpoint_dir, **profile_options)
+        else:
+            history = ModelTrainer.train_model(model, X, y, epochs=args.epochs, batch_size=args.batch_size,
+                                               use_tf_data=args.tf_data, checkpoint_dir=args.checkpoint_dir,
+                                               **profile_options)
+        seconds = time.perf_counter() - start
+        if history is None:
+            return 1
+        model_path = ModelTrainer.save_model(model, args.output)
+        if model_path is None:
+            return 1
+        mode = ModelTrainer.compile_mode(model)
+        if args.profile_dir:
+            print_layer_profile(ModelProfiler.layer_profile(model))
+            get_reporter().info(f"Profiler trace written to {args.profile_dir}")
+    get_reporter().info(f"Model saved to {model_path}")
+    # Samples seen by training steps (validation samples excluded)
+    epochs_run = len(history.history['loss'])
+    train_samples = X.rows_read['train'] if args.manifest else int(len(X) * 0.8) * epochs_run
+    report_throughput(f"Training ({epochs_run} epochs, {mode})", train_samples, seconds)
+    return 0
+
+def cmd_evaluate(args):
+    """
+    Evaluates a model on a labelled dataset
+    """
+    model = load_any_model(args.model)
+    X, y = load_dataset(args, 'float32')
+    if model is None or X is None:
+        return 1
+    # One batched pass gives loss, accuracy, top-k and per-class metrics
+    report = Evaluator.evaluate_model(model, X, y, batch_size=args.batch_size)
+    if report is None:
+        return 1
+    seconds = report['eval_time']
+    print(f"Test Loss: {report['loss']:.4f}")
+    print(f"Test Accuracy: {report['accuracy']:.4f}")
+    for k, accuracy in report['top_k'].items():
+        print(f"Top-{k} Accuracy: {accuracy:.4f}")
+    # Characters the model gets wrong most often
+    worst = np.argsort(report['recall'])[:3]
+    print("Lowest Recall: " + ", ".join(f"{Predictor.characters[i]} {report['recall'][i]:.2%}" for i in worst))
+    report_throughput("Evaluation", len(X), seconds)
+    return 0
+
+def cmd_sweep(args):
+    """
+    Trains every combination of the given options in parallel and ranks them
+    """
+    X, y = load_dataset(args, 'uint8')
+    if X is None:
+        return 1
+    space = {
+        'use_attention': [value == 'on' for value in args.attention.split(',')],
+        'batch_size': [int(value) for value in args.batch_sizes.split(',')],
+        'epochs': [int(value) for value in args.epochs.split(',')],
+        'learning_rate': [float(value) for value in args.learning_rates.split(',')],
+    }
+    start = time.perf_counter()
+    results = HyperparameterSweep.run(X, y, space, workers=args.workers, prune_after=args.prune_after,
+                                      prune_margin=args.prune_margin)
+    if results is None:
+        return 1
+    seconds = time.perf_counter() - start
+    # Print the table twice: best accuracy first, then fastest first
+    for by in ('accuracy', 'time'):
+        rows = HyperparameterSweep.table(HyperparameterSweep.ranked(results, by=by))
+        print(f"\nTrials by {by}:")
+        print("  ".join(f"{column:>14}" for column in rows[0]))
+        for row in rows:
+            print("  ".join(f"{value:>14}" for value in map(str, row.values())))
+    pruned = sum(result['pruned'] for result in results)
+    failed = sum(bool(result['error']) for result in results)
+    print(f"\n{len(results)} trials ({pruned} pruned, {failed} failed) in {seconds:.1f}s, "
+          f"{sum(result['train_time'] for result in results):.1f}s of trial training time")
+    if args.output:
+        # Rows sorted by accuracy
+        rows = HyperparameterSweep.table(HyperparameterSweep.ranked(results))
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+def cmd_predict(args):
+    """
+    Predicts every image in the given files, directories and zip archives
+    """
+    model = load_any_model(args.model)
+    if model is None:
+        return 1
+    results = Predictor.predict_batch(model, args.inputs, batch_size=args.batch_size,
+                                      top_k=args.top_k, workers=args.workers)
+    if results is None:
+        return 1
+    # Write one row per image
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(['image', 'predicted', 'confidence', f'top_{args.top_k}'])
+        for name, labels, confidence in zip(results['names'], results['top_k_labels'], results['confidences']):
+            writer.writerow([name, labels[0], f"{confidence:.4f}", " ".join(labels)])
+    finally:
+        if args.output:
+            output.close()
+    for name in results['failed']:
+        get_reporter().warning(f"Skipped unreadable file {name}")
+    timings = results['timings']
+    get_reporter().info(f"Preprocess {timings['preprocess']:.2f}s, inference {timings['inference']:.2f}s")
+    report_throughput("Prediction", len(results['names']), timings['total'])
+    return 0
+
+def cmd_serve(args):
+    """
+    Serves predictions over HTTP with micro-batching
+    """
+    model = load_any_model(args.model)
+    if model is None:
+        return 1
+    server = InferenceServer(model, host=args.host, port=args.port, max_batch_size=args.max_batch_size,
+                             max_wait_ms=args.max_wait_ms, top_k=args.top_k)
+    get_reporter().info(f"Serving {args.model} on {server.url} "
+                        f"(batches of up to {args.max_batch_size}, {args.max_wait_ms} ms max wait)")
+    server.serve_forever()
+    return 0
+
+def cmd_export(args):
+    """
+    Exports a model to TFLite or NumPy (.npz), comparing it with the Keras model when data is given
+    """
+    model = ModelTrainer.load_model(args.model)
+    if model is None:
+        return 1
+    X = y = None
+    if args.features and args.labels:
+        X, y = load_dataset(args, 'uint8')
+        if X is None:
+            return 1
+    if args.format == 'npz':
+        start = time.perf_counter()
+        numpy_path = ModelTrainer.export_numpy(model, args.output)
+        if numpy_path is None:
+            return 1
+        print(f"Exported {numpy_path} in {time.perf_counter() - start:.2f}s")
+        if X is not None:
+            report = ModelTrainer.compare_numpy(model, numpy_path, X, y)
+            for key, value in report.items():
+                print(f"{key}: {value:.6g}")
+            report_throughput("NumPy inference (single sample)", 1, report['numpy_latency_ms'] / 1000)
+        return 0
+    quantization = None if args.quantization == 'none' else args.quantization
+    # Calibrate on the first 80%, compare on the held-out last 20% (the training validation split)
+    split_at = int(len(X) * 0.8) if X is not None else 0
+    start = time.perf_counter()
+    tflite_path = ModelTrainer.export_tflite(model, args.output, quantization=quantization,
+                                             calibration_data=X[:split_at] if X is not None else None)
+    if tflite_path is None:
+        return 1
+    print(f"Exported {tflite_path} in {time.perf_counter() - start:.2f}s")
+    if X is not None:
+        report = ModelTrainer.compare_tflite(model, tflite_path, X[split_at:], y[split_at:])
+        for key, value in report.items():
+            print(f"{key}: {value:.4f}")
+        report_throughput("TFLite inference (single sample)", 1, report['tflite_latency_ms'] / 1000)
+    return 0
+
+def print_layer_profile(profile):
+    """
+    Prints a per-layer and per-block latency and FLOPs table
+    Args:
+        profile (dict): ModelProfiler.layer_profile result
+    """
+    print(f"{'layer':<26}{'type':<24}{'block':<13}{'params':>9}{'MFLOPs':>10}{'ms':>9}{'share':>8}")
+    for row in profile['layers']:
+        print(f"{row['layer']:<26}{row['type']:<24}{row['block']:<13}{row['params']:>9}"
+              f"{row['flops'] / 1e6:>10.2f}{row['latency_ms']:>9.3f}{row['share']:>8.1%}")
+    print()
+    for block in ModelProfiler.block_summary(profile):
+        print(f"{block['block']:<63}{block['params']:>9}{block['flops'] / 1e6:>10.2f}"
+              f"{block['latency_ms']:>9.3f}{block['share']:>8.1%}")
+    print(f"\nWhole model, batch of {profile['batch_size']}: {profile['model_latency_ms']:.3f} ms per call")
+
+def cmd_profile(args):
+    """
+    Prints the per-layer cost of a model, optionally tracing a few predictions
+    """
+    if args.model:
+        model = ModelTrainer.load_model(args.model)
+    else:
+        # Cost of the architecture alone, weights do not change it
+        model = ModelTrainer.build_model(use_attention=args.attention)
+    if model is None:
+        return 1
+    profile = ModelProfiler.layer_profile(model, batch_size=args.batch_size, runs=args.runs)
+    print_layer_profile(profile)
+    if args.trace_dir:
+        sample = np.random.rand(args.batch_size, 1, 32, 32, 1).astype('float32')
+        predict_fn = Predictor.get_predict_fn(model)
+        predict_fn(sample)
+        with ModelProfiler.trace(args.trace_dir):
+            for _ in range(args.steps):
+                predict_fn(sample).numpy()
+        get_reporter().info(f"Profiler trace of {args.steps} predictions written to {args.trace_dir}")
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(profile['layers'][0]))
+            writer.writeheader()
+            writer.writerows(profile['layers'])
+    return 0
+
+def build_parser():
+    """
+    Builds the argument parser
+    Returns:
+        argparse.ArgumentParser: Parser with train/sweep/evaluate/predict/profile/serve/export subcommands
+    """
+    parser = argparse.ArgumentParser(description="Arabic handwriting recognition batch tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_dataset_args(subparser, required=True):
+        subparser.add_argument('--features', required=required, help="Features CSV (1024 pixel columns)")
+        subparser.add_argument('--labels', required=required, help="Labels CSV (1-28)")
+        subparser.add_argument('--chunk-size', type=int, default=DataHandler.CHUNK_SIZE,
+                               help="CSV rows parsed per chunk (0 reads the whole file at once)")
+        subparser.add_argument('--parser', choices=DataHandler.PARSERS, default=None,
+                               help="CSV parser backend (default: CSV_PARSER secret, else pandas)")
+
+    # Train subcommand
+    train = subparsers.add_parser('train', help="Build and train a model")
+    add_dataset_args(train, required=False)
+    train.add_argument('--manifest', help="JSON manifest of feature/label shards, streamed instead of --features")
+    train.add_argument('--shard-threads', type=int, help="Shards read in parallel (default: SHARD_READ_THREADS)")
+    train.add_argument('--epochs', type=int, default=20)
+    train.add_argument('--batch-size', type=int, default=128)
+    train.add_argument('--attention', action='store_true', help="Add the attention mechanism")
+    train.add_argument('--tf-data', action='store_true', help="Use the tf.data streaming pipeline")
+    train.add_argument('--xla', action='store_true', help="Compile the training step with XLA")
+    train.add_argument('--steps-per-execution', type=int, default=1, help="Training steps per tf.function call")
+    train.add_argument('--checkpoint-dir', help="Checkpoint every epoch here, rerunning with it resumes the run")
+    train.add_argument('--base-model', help="Continue training this .keras model instead of building a new one")
+    train.add_argument('--learning-rate', type=float, default=1e-4, help="Learning rate with --base-model")
+    train.add_argument('--workers', type=int, default=1, help="Data-parallel worker processes (batch size is per worker)")
+    train.add_argument('--lr-scaling', choices=DistributedTrainer.LR_SCALINGS, default='linear',
+                       help="Learning rate scaling with the worker count")
+    train.add_argument('--profile-dir', help="Trace a window of training steps here and print the per-layer cost")
+    train.add_argument('--profile-batches', default="2,6", help="First and last traced batch, e.g. 2,6")
+    train.add_argument('--output', default='model.keras', help="Where to save the trained model")
+    train.set_defaults(func=cmd_train)
+    # Evaluate subcommand
+    evaluate = subparsers.add_parser('evaluate', help="Evaluate a model on labelled data")
+    evaluate.add_argument('--model', required=True, help=".keras or .tflite model")
+    add_dataset_args(evaluate)
+    evaluate.add_argument('--batch-size', type=int, default=256)
+    evaluate.set_defaults(func=cmd_evaluate)
+    # Sweep subcommand
+    sweep = subparsers.add_parser('sweep', help="Train option combinations in parallel with early pruning")
+    add_dataset_args(sweep)
+    sweep.add_argument('--attention', default='off,on', help="Attention settings to try (off, on)")
+    sweep.add_argument('--batch-sizes', default='64,128', help="Comma-separated batch sizes")
+    sweep.add_argument('--epochs', default='10', help="Comma-separated epoch counts")
+    sweep.add_argument('--learning-rates', default='1e-3', help="Comma-separated learning rates")
+    sweep.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Trials trained at the same time")
+    sweep.add_argument('--prune-after', type=int, default=3, help="Epochs before a trial can be pruned (0 disables)")
+    sweep.add_argument('--prune-margin', type=float, default=0.05,
+                       help="Validation accuracy gap to the best trial that prunes a trial")
+    sweep.add_argument('--output', help="CSV file for the results table")
+    sweep.set_defaults(func=cmd_sweep)
+    # Predict subcommand
+    predict = subparsers.add_parser('predict', help="Predict images, directories or zip archives")
+    predict.add_argument('--model', required=True, help=".keras or .tflite model")
+    predict.add_argument('inputs', nargs='+', help="Image files, directories or zip archives")
+    predict.add_argument('--batch-size', type=int, default=256)
+    predict.add_argument('--top-k', type=int, default=3)
+    predict.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                         help="Preprocessing threads (0 for serial)")
+    predict.add_argument('--output', help="CSV output file (stdout if omitted)")
+    predict.set_defaults(func=cmd_predict)
+    # Profile subcommand
+    profile = subparsers.add_parser('profile', help="Per-layer latency and FLOPs of a model")
+    profile.add_argument('--model', help=".keras model, a new untrained model if omitted")
+    profile.add_argument('--attention', action='store_true', help="Profile the attention variant (without --model)")
+    profile.add_argument('--batch-size', type=int, default=1)
+    profile.add_argument('--runs', type=int, default=20, help="Timed calls per layer")
+    profile.add_argument('--trace-dir', help="Also write a profiler trace of --steps predictions here")
+    profile.add_argument('--steps', type=int, default=10)
+    profile.add_argument('--output', help="Per-layer CSV output file")
+    profile.set_defaults(func=cmd_profile)
+    # Serve subcommand
+    serve = subparsers.add_parser('serve', help="Serve predictions over HTTP with micro-batching")
+    serve.add_argument('--model', required=True, help=".keras or .tflite model")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--max-batch-size', type=int, default=int(get_setting("SERVE_MAX_BATCH_SIZE", 32)),
+                       help="Requests combined into one inference call (1 disables batching)")
+    serve.add_argument('--max-wait-ms', type=float, default=float(get_setting("SERVE_MAX_WAIT_MS", 5)),
+                       help="Longest time a request waits for others to join its batch")
+    serve.add_argument('--top-k', type=int, default=3)
+    serve.set_defaults(func=cmd_serve)
+    # Export subcommand
+    export = subparsers.add_parser('export', help="Export a model to TFLite or NumPy")
+    export.add_argument('--model', required=True, help=".keras model")
+    export.add_argument('--format', choices=['tflite', 'npz'], default='tflite',
+                        help="tflite, or npz for the TensorFlow-free NumPy backend")
+    export.add_argument('--quantization', choices=['none', 'dynamic', 'float16', 'int8'], default='dynamic')
+    add_dataset_args(export, required=False)
+    export.add_argument('--output', help="Where to write the .tflite / .npz file")
+    export.set_defaults(func=cmd_export)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'chunk_size', None) == 0:
+        args.chunk_size = None
+    if args.command == 'train' and not args.manifest and not (args.features and args.labels):
+        print("train needs --features/--labels or --manifest", file=sys.stderr)
+        return 2
+    if args.command == 'train' and args.workers > 1:
+        # Data-parallel workers build and train their own model on in-memory arrays
+        unsupported = [flag for flag, used in (
+            ('--manifest', args.manifest), ('--base-model', args.base_model),
+            ('--checkpoint-dir', args.checkpoint_dir), ('--xla', args.xla),
+            ('--steps-per-execution', args.steps_per_execution != 1), ('--tf-data', args.tf_data),
+            ('--profile-dir', args.profile_dir)) if used]
+        if unsupported:
+            parser.error(f"--workers is not supported with {', '.join(unsupported)}")
+    if args.command == 'export' and args.format == 'tflite' and args.quantization == 'int8' and not args.features:
+        print("int8 export needs --features/--labels for calibration", file=sys.stderr)
+        return 2
+    # Console output instead of Streamlit elements
+    set_reporter(ConsoleReporter())
+    return args.func(args)
+
+# Run main function when script is executed
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,142 +1,278 @@
-
-"""
-Prediction Page Module
-"""
-# Import required libraries
-import streamlit as st
-import tensorflow as tf
-from PIL import Image
-from classes.predictor import Predictor
-from classes.model_trainer import ModelTrainer
-from streamlit_drawable_canvas import st_canvas
-import tempfile
-import os
-
-def show():
-    # Set page title with emoji
-    st.title("🔮 Character Prediction")
-    
-    # Model upload option
-    st.header("1. Load Model")
-    uploaded_model = st.file_uploader("Upload Trained Model (.keras)", 
-                                    type=['keras'],
-                                    accept_multiple_files=False
-                                    )
-    
-    if uploaded_model is not None:
-        try:
-            # Save uploaded model to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.keras') as tmp:
-                tmp.write(uploaded_model.getbuffer())
-                tmp_path = tmp.name
-            # Load using ModelTrainer's load_model method
-            st.session_state.model = ModelTrainer.load_model(tmp_path)
-            if st.session_state.model:
-                st.success("✅ Model loaded successfully!")
-            else:
-                st.error("Failed to load model")
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
-        finally:
-            # Clean up temp file
-            if 'tmp_path' in locals():
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
-            
-    # Check if model is available
-    if st.session_state.model is None:
-        # Show warning if no model
-        st.warning("⚠️ Please train or upload a model first!")
-        return
-        
-    # Display prediction instructions
-    st.info("""
-    **Prediction Instructions:**
-    1. Choose input method
-    2. Draw or upload character
-    3. Get prediction
-    """)
-    
-    # Horizontal radio buttons
-    input_method = st.radio("Select Input Method", 
-                          ["🖌️ Draw Character", "📁 Upload Image"],
-                          index=0,
-                          horizontal=True)
-    
-    # Drawing canvas option
-    if input_method == "🖌️ Draw Character":
-        st.header("2. Draw Your Character ✍️")
-        # Use a unique key for the canvas widget
-        if "canvas_key" not in st.session_state:
-            st.session_state.canvas_key = "canvas_initial"
-        # Create drawing canvas with the current key
-        canvas = st_canvas(
-            stroke_width=25,
-            stroke_color="#000000",
-            background_color="#FFFFFF",
-            height=320,
-            width=320,
-            drawing_mode="freedraw",
-            key=st.session_state.canvas_key
-        )  
-
-        # Create action buttons
-        col1, col2 = st.columns(2)
-        with col1:
-            # Predict button for drawn image
-            if st.button("🔮 Predict Drawing"):
-                if canvas.image_data is not None:
-                    # Convert canvas to image
-                    img = Image.fromarray(canvas.image_data.astype('uint8'), 'RGBA')
-                    # Preprocess drew character and make prediction
-                    pred_class, confidence, processed_img = Predictor.predict_image(
-                        st.session_state.model, img
-                    )                 
-                    # Display results if prediction successful
-                    if pred_class is not None:
-                        st.subheader("🎯 Prediction Result")
-                        Predictor.display_results(processed_img, pred_class, 
-                                                 confidence, Predictor.characters)
-                else:
-                    st.warning(f"⚠️ Please draw a character on the canvas first")
-        with col2:
-            # Clear canvas button
-            if st.button("🧹 Clear Canvas"):
-                # Reset the canvas by changing its key
-                st.session_state.canvas_key = f"canvas_{hash(st.session_state.canvas_key)}"
-                # Refresh the page
-                st.rerun()  
-    # Image upload option
-    else:
-        st.header("2. Upload Character Image In (jpg / png/ jpeg) Format📤")
-        # File uploader
-        uploaded_file = st.file_uploader("Choose an image", 
-                                       type=["jpg", "png", "jpeg"])
-        
-        # If file is uploaded
-        if uploaded_file is not None:
-            # Open and display image
-            img = Image.open(uploaded_file)
-            st.image(img, caption="Uploaded Image", width=200)
-            
-            # Predict button for uploaded image
-            if st.button("🔮 Predict Uploaded Image"):
-                # Error handler
-                try:
-                    # Make prediction
-                    pred_class, confidence, processed_img = Predictor.predict_image(
-                        st.session_state.model, img
-                    )
-                    
-                    # Display results if prediction successful
-                    if pred_class is not None:
-                        st.subheader("🎯 Prediction Result")
-                        Predictor.display_results(processed_img, pred_class,
-                                                confidence, Predictor.characters)
-                except Exception as e:
-                    st.error(f"❌ Prediction Error: {str(e)}")
-        else:
-            st.warning(f"Pleas, upload an image of a character first")
-
+
+"""
+Prediction Page Module
+"""
+# Import required libraries
+import streamlit as st
+import pandas as pd
+from PIL import Image, ImageDraw
+from classes.predictor import Predictor
+from classes.model_cache import ModelCache
+from classes.prediction_cache import PredictionCache
+from classes.segmenter import Segmenter
+from classes.profiler import ModelProfiler
+from classes.tf_loader import is_keras_model
+from streamlit_drawable_canvas import st_canvas
+import os
+import uuid
+
+def show():
+    # Set page title with emoji
+    st.title("🔮 Character Prediction")
+    
+    # Model upload option
+    st.header("1. Load Model")
+    uploaded_model = st.file_uploader("Upload Trained Model (.keras, .tflite for the TFLite backend or .npz for the NumPy backend)", 
+                                    type=['keras', 'tflite', 'npz'],
+                                    accept_multiple_files=False
+                                    )
+    
+    if uploaded_model is not None:
+        try:
+            # Loaded models are cached by content hash, so reruns reuse the same instance
+            model_cache = ModelCache.shared()
+            model = model_cache.load(uploaded_model)
+            if model is not None:
+                st.session_state.model = model
+                st.success("✅ Model loaded successfully!")
+                # Show cache counters
+                cache_stats = model_cache.stats()
+                st.caption(f"Model cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                           f"{cache_stats['entries']} models")
+            else:
+                st.error("Failed to load model")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            
+    # Check if model is available
+    if st.session_state.model is None:
+        # Show warning if no model
+        st.warning("⚠️ Please train or upload a model first!")
+        return
+        
+    # Results are cached per model and preprocessed input, entries of a replaced model are
+    # dropped once no other session predicts with it
+    prediction_cache = PredictionCache.shared()
+    fingerprint = prediction_cache.model_fingerprint(st.session_state.model)
+    if not st.session_state.get('prediction_session_id'):
+        st.session_state.prediction_session_id = uuid.uuid4().hex
+    prediction_cache.use_model(st.session_state.prediction_session_id, fingerprint)
+
+    # Optional profiler trace of single predictions and per-layer cost of the model
+    profile_dir = None
+    if st.checkbox("🩺 Profile predictions (trace + per-layer cost)"):
+        if not st.session_state.get('prediction_profile_dir'):
+            st.session_state.prediction_profile_dir = ModelProfiler.run_dir()
+        profile_dir = st.session_state.prediction_profile_dir
+        # Layer timings need the Keras layers, measured once per model
+        layer_profile = st.session_state.get('layer_profile') or {}
+        if is_keras_model(st.session_state.model) and layer_profile.get('fingerprint') != fingerprint:
+            with st.spinner("Timing each layer..."):
+                st.session_state.layer_profile = dict(ModelProfiler.layer_profile(st.session_state.model),
+                                                      trace_dir=profile_dir, fingerprint=fingerprint)
+        st.caption(f"Drawn and uploaded predictions skip the cache and are traced to `{profile_dir}`, "
+                   "the per-layer cost is shown on the Results page")
+
+    # Display prediction instructions
+    st.info("""
+    **Prediction Instructions:**
+    1. Choose input method
+    2. Draw or upload character
+    3. Get prediction
+    """)
+    
+    # Horizontal radio buttons
+    input_method = st.radio("Select Input Method", 
+                          ["🖌️ Draw Character", "📁 Upload Image", "🗂️ Batch Upload", "📜 Word / Line Image"],
+                          index=0,
+                          horizontal=True)
+    
+    # Drawing canvas option
+    if input_method == "🖌️ Draw Character":
+        st.header("2. Draw Your Character ✍️")
+        # Use a unique key for the canvas widget
+        if "canvas_key" not in st.session_state:
+            st.session_state.canvas_key = "canvas_initial"
+        # Create drawing canvas with the current key
+        canvas = st_canvas(
+            stroke_width=25,
+            stroke_color="#000000",
+            background_color="#FFFFFF",
+            height=320,
+            width=320,
+            drawing_mode="freedraw",
+            key=st.session_state.canvas_key
+        )  
+
+        # Create action buttons
+        col1, col2 = st.columns(2)
+        with col1:
+            # Predict button for drawn image
+            if st.button("🔮 Predict Drawing"):
+                if canvas.image_data is not None:
+                    # Convert canvas to image
+                    img = Image.fromarray(canvas.image_data.astype('uint8'), 'RGBA')
+                    # Preprocess drew character and make prediction
+                    pred_class, confidence, processed_img = Predictor.predict_image(
+                        st.session_state.model, img, fast=True, cache=None if profile_dir else prediction_cache,
+                        profile_dir=profile_dir
+                    )                 
+                    # Display results if prediction successful
+                    if pred_class is not None:
+                        st.subheader("🎯 Prediction Result")
+                        Predictor.display_results(processed_img, pred_class, 
+                                                 confidence, Predictor.characters)
+                else:
+                    st.warning(f"⚠️ Please draw a character on the canvas first")
+        with col2:
+            # Clear canvas button
+            if st.button("🧹 Clear Canvas"):
+                # Reset the canvas by changing its key
+                st.session_state.canvas_key = f"canvas_{hash(st.session_state.canvas_key)}"
+                # Refresh the page
+                st.rerun()  
+    # Batch upload option
+    elif input_method == "🗂️ Batch Upload":
+        st.header("2. Upload Many Character Images or a Zip Archive 🗂️")
+        # Multi-file uploader
+        uploaded_files = st.file_uploader("Choose images or zip archives",
+                                        type=["jpg", "png", "jpeg", "zip"],
+                                        accept_multiple_files=True)
+        # Inference options
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            batch_size = st.number_input("Batch Size", min_value=1, max_value=4096, value=256)
+        with col2:
+            top_k = st.number_input("Top-k Labels", min_value=1, max_value=len(Predictor.characters), value=3)
+        with col3:
+            # 0 keeps decoding serial, otherwise decoding overlaps inference
+            workers = st.number_input("Preprocessing Workers", min_value=0, max_value=64,
+                                      value=min(os.cpu_count() or 1, 8))
+        
+        # If files are uploaded
+        if uploaded_files:
+            # Predict button for the whole batch
+            if st.button("🔮 Predict All"):
+                with st.spinner("Predicting..."):
+                    results = Predictor.predict_batch(st.session_state.model, uploaded_files,
+                                                      batch_size=int(batch_size), top_k=int(top_k),
+                                                      workers=int(workers), cache=prediction_cache)
+                # Display results if prediction successful
+                if results is not None:
+                    st.subheader(f"🎯 Prediction Results ({len(results['names'])} images)")
+                    table = pd.DataFrame({
+                        'Image': results['names'],
+                        'Predicted': results['top_k_labels'][:, 0],
+                        'Confidence': results['confidences'],
+                        f'Top {int(top_k)}': [" ".join(labels) for labels in results['top_k_labels']],
+                    })
+                    st.dataframe(table, use_container_width=True)
+                    # Show per-stage timings
+                    timings = results['timings']
+                    st.caption(f"⏱️ Preprocess: {timings['preprocess']:.2f}s, "
+                               f"Inference: {timings['inference']:.2f}s, Total: {timings['total']:.2f}s "
+                               f"({timings['images'] / max(timings['total'], 1e-9):.0f} images/s)")
+                    # Offer the table as CSV
+                    st.download_button(
+                        label="📥 Download Predictions (CSV)",
+                        data=table.to_csv(index=False).encode('utf-8'),
+                        file_name="predictions.csv",
+                        mime="text/csv"
+                    )
+                    if results['failed']:
+                        st.warning(f"⚠️ Skipped {len(results['failed'])} unreadable files: "
+                                   f"{', '.join(results['failed'])}")
+        else:
+            st.warning("Please, upload character images or a zip archive first")
+    # Word or line segmentation option
+    elif input_method == "📜 Word / Line Image":
+        st.header("2. Upload a Scanned Word or Line 📜")
+        uploaded_file = st.file_uploader("Choose a word or line image", type=["jpg", "png", "jpeg"])
+        # Segmentation options
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            min_area = st.number_input("Minimum Component Area (px)", min_value=1, max_value=10000,
+                                       value=Segmenter.MIN_AREA)
+        with col2:
+            diacritic_ratio = st.slider("Diacritic Size (fraction of median)", 0.05, 0.9,
+                                        Segmenter.DIACRITIC_RATIO, 0.05)
+        with col3:
+            word_gap = st.slider("Word Gap (fraction of letter height)", 0.1, 3.0, Segmenter.WORD_GAP, 0.1)
+        split_wide = st.checkbox("Split connected letters at thin strokes", value=True)
+        
+        # If file is uploaded
+        if uploaded_file is not None:
+            img = Image.open(uploaded_file)
+            if st.button("🔮 Segment and Predict"):
+                with st.spinner("Segmenting..."):
+                    results = Predictor.predict_segmented(
+                        st.session_state.model, img, top_k=3, cache=prediction_cache,
+                        min_area=int(min_area), diacritic_ratio=diacritic_ratio, word_gap=word_gap,
+                        split_ratio=Segmenter.SPLIT_RATIO if split_wide else 0
+                    )
+                # Display results if prediction successful
+                if results is not None:
+                    regions = results['regions']
+                    st.subheader(f"🎯 Recognised Text ({len(regions)} characters)")
+                    st.markdown(f"<div dir='rtl' style='font-size:2em'>{results['text'].replace(chr(10), '<br>')}</div>",
+                                unsafe_allow_html=True)
+                    # Outline each character region with its reading-order number
+                    overlay = img.convert("RGB")
+                    draw = ImageDraw.Draw(overlay)
+                    for index, region in enumerate(regions):
+                        draw.rectangle(region['bbox'], outline="#e63946", width=2)
+                        draw.text((region['bbox'][0], region['bbox'][1]), str(index + 1), fill="#1d3557")
+                    st.image(overlay, caption="Segmented characters")
+                    table = pd.DataFrame({
+                        'Character': range(1, len(regions) + 1),
+                        'Line': [region['line'] + 1 for region in regions],
+                        'Word': [region['word'] + 1 for region in regions],
+                        'Predicted': results['top_k_labels'][:, 0],
+                        'Confidence': results['confidences'],
+                        'Top 3': [" ".join(labels) for labels in results['top_k_labels']],
+                    })
+                    st.dataframe(table, use_container_width=True)
+                    # Show per-stage timings
+                    timings = results['timings']
+                    st.caption(f"⏱️ Segmentation: {timings['segment']:.2f}s, "
+                               f"Inference: {timings['inference']:.2f}s, Total: {timings['total']:.2f}s")
+        else:
+            st.warning("Please, upload an image of a word or line first")
+    # Image upload option
+    else:
+        st.header("2. Upload Character Image In (jpg / png/ jpeg) Format📤")
+        # File uploader
+        uploaded_file = st.file_uploader("Choose an image", 
+                                       type=["jpg", "png", "jpeg"])
+        
+        # If file is uploaded
+        if uploaded_file is not None:
+            # Open and display image
+            img = Image.open(uploaded_file)
+            st.image(img, caption="Uploaded Image", width=200)
+            
+            # Predict button for uploaded image
+            if st.button("🔮 Predict Uploaded Image"):
+                # Error handler
+                try:
+                    # Make prediction
+                    pred_class, confidence, processed_img = Predictor.predict_image(
+                        st.session_state.model, img, fast=True, cache=None if profile_dir else prediction_cache,
+                        profile_dir=profile_dir
+                    )
+                    
+                    # Display results if prediction successful
+                    if pred_class is not None:
+                        st.subheader("🎯 Prediction Result")
+                        Predictor.display_results(processed_img, pred_class,
+                                                confidence, Predictor.characters)
+                except Exception as e:
+                    st.error(f"❌ Prediction Error: {str(e)}")
+        else:
+            st.warning(f"Pleas, upload an image of a character first")
+
+    # Show prediction cache counters
+    cache_stats = prediction_cache.stats()
+    if cache_stats['hits'] + cache_stats['misses']:
+        st.caption(f"Prediction cache: {cache_stats['hit_rate']:.0%} hit rate "
+                   f"({cache_stats['hits']} hits / {cache_stats['misses']} misses, {cache_stats['entries']} results)")
@@ -1,80 +1,241 @@
-
-"""
-Results Page Module
-"""
-import streamlit as st
-import matplotlib.pyplot as plt
-import io
-import zipfile
-
-def show():
-    # Set page title
-    st.title("Training Results")
-    
-    # Check if training history exists
-    if not st.session_state.train_history:
-        # Show warning if no training data
-        st.warning("No training results available! Train and Test The Model First!")
-        return
-        
-    # Create header for training metrics section
-    st.header("Training Metrics")
-    
-    # Create figure with two subplots
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
-    
-    # Plot training and validation loss on first subplot
-    ax1.plot(st.session_state.train_history.history['loss'], label='Train Loss')
-    ax1.plot(st.session_state.train_history.history['val_loss'], label='Val Loss')
-    
-    # Set title and legend for loss plot
-    ax1.set_title('Loss Curve')
-    ax1.legend()
-    
-    # Plot training and validation accuracy on second subplot
-    ax2.plot(st.session_state.train_history.history['accuracy'], label='Train Acc')
-    ax2.plot(st.session_state.train_history.history['val_accuracy'], label='Val Acc')
-    
-    # Set title and legend for accuracy plot
-    ax2.set_title('Accuracy Curve')
-    ax2.legend()
-    
-    # Display the matplotlib figure in Streamlit
-    st.pyplot(fig)
-    
-    # Create export results button
-    if st.button("Export Results"):
-        # Create in-memory bytes buffer
-        buf = io.BytesIO()
-        
-        # Create zip file in memory
-        with zipfile.ZipFile(buf, 'w') as zipf:
-            # Save plots to PNG file
-            fig.savefig("training_metrics.png")
-            
-            # Add plot image to zip
-            zipf.write("training_metrics.png")
-            
-            # Check if test metrics exist
-            if st.session_state.test_metrics:
-                # Create text file with test results
-                with open("test_results.txt", "w") as f:
-                    # Write test loss to file
-                    f.write(f"Test Loss: {st.session_state.test_metrics['loss']:.4f}\n")
-                    # Write test accuracy to file
-                    f.write(f"Test Accuracy: {st.session_state.test_metrics['accuracy']:.4f}")
-                
-                # Add test results file to zip
-                zipf.write("test_results.txt")
-            
-        # Reset buffer position
-        buf.seek(0)
-        
-        # Create download button for zip file
-        st.download_button(
-            label="Download Results",
-            data=buf,
-            file_name="model_results.zip",
-            mime="application/zip"
-        )
-        
\ No newline at end of file
+
+"""
+Results Page Module
+"""
+import streamlit as st
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+from classes.predictor import Predictor
+from classes.profiler import ModelProfiler
+
+def show():
+    # Set page title
+    st.title("Training Results")
+    
+    # Check if training history exists
+    if not st.session_state.train_history:
+        # A profile taken on the Predict page can be shown without training results
+        if st.session_state.get('layer_profile'):
+            show_layer_profile(st.session_state.layer_profile)
+        # Show warning if no training data
+        st.warning("No training results available! Train and Test The Model First!")
+        return
+        
+    # Import matplotlib only when there is something to plot
+    import matplotlib.pyplot as plt
+    # Create header for training metrics section
+    st.header("Training Metrics")
+    
+    # Create figure with two subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+    
+    # Plot training and validation loss on first subplot
+    ax1.plot(st.session_state.train_history.history['loss'], label='Train Loss')
+    ax1.plot(st.session_state.train_history.history['val_loss'], label='Val Loss')
+    
+    # Set title and legend for loss plot
+    ax1.set_title('Loss Curve')
+    ax1.legend()
+    
+    # Plot training and validation accuracy on second subplot
+    ax2.plot(st.session_state.train_history.history['accuracy'], label='Train Acc')
+    ax2.plot(st.session_state.train_history.history['val_accuracy'], label='Val Acc')
+    
+    # Set title and legend for accuracy plot
+    ax2.set_title('Accuracy Curve')
+    ax2.legend()
+    
+    # Display the matplotlib figure in Streamlit
+    st.pyplot(fig)
+
+    # Throughput, timing and memory recorded by the training callback
+    history = st.session_state.train_history.history
+    perf_fig = None
+    if 'epoch_time' in history:
+        st.header("Training Throughput")
+        epochs = np.arange(1, len(history['epoch_time']) + 1)
+        perf_fig, ((ax3, ax4), (ax5, ax6)) = plt.subplots(2, 2, figsize=(12, 8))
+
+        # Where each epoch's wall time went
+        ax3.bar(epochs, history['train_time'], label='Train Steps')
+        ax3.bar(epochs, history['val_time'], bottom=history['train_time'], label='Validation')
+        ax3.bar(epochs, history['overhead_time'],
+                bottom=np.add(history['train_time'], history['val_time']), label='Callbacks/Other')
+        ax3.set_title('Epoch Wall Time (s)')
+        ax3.legend()
+
+        # Training samples per second of wall time
+        ax4.plot(epochs, history['samples_per_sec'], marker='o')
+        ax4.set_title('Throughput (samples/s)')
+
+        # Step time percentiles
+        for percentile in ('p50', 'p90', 'p99'):
+            ax5.plot(epochs, history[f'step_time_{percentile}_ms'], label=percentile)
+        ax5.set_title('Step Time (ms)')
+        ax5.legend()
+
+        # Peak memory with the learning rate on a second axis
+        ax6.plot(epochs, history['peak_memory_mb'], color='tab:purple', label='Peak RSS')
+        if 'peak_gpu_memory_mb' in history:
+            ax6.plot(epochs, history['peak_gpu_memory_mb'], color='tab:green', label='Peak GPU')
+        ax6.set_title('Peak Memory (MB) and Learning Rate')
+        ax6.legend(loc='upper left')
+        ax7 = ax6.twinx()
+        ax7.step(epochs, history['learning_rate'], where='post', color='tab:red')
+        ax7.set_yscale('log')
+        # Mark epochs where ReduceLROnPlateau lowered the learning rate
+        lr_changes = [epoch for epoch, previous, current in
+                      zip(epochs[1:], history['learning_rate'], history['learning_rate'][1:]) if current != previous]
+        for epoch in lr_changes:
+            ax7.axvline(epoch, color='tab:red', linestyle='--', alpha=0.5)
+        for ax in (ax3, ax4, ax5, ax6):
+            ax.set_xlabel('Epoch')
+
+        perf_fig.tight_layout()
+        st.pyplot(perf_fig)
+        if lr_changes:
+            st.caption("Learning rate reduced at epoch " + ", ".join(str(epoch) for epoch in lr_changes))
+    
+    # Per-layer latency and FLOPs of a profiled run
+    profile_fig = None
+    if st.session_state.get('layer_profile'):
+        profile_fig = show_layer_profile(st.session_state.layer_profile)
+    
+    # Confusion matrix and per-character metrics from the Test page
+    report = st.session_state.test_metrics
+    eval_fig = None
+    if report and 'confusion' in report:
+        st.header("Test Evaluation")
+        st.table({f"Top-{k} Accuracy": [f"{accuracy:.2%}"] for k, accuracy in report['top_k'].items()})
+        eval_fig, (ax8, ax9) = plt.subplots(1, 2, figsize=(14, 6), gridspec_kw={'width_ratios': [1, 1.2]})
+        # Rows are true characters, columns predictions, normalised by class support
+        normalised = report['confusion'] / np.maximum(report['support'], 1)[:, None]
+        image = ax8.imshow(normalised, cmap='Blues', vmin=0, vmax=1)
+        ax8.set_title('Confusion Matrix (row-normalised)')
+        ax8.set_xlabel('Predicted class')
+        ax8.set_ylabel('True class')
+        eval_fig.colorbar(image, ax=ax8, fraction=0.046)
+        # Precision and recall per class index
+        classes = np.arange(len(report['precision']))
+        ax9.bar(classes - 0.2, report['precision'], width=0.4, label='Precision')
+        ax9.bar(classes + 0.2, report['recall'], width=0.4, label='Recall')
+        ax9.set_title('Per-Class Precision and Recall')
+        ax9.set_xlabel('Class')
+        ax9.set_ylim(0, 1)
+        ax9.legend()
+        eval_fig.tight_layout()
+        st.pyplot(eval_fig)
+        # Most confused pairs, off the diagonal
+        off_diagonal = report['confusion'] - np.diag(np.diag(report['confusion']))
+        pairs = np.argsort(off_diagonal, axis=None)[::-1][:5]
+        confused = [(Predictor.characters[true], Predictor.characters[predicted], off_diagonal[true, predicted])
+                    for true, predicted in zip(*np.unravel_index(pairs, off_diagonal.shape))
+                    if off_diagonal[true, predicted] > 0]
+        if confused:
+            st.caption("Most confused: " + ", ".join(f"{true} → {predicted} ({count})"
+                                                     for true, predicted, count in confused))
+
+    # Create export results button
+    if st.button("Export Results"):
+        # Create in-memory bytes buffer
+        buf = io.BytesIO()
+        
+        # Create zip file in memory
+        with zipfile.ZipFile(buf, 'w') as zipf:
+            # Save plots to PNG file
+            fig.savefig("training_metrics.png")
+            
+            # Add plot image to zip
+            zipf.write("training_metrics.png")
+            # Add the throughput plots when they were recorded
+            if perf_fig is not None:
+                perf_fig.savefig("training_throughput.png")
+                zipf.write("training_throughput.png")
+            # Add the per-layer cost table and plot of a profiled run
+            if profile_fig is not None:
+                zipf.writestr("layer_profile.csv", layer_table(st.session_state.layer_profile).to_csv(index=False))
+                profile_fig.savefig("layer_profile.png")
+                zipf.write("layer_profile.png")
+            
+            # Check if test metrics exist
+            if st.session_state.test_metrics:
+                # Create text file with test results
+                with open("test_results.txt", "w") as f:
+                    # Write test loss to file
+                    f.write(f"Test Loss: {st.session_state.test_metrics['loss']:.4f}\n")
+                    # Write test accuracy to file
+                    f.write(f"Test Accuracy: {st.session_state.test_metrics['accuracy']:.4f}")
+                    # Top-k accuracies of the batched evaluation
+                    for k, accuracy in st.session_state.test_metrics.get('top_k', {}).items():
+                        f.write(f"\nTest Top-{k} Accuracy: {accuracy:.4f}")
+                
+                # Add test results file to zip
+                zipf.write("test_results.txt")
+                # Add the confusion matrix as CSV and its plots
+                if eval_fig is not None:
+                    zipf.writestr("confusion_matrix.csv", "\n".join(
+                        ",".join(str(count) for count in row) for row in report['confusion']))
+                    eval_fig.savefig("test_evaluation.png")
+                    zipf.write("test_evaluation.png")
+            
+        # Reset buffer position
+        buf.seek(0)
+        
+        # Create download button for zip file
+        st.download_button(
+            label="Download Results",
+            data=buf,
+            file_name="model_results.zip",
+            mime="application/zip"
+        )
+        
+def layer_table(profile):
+    """
+    Formats a ModelProfiler.layer_profile result as a table
+    Args:
+        profile (dict): Per-layer profile
+    Returns:
+        pd.DataFrame: One row per layer
+    """
+    return pd.DataFrame([{
+        'Layer': row['layer'],
+        'Type': row['type'],
+        'Block': row['block'],
+        'Output Shape': str(tuple(row['output_shape'])),
+        'Params': row['params'],
+        'MFLOPs': row['flops'] / 1e6,
+        'Latency (ms)': row['latency_ms'],
+        'Time Share': row['share'],
+    } for row in profile['layers']])
+
+def show_layer_profile(profile):
+    """
+    Renders the per-layer and per-block cost of a profiled model
+    Args:
+        profile (dict): ModelProfiler.layer_profile result, with the trace directory when traced
+    Returns:
+        matplotlib.figure.Figure: Cost plot
+    """
+    import matplotlib.pyplot as plt
+    st.header("Layer Cost")
+    blocks = ModelProfiler.block_summary(profile)
+    st.caption(f"Batch of {profile['batch_size']}: whole model {profile['model_latency_ms']:.2f} ms per call, "
+               f"layers timed one by one on their real inputs (sum includes per-call overhead)")
+    st.dataframe(layer_table(profile).style.format({'MFLOPs': '{:.2f}', 'Latency (ms)': '{:.3f}',
+                                                     'Time Share': '{:.1%}'}), use_container_width=True)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+    names = [block['block'] for block in blocks]
+    # Where the time goes versus where the arithmetic is
+    ax1.barh(names, [block['latency_ms'] for block in blocks], color='tab:orange')
+    ax1.set_title('Latency per Block (ms)')
+    ax1.invert_yaxis()
+    ax2.barh(names, [block['flops'] / 1e6 for block in blocks], color='tab:blue')
+    ax2.set_title('MFLOPs per Block')
+    ax2.invert_yaxis()
+    fig.tight_layout()
+    st.pyplot(fig)
+    if profile.get('trace_dir'):
+        st.caption(f"Profiler trace: `tensorboard --logdir {profile['trace_dir']}` (Profile tab)")
+    return fig
@@ -1,88 +1,116 @@
-
-"""
-Testing Page Module
-"""
-# Import required libraries
-import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from classes.data_handler import DataHandler
-from classes.predictor import Predictor
-
-# Define page display function
-def show():
-    # Set page title with emoji
-    st.title("🧪 Model Testing")
-    
-    # Check if model is available
-    if st.session_state.model is None:
-        # Show warning if no model
-        st.warning("⚠️ Please train a model first!")
-        return
-        
-    # Display testing instructions
-    st.info("""
-    **Testing Instructions:**
-    1. Upload test data (features and labels)
-    2. Show sample test images
-    3. Run testing
-    """)
-    
-    # Section 1: Data Upload
-    st.header("1. Upload Testing Data 🗂️")
-    # Create two columns for file uploaders
-    col1, col2 = st.columns(2)
-    with col1:
-        # Upload test features
-        test_features = st.file_uploader("Test Images (CSV)", 
-                                        type=['csv'], 
-                                        key='test_features')
-    with col2:
-        # Upload test labels
-        test_labels = st.file_uploader("Test Labels (CSV)", 
-                                     type=['csv'], 
-                                     key='test_labels')
-    
-    # Check if both files are uploaded
-    if test_features and test_labels:
-        try:
-            # Load and preprocess test data
-            X_test, y_test = DataHandler.load_data(test_features, test_labels)
-            
-            # Section 2: Data Preview
-            #st.header("2. Data Preview ")
-            # Display dataset statistics
-           # st.write(f"📊 Test samples: {len(X_test)}")
-            
-            # show sample images
-            st.subheader("2. Sample of Preprocessed Images (12/3360) 👀")
-            # Create grid of sample images
-            fig, axes = plt.subplots(3, 4, figsize=(10, 5))
-            for i, ax in enumerate(axes.flat):
-                # Reshape and display each image
-                img = np.transpose(X_test[i].reshape(32, 32))
-                ax.imshow(img, cmap='gray')
-                ax.set_title(f"Label: {Predictor.characters[y_test[i]]}")
-                ax.axis('off')
-            # Display the plot in Streamlit
-            st.pyplot(fig)
-            
-            # Run testing button
-            if st.button("🧪 Run Testing"):
-                # Show loading spinner
-                with st.spinner("Testing in progress..."):
-                    # Evaluate model on test data using the saved session state model
-                    test_loss, test_acc = st.session_state.model.evaluate(X_test, y_test, verbose=0)
-                    # Store test metrics in session state
-                    st.session_state.test_metrics = {
-                        'loss': test_loss,
-                        'accuracy': test_acc
-                    }
-                    # Show success message with accuracy and loss
-                    st.success(f"✅ Test Accuracy: {test_acc* 100:.2f}") 
-                    st.success(f"📉 Test Loss: {test_loss:.4f}")
-                    st.write(f"Now, you can test our model by trying the prediction process") 
-                    
-        # Handle any errors
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
\ No newline at end of file
+
+"""
+Testing Page Module
+"""
+# Import required libraries
+import io
+import streamlit as st
+import numpy as np
+from classes.dataset_cache import DatasetCache
+from classes.evaluator import Evaluator
+from classes.predictor import Predictor
+
+# Define page display function
+def show():
+    # Set page title with emoji
+    st.title("🧪 Model Testing")
+    
+    # Check if model is available
+    if st.session_state.model is None:
+        # Show warning if no model
+        st.warning("⚠️ Please train a model first!")
+        return
+        
+    # Display testing instructions
+    st.info("""
+    **Testing Instructions:**
+    1. Upload test data (features and labels)
+    2. Show sample test images
+    3. Run testing
+    """)
+    
+    # Section 1: Data Upload
+    st.header("1. Upload Testing Data 🗂️")
+    # Create two columns for file uploaders
+    col1, col2 = st.columns(2)
+    with col1:
+        # Upload test features
+        test_features = st.file_uploader("Test Images (CSV)", 
+                                        type=['csv'], 
+                                        key='test_features')
+    with col2:
+        # Upload test labels
+        test_labels = st.file_uploader("Test Labels (CSV)", 
+                                     type=['csv'], 
+                                     key='test_labels')
+    
+    # Check if both files are uploaded
+    if test_features and test_labels:
+        try:
+            # Load and preprocess test data, reusing the parsed arrays across reruns
+            X_test, y_test = DatasetCache.shared().load(test_features, test_labels)
+            if X_test is None:
+                return
+            
+            # Section 2: Data Preview
+            #st.header("2. Data Preview ")
+            # Display dataset statistics
+           # st.write(f"📊 Test samples: {len(X_test)}")
+            
+            # show sample images
+            st.subheader("2. Sample of Preprocessed Images (12/3360) 👀")
+            # The grid is drawn once per dataset and reused as an image on reruns
+            dataset_key = Evaluator.dataset_fingerprint(X_test, y_test)
+            if st.session_state.get('test_sample_grid', (None,))[0] != dataset_key:
+                st.session_state.test_sample_grid = (dataset_key, sample_grid(X_test, y_test))
+            st.image(st.session_state.test_sample_grid[1])
+
+            # Reports are cached by model weights and dataset, reopening the page costs no inference
+            evaluator = Evaluator.shared()
+            report = evaluator.cached(st.session_state.model, X_test, y_test)
+            # Run testing button
+            if report is None and st.button("🧪 Run Testing"):
+                # Show loading spinner
+                with st.spinner("Testing in progress..."):
+                    # Stream the test set through the session model in batches
+                    report = evaluator.evaluate(st.session_state.model, X_test, y_test)
+            if report is not None:
+                # Store the report in session state for the results page
+                st.session_state.test_metrics = report
+                # Show success message with accuracy and loss
+                st.success(f"✅ Test Accuracy: {report['accuracy'] * 100:.2f}")
+                st.success(f"📉 Test Loss: {report['loss']:.4f}")
+                st.table({f"Top-{k} Accuracy": [f"{accuracy:.2%}"] for k, accuracy in report['top_k'].items()})
+                st.caption(f"{report['samples']} samples evaluated in {report['eval_time']:.2f}s")
+                # Per-character precision and recall
+                with st.expander("Per-character precision and recall"):
+                    st.table(Evaluator.per_class_table(report))
+                st.write(f"Now, you can test our model by trying the prediction process") 
+                    
+        # Handle any errors
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+
+def sample_grid(X_test, y_test):
+    """
+    Draws the first 12 test images with their labels
+    Args:
+        X_test (np.array): Test features
+        y_test (np.array): Test labels
+    Returns:
+        bytes: PNG image
+    """
+    # Import matplotlib only when there is data to plot
+    import matplotlib.pyplot as plt
+    # Create grid of sample images
+    fig, axes = plt.subplots(3, 4, figsize=(10, 5))
+    for i, ax in enumerate(axes.flat):
+        # Reshape and display each image
+        img = np.transpose(X_test[i].reshape(32, 32))
+        ax.imshow(img, cmap='gray')
+        ax.set_title(f"Label: {Predictor.characters[y_test[i]]}")
+        ax.axis('off')
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
@@ -1,119 +1,401 @@
-
-"""
-Training Page Module
-"""
-# Import required libraries
-import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from classes.data_handler import DataHandler
-from classes.model_trainer import ModelTrainer
-from classes.predictor import Predictor
-from io import BytesIO
-
-def show():
-    # Set page title with emoji
-    st.title("🎓 Model Training")
-    # Display instructions for training
-    st.info("""
-    **Training Instructions:**
-    1. Upload training data (features and labels)
-    3. Attention Mechanism Option
-    4. Start training
-    """)  
-    # Initialise session state for file persistence
-    if 'train_features_data' not in st.session_state:
-        st.session_state.train_features_data = None
-    if 'train_labels_data' not in st.session_state:
-        st.session_state.train_labels_data = None   
-    # Section 1: Data Upload
-    st.header("1. Upload Training Data 🗂️")
-    # Create two columns for file uploaders
-    col1, col2 = st.columns(2)
-    with col1:
-        # Upload training features with session persistence
-        train_features = st.file_uploader("Training Images (CSV)", key='train_features')
-        if train_features:
-            st.session_state.train_features_data = train_features.getvalue()  
-    with col2:
-        # Upload training labels with session persistence
-        train_labels = st.file_uploader("Training Labels (CSV)", key='train_labels')
-        if train_labels:
-            st.session_state.train_labels_data = train_labels.getvalue() 
-        
-    # Check if we have data (either newly uploaded or from session state)
-    has_data = (st.session_state.train_features_data is not None and 
-            st.session_state.train_labels_data is not None)
-    if has_data:
-        try:
-            # Use the uploaded files if available, otherwise use session state
-            if train_features is not None and train_labels is not None:
-                # Use the newly uploaded files directly
-                X_train, y_train = DataHandler.load_data(train_features, train_labels)
-            else:
-                # Create file-like objects from session state data
-                features_file = BytesIO(st.session_state.train_features_data)
-                labels_file = BytesIO(st.session_state.train_labels_data)
-                X_train, y_train = DataHandler.load_data(features_file, labels_file)
-                
-            # Only proceed if data was loaded successfully
-            if X_train is not None and y_train is not None:
-                st.subheader("📷 Sample of Preprocessed Images (12/13360) 👀")
-                # Create grid of sample images
-                fig, axes = plt.subplots(3, 4, figsize=(10, 5))
-                for i, ax in enumerate(axes.flat):
-                    # Reshape and display each image
-                    img = np.transpose(X_train[i].reshape(32, 32))
-                    ax.imshow(img, cmap='gray')
-                    # Show the numeric label (1-28)
-                    ax.set_title(f"Label: {Predictor.characters[y_train[i]]}")
-                    ax.axis('off')
-                # Display the plot in Streamlit
-                st.pyplot(fig)
-
-            # Section 3: Attention Mechanism
-            st.header("3. Attention Mechanism 🎯")
-            # Add attention mechanism radio button
-            use_attention = st.radio(
-                "Use Attention Mechanism (Experimental)",
-                options=["No", "Yes"],
-                index=0
-            ) == "Yes"
-            # Display information about Attention layer if is used
-            if use_attention:
-                st.info("""
-                Attention mechanism will be added after the LSTM layer.
-                This may improve performance but will increase training time.
-                """)
-            
-            # Start training button
-            if st.button("🚀 Start Training"):
-                # Show loading spinner
-                with st.spinner("Training in progress..."):
-                    # Build model with optional attention
-                    model = ModelTrainer.build_model(use_attention=use_attention)
-                    # Train model
-                    history = ModelTrainer.train_model(model, X_train, y_train, epochs = 20, batch_size = 128)
-                    # If training successful
-                    if history:
-                        # Save model and update session state
-                        model_path = ModelTrainer.save_model(model)
-                        st.session_state.model = model
-                        st.session_state.train_history = history
-                        # Show success message
-                        st.success(f"✅ Training complete! Model saved temporarily at: {model_path}, NOW THE MODEL IS READY FOR TESTINIG")
-                        # Add download button for the trained model
-                        with open(model_path, "rb") as f:
-                            model_bytes = f.read()
-                        st.download_button(
-                            label="📥 Download Trained Model",
-                            data=model_bytes,
-                            file_name=model_path.split("/")[-1],
-                            mime="application/octet-stream"                           
-                        )
-                        # Update session state if download button clicked
-                        st.session_state.model = model
-                        st.session_state.train_history = history
-
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
\ No newline at end of file
+
+"""
+Training Page Module
+"""
+# Import required libraries
+import os
+import shutil
+import streamlit as st
+import numpy as np
+from classes.config import get_setting
+from classes.data_handler import DataHandler
+from classes.dataset_cache import DatasetCache
+from classes.distributed_trainer import DistributedTrainer
+from classes.job_runner import JobRunner
+from classes.lru_cache import content_digest
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.profiler import ModelProfiler
+from classes.sharded_dataset import ShardedDataset
+from classes.tf_loader import is_keras_model
+
+def show():
+    # Set page title with emoji
+    st.title("🎓 Model Training")
+    # Display instructions for training
+    st.info("""
+    **Training Instructions:**
+    1. Upload training data (features and labels), or give a sharded dataset manifest
+    2. Choose a new model or continue training an existing one
+    3. Attention Mechanism Option
+    4. Input Pipeline Option
+    5. Compile Mode, Parallel Workers and Profiling Option
+    6. Start training (runs as a background job, progress is shown below)
+    7. Optionally export to TFLite
+    """)  
+    # Initialise session state for file persistence
+    if 'train_features_data' not in st.session_state:
+        st.session_state.train_features_data = None
+    if 'train_labels_data' not in st.session_state:
+        st.session_state.train_labels_data = None   
+    # Section 1: Data Upload
+    st.header("1. Upload Training Data 🗂️")
+    # Large corpora stay on the server as shards and are streamed by the training job
+    data_source = st.radio("Training data", options=["Upload CSV files", "Sharded dataset manifest"],
+                           index=0, horizontal=True)
+    if data_source == "Sharded dataset manifest":
+        show_manifest_training()
+        return
+    # Create two columns for file uploaders
+    col1, col2 = st.columns(2)
+    with col1:
+        # Upload training features with session persistence
+        train_features = st.file_uploader("Training Images (CSV)", key='train_features')
+        if train_features:
+            st.session_state.train_features_data = train_features.getvalue()  
+    with col2:
+        # Upload training labels with session persistence
+        train_labels = st.file_uploader("Training Labels (CSV)", key='train_labels')
+        if train_labels:
+            st.session_state.train_labels_data = train_labels.getvalue() 
+    # CSV parser backend, the parsed arrays are the same whichever one is used
+    default_parser = get_setting("CSV_PARSER", "pandas")
+    parser_index = DataHandler.PARSERS.index(default_parser) if default_parser in DataHandler.PARSERS else 0
+    csv_parser = st.selectbox("CSV Parser", DataHandler.PARSERS, index=parser_index,
+                              help="pandas infers column types; pyarrow (multithreaded) and numpy (integer "
+                                   "fast path) read every pixel as uint8 and are faster on large files")
+        
+    # Check if we have data (either newly uploaded or from session state)
+    has_data = (st.session_state.train_features_data is not None and 
+            st.session_state.train_labels_data is not None)
+    if has_data:
+        try:
+            # Parsed arrays are cached by content hash, so reruns skip CSV parsing
+            # Raw uint8 pixels are kept, normalisation happens at training time
+            dataset_cache = DatasetCache.shared()
+            # Use the uploaded files if available, otherwise use session state
+            if train_features is not None and train_labels is not None:
+                # Use the newly uploaded files directly
+                X_train, y_train = dataset_cache.load(train_features, train_labels, dtype='uint8',
+                                                      parser=csv_parser)
+            else:
+                # Use the raw bytes kept in session state
+                X_train, y_train = dataset_cache.load(st.session_state.train_features_data,
+                                                      st.session_state.train_labels_data, dtype='uint8',
+                                                      parser=csv_parser)
+            # Show cache counters
+            cache_stats = dataset_cache.stats()
+            st.caption(f"Dataset cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                       f"{cache_stats['entries']} datasets ({cache_stats['bytes'] / 2**20:.0f} MB)")
+                
+            # Only proceed if data was loaded successfully
+            if X_train is not None and y_train is not None:
+                # Import matplotlib only when there is data to plot
+                import matplotlib.pyplot as plt
+                st.subheader("📷 Sample of Preprocessed Images (12/13360) 👀")
+                # Create grid of sample images
+                fig, axes = plt.subplots(3, 4, figsize=(10, 5))
+                for i, ax in enumerate(axes.flat):
+                    # Reshape and display each image
+                    img = np.transpose(X_train[i].reshape(32, 32))
+                    ax.imshow(img, cmap='gray')
+                    # Show the numeric label (1-28)
+                    ax.set_title(f"Label: {Predictor.characters[y_train[i]]}")
+                    ax.axis('off')
+                # Display the plot in Streamlit
+                st.pyplot(fig)
+
+            # Section 2: Training Mode
+            st.header("2. Training Mode 🔁")
+            # Add training mode radio button
+            continue_training = st.radio(
+                "Start from",
+                options=["New model", "Continue training an existing model"],
+                index=0
+            ) != "New model"
+            base_model_bytes = None
+            if continue_training:
+                # Fine-tune a downloaded model, or the last model trained in this session
+                base_model = st.file_uploader("Existing Model (.keras)", type=["keras"], key='base_model')
+                if base_model is not None:
+                    base_model_bytes = base_model.getvalue()
+                elif st.session_state.get('trained_model_path') and os.path.exists(st.session_state.trained_model_path):
+                    with open(st.session_state.trained_model_path, "rb") as f:
+                        base_model_bytes = f.read()
+                    st.caption("Using the model trained earlier in this session")
+                fine_tune_epochs = st.number_input("Fine-tuning epochs", min_value=1, max_value=50, value=5)
+                fine_tune_lr = st.selectbox("Fine-tuning learning rate", options=[1e-4, 3e-4, 1e-3, 1e-5], index=0)
+                st.info("""
+                The existing model keeps its architecture and weights and is trained further on the uploaded data,
+                which is much cheaper than training from scratch. Attention and compile options below apply to new models.
+                """)
+
+            # Section 3: Attention Mechanism
+            st.header("3. Attention Mechanism 🎯")
+            # Add attention mechanism radio button
+            use_attention = st.radio(
+                "Use Attention Mechanism (Experimental)",
+                options=["No", "Yes"],
+                index=0
+            ) == "Yes"
+            # Display information about Attention layer if is used
+            if use_attention:
+                st.info("""
+                Attention mechanism will be added after the LSTM layer.
+                This may improve performance but will increase training time.
+                """)
+            
+            # Section 4: Input Pipeline
+            st.header("4. Input Pipeline ⚙️")
+            # Add input pipeline radio button
+            use_tf_data = st.radio(
+                "Training Input Pipeline",
+                options=["In-memory arrays", "tf.data streaming (lower memory)"],
+                index=0
+            ) == "tf.data streaming (lower memory)"
+            # Display information about the streaming pipeline if is used
+            if use_tf_data:
+                st.info("""
+                Samples stay as uint8 and are normalised batch by batch in a parallel pipeline,
+                which lowers memory use during training.
+                """)
+
+            # Section 5: Compile Mode
+            st.header("5. Compile Mode & Workers ⚡")
+            # Add compile mode radio button
+            high_throughput = st.radio(
+                "Training Compile Mode",
+                options=["Default", "High-throughput (XLA + several steps per call)"],
+                index=0
+            ) != "Default"
+            steps_per_execution = 1
+            # Display compile options if high-throughput mode is used
+            if high_throughput:
+                steps_per_execution = st.number_input("Steps per call", min_value=1, max_value=256, value=16)
+                st.info("""
+                Training steps are compiled with XLA and several steps run per call,
+                which cuts Python overhead per step. The first epoch is slower while XLA compiles,
+                and on some CPUs the LSTM runs slower under XLA: compare runs in the table below.
+                """)
+
+            # Data-parallel training across local worker processes
+            num_workers = 1 if continue_training else st.number_input("Data-parallel worker processes", min_value=1,
+                                                                      max_value=os.cpu_count() or 1, value=1)
+            lr_scaling = 'linear'
+            if num_workers > 1:
+                lr_scaling = st.selectbox("Learning rate scaling", options=DistributedTrainer.LR_SCALINGS, index=0)
+                st.info(f"""
+                Samples are sharded between {num_workers} worker processes with 128 samples per worker per step
+                (global batch {128 * num_workers}); gradients are averaged every step.
+                The compile mode above applies to single-process training only.
+                """)
+
+            # Profiler trace of a window of training steps and a per-layer cost table
+            profile_training = num_workers == 1 and st.checkbox("🩺 Profile training (trace + per-layer cost)")
+            profile_batches = ModelProfiler.DEFAULT_BATCHES
+            if profile_training:
+                col1, col2 = st.columns(2)
+                with col1:
+                    first_batch = st.number_input("First traced batch", min_value=1, max_value=1000,
+                                                  value=ModelProfiler.DEFAULT_BATCHES[0])
+                with col2:
+                    last_batch = st.number_input("Last traced batch", min_value=int(first_batch), max_value=1000,
+                                                 value=max(ModelProfiler.DEFAULT_BATCHES[1], int(first_batch)))
+                profile_batches = (int(first_batch), int(last_batch))
+                st.info("""
+                The traced batches of the first epoch are written to a TensorBoard log directory
+                (open it with `tensorboard --logdir` and the Profile tab). Per-layer latency and FLOPs
+                of the trained model are shown on the Results page.
+                """)
+
+            # Checkpoints are keyed by the data and options, so the same run resumes after a rerun or disconnect
+            run_key = content_digest(st.session_state.train_features_data, st.session_state.train_labels_data,
+                                     base_model_bytes or b"",
+                                     repr((use_attention, use_tf_data, high_throughput, int(steps_per_execution),
+                                           continue_training and (fine_tune_epochs, fine_tune_lr))).encode())
+            checkpoint_dir = ModelTrainer.checkpoint_path(run_key)
+            checkpoint_epoch = ModelTrainer.checkpoint_epoch(checkpoint_dir)
+            if checkpoint_epoch and num_workers == 1:
+                st.info(f"💾 An interrupted run with these settings was checkpointed after epoch {checkpoint_epoch}. "
+                        "Start Training resumes it.")
+                if st.button("🗑️ Discard Checkpoint"):
+                    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+                    st.rerun()
+
+            # Start training button
+            if st.button("🚀 Start Training", disabled=continue_training and base_model_bytes is None):
+                options = dict(epochs=20, batch_size=128, use_attention=use_attention, use_tf_data=use_tf_data)
+                if continue_training:
+                    # The job loads its own copy, so cached models elsewhere in the app are not modified
+                    options.update(base_model_bytes=base_model_bytes, epochs=int(fine_tune_epochs),
+                                   learning_rate=fine_tune_lr, checkpoint_dir=checkpoint_dir, mode="fine-tune")
+                elif num_workers > 1:
+                    options.update(num_workers=int(num_workers), lr_scaling=lr_scaling, mode=f"{num_workers} workers")
+                else:
+                    options.update(jit_compile=True if high_throughput else 'auto',
+                                   steps_per_execution=int(steps_per_execution), checkpoint_dir=checkpoint_dir,
+                                   mode=f"XLA, {int(steps_per_execution)} steps/call" if high_throughput else "default")
+                if profile_training:
+                    options.update(profile_dir=ModelProfiler.run_dir(), profile_batches=profile_batches)
+                # Training runs in a background worker, the page stays usable meanwhile
+                job_id = JobRunner.shared().submit(X_train, y_train, **options)
+                st.session_state.setdefault('train_jobs', []).append(job_id)
+
+            # Jobs started in this session, refreshed while any is queued or running
+            if st.session_state.get('train_jobs'):
+                show_jobs()
+
+            # Epoch times of the runs in this session, by compile mode and worker count
+            if st.session_state.get('train_runs'):
+                st.subheader("⏱️ Training Runs")
+                st.table(st.session_state.train_runs)
+
+            # Section 6: TFLite Export (for Keras models trained in this session)
+            if X_train is not None and is_keras_model(st.session_state.model):
+                st.header("6. Export to TFLite 📦")
+                quantization = st.selectbox(
+                    "Quantization",
+                    options=["none (float32)", "dynamic", "float16", "int8"],
+                    index=1
+                )
+                if st.button("📦 Export TFLite Model"):
+                    with st.spinner("Exporting and comparing with the Keras model..."):
+                        mode = None if quantization == "none (float32)" else quantization
+                        # Calibrate on the training part, compare on the held-out validation part
+                        split_at = int(len(X_train) * 0.8)
+                        tflite_path = ModelTrainer.export_tflite(st.session_state.model, quantization=mode,
+                                                                 calibration_data=X_train[:split_at])
+                        if tflite_path:
+                            report = ModelTrainer.compare_tflite(st.session_state.model, tflite_path,
+                                                                 X_train[split_at:], y_train[split_at:])
+                            st.table({
+                                "Backend": ["Keras", f"TFLite ({quantization})"],
+                                "Accuracy": [f"{report['keras_accuracy']:.2%}", f"{report['tflite_accuracy']:.2%}"],
+                                "Latency p50 (ms)": [f"{report['keras_latency_ms']:.2f}", f"{report['tflite_latency_ms']:.2f}"],
+                                "Size (MB)": [f"{report['keras_size_mb']:.2f}", f"{report['tflite_size_mb']:.2f}"],
+                            })
+                            st.caption(f"Prediction agreement with Keras: {report['agreement']:.2%}")
+                            with open(tflite_path, "rb") as f:
+                                st.download_button(
+                                    label="📥 Download TFLite Model",
+                                    data=f.read(),
+                                    file_name=tflite_path.split("/")[-1],
+                                    mime="application/octet-stream"
+                                )
+
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+
+def show_manifest_training():
+    """
+    Trains on the shards listed in a manifest on the server, streamed by a background job
+    """
+    manifest_path = st.text_input("Manifest path (JSON on the server)", placeholder="/data/shards.json")
+    if not manifest_path:
+        st.info("""
+        A manifest lists feature/label shards, CSV pairs like the uploads or .npy pairs of (N, 1024) uint8
+        pixels and (N,) labels 1-28, with paths relative to the manifest:
+        `{"train": [{"features": "part-000.csv", "labels": "part-000_labels.csv"}, ...], "validation": [...]}`.
+        Without validation shards the last fifth of the shards is held out.
+        """)
+        return
+    # Errors in the manifest are shown by the reporter
+    shards = ShardedDataset.from_manifest(manifest_path)
+    if shards is None:
+        return
+    st.caption(f"{len(shards.shards['train'])} train shards, {len(shards.shards['validation'])} validation shards")
+    st.dataframe([{"Split": split, "Features": shard['features'], "Labels": shard['labels']}
+                  for split in ('train', 'validation') for shard in shards.shards[split]], use_container_width=True)
+    use_attention = st.radio("Use Attention Mechanism (Experimental)", options=["No", "Yes"], index=0) == "Yes"
+    col1, col2 = st.columns(2)
+    with col1:
+        epochs = st.number_input("Epochs", min_value=1, max_value=100, value=20)
+    with col2:
+        shard_threads = st.number_input("Shards read in parallel", min_value=1, max_value=32, value=shards.threads)
+    st.info("""
+    Each epoch streams every shard once: reader threads parse several shards at a time in chunks
+    and their rows are mixed into batches, so memory use does not grow with the corpus.
+    """)
+    # Training runs in a background worker, the page stays usable meanwhile
+    if st.button("🚀 Start Training"):
+        job_id = JobRunner.shared().submit(None, None, epochs=int(epochs), batch_size=128,
+                                           use_attention=use_attention, manifest=manifest_path,
+                                           shard_threads=int(shard_threads), mode="sharded")
+        st.session_state.setdefault('train_jobs', []).append(job_id)
+    # Jobs started in this session, refreshed while any is queued or running
+    if st.session_state.get('train_jobs'):
+        show_jobs()
+
+def show_jobs():
+    """
+    Lists the session's training jobs with progress, cancel and use-model controls
+    """
+    runner = JobRunner.shared()
+    active = any(job['status'] in ('queued', 'running') for job in runner.jobs(st.session_state.train_jobs))
+
+    # Only this part of the page reruns on the timer
+    @st.fragment(run_every=2 if active else None)
+    def jobs_panel():
+        st.subheader("🧵 Training Jobs")
+        for job in runner.jobs(st.session_state.train_jobs):
+            options = runner.get(job['id']).options
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                summary = f"**{job['id']}** · {options['mode']} · {job['status']}"
+                if job['val_accuracy'] is not None:
+                    summary += f" · val acc {job['val_accuracy']:.2%}"
+                st.markdown(summary + f" · {job['elapsed']:.0f}s")
+                if job['status'] == 'running':
+                    st.progress(min(job['progress'], 1.0), text=job['message'] or "Starting...")
+                elif job['status'] == 'failed':
+                    st.error(f"❌ {job['error']}")
+            with col2:
+                if job['status'] in ('queued', 'running'):
+                    if st.button("✖️ Cancel", key=f"cancel_{job['id']}"):
+                        runner.cancel(job['id'])
+                        st.rerun(scope="fragment")
+                elif job['status'] == 'finished' and job['id'] not in st.session_state.get('adopted_jobs', []):
+                    if st.button("✅ Use Model", key=f"use_{job['id']}"):
+                        use_job_model(runner.get(job['id']))
+                        # The other sections read the new model
+                        st.rerun()
+                elif job['status'] == 'finished' and os.path.exists(runner.get(job['id']).model_path):
+                    # Add download button for the trained model
+                    model_path = runner.get(job['id']).model_path
+                    with open(model_path, "rb") as f:
+                        st.download_button(label="📥 Download", data=f.read(), key=f"download_{job['id']}",
+                                           file_name=os.path.basename(model_path), mime="application/octet-stream")
+        # Leave the timer once the last job is done
+        if active and not any(job['status'] in ('queued', 'running')
+                              for job in runner.jobs(st.session_state.train_jobs)):
+            st.rerun()
+
+    jobs_panel()
+
+def use_job_model(job):
+    """
+    Loads the model of a finished job into the session
+    Args:
+        job (TrainingJob): Finished job
+    """
+    model = ModelTrainer.load_model(job.model_path)
+    if model is None:
+        return
+    history = job.training_history()
+    # Keep epoch times of each run to compare compile modes
+    epoch_times = history.history.get('epoch_time') or [0.0]
+    st.session_state.setdefault('train_runs', []).append({
+        "Mode": job.options['mode'],
+        "Attention": "Yes" if job.options['use_attention'] else "No",
+        "Epochs": len(history.history['loss']),
+        "First Epoch (s)": f"{epoch_times[0]:.2f}",
+        "Steady Epoch (s)": f"{np.median(epoch_times[1:] or epoch_times):.2f}",
+        "Samples/s": f"{np.median(history.history.get('samples_per_sec') or [0.0]):.0f}",
+    })
+    st.session_state.setdefault('adopted_jobs', []).append(job.id)
+    st.session_state.trained_model_path = job.model_path
+    st.session_state.model = model
+    st.session_state.train_history = history
+    # Profiled jobs bring their per-layer cost and trace directory
+    if job.layer_profile is not None:
+        st.session_state.layer_profile = dict(job.layer_profile, trace_dir=job.options['profile_dir'])
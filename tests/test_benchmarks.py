@@ -0,0 +1,31 @@
+"""
+Benchmark Suite Tests check the baseline comparison logic.
+"""
+# Import required libraries
+from benchmarks.csv_parsers import measure_parser
+from benchmarks.suite import compare, metric, write_dataset
+
+def _report(**values):
+    """Report with the given metric values."""
+    return {"metrics": {name: metric(value, unit, higher) for name, (value, unit, higher) in values.items()}}
+
+def test_compare_flags_regressions_by_direction():
+    """Slower latency and lower throughput beyond the tolerance are regressions."""
+    baseline = _report(latency=(10.0, "ms", False), throughput=(100.0, "rows/s", True), steady=(5.0, "s", False))
+    current = _report(latency=(13.0, "ms", False), throughput=(150.0, "rows/s", True), steady=(5.5, "s", False))
+    rows = {name: (change, regressed) for name, _, _, change, regressed in compare(current, baseline, tolerance=0.2)}
+    assert rows["latency"][1] is True
+    assert rows["throughput"] == (0.5, False)
+    assert rows["steady"][1] is False
+
+def test_compare_skips_metrics_missing_from_baseline():
+    """New benchmarks have nothing to compare against."""
+    assert compare(_report(new=(1.0, "ms", False)), _report()) == []
+
+def test_measure_parser_reports_time_and_memory(tmp_path):
+    """Each parser backend loads the dataset in its own process."""
+    features_path, labels_path = write_dataset(str(tmp_path), 30)
+    stats = measure_parser(features_path, labels_path, "numpy", chunk_size=8)
+    assert stats["rows"] == 30 and stats["parser"] == "numpy"
+    assert stats["peak_rss_mb"] >= stats["baseline_rss_mb"] > 0
+    assert "error" in measure_parser(features_path, features_path, "numpy")
@@ -0,0 +1,141 @@
+"""
+Cache Module Tests cover LRU eviction, counters, the dataset cache
+(hit/miss behaviour and read-only sharing) and the prediction result cache.
+"""
+# Import required libraries
+import numpy as np
+from classes.lru_cache import LRUCache
+from classes.dataset_cache import DatasetCache
+from classes.model_cache import ModelCache
+from classes.model_trainer import ModelTrainer
+from classes.prediction_cache import PredictionCache
+from classes.predictor import Predictor
+from PIL import Image
+
+def _csv_bytes(n_rows):
+    """Build features/labels CSV contents."""
+    pixels = np.random.randint(0, 256, (n_rows, 1024))
+    features = "\n".join(",".join(map(str, row)) for row in pixels).encode()
+    labels = "\n".join(map(str, np.random.randint(1, 29, n_rows))).encode()
+    return features, labels
+
+def test_lru_evicts_least_recently_used():
+    """Entries beyond the count limit are evicted oldest first."""
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    # Touch 'a' so 'b' becomes least recently used
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.stats()['evictions'] == 1
+
+def test_lru_respects_byte_budget():
+    """Size budget is enforced and oversized values are rejected."""
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put('a', b'x' * 6)
+    cache.put('b', b'y' * 6)
+    assert 'a' not in cache
+    assert cache.stats()['bytes'] == 6
+    assert cache.put('big', b'z' * 11) is False
+
+def test_lru_hit_miss_counters():
+    """Lookups update hit and miss counters."""
+    cache = LRUCache()
+    cache.get('missing')
+    cache.put('k', 'v')
+    cache.get('k')
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+def test_dataset_cache_reuses_parsed_arrays():
+    """Same bytes return the same read-only arrays without re-parsing."""
+    features, labels = _csv_bytes(5)
+    cache = DatasetCache(max_mb=16)
+    X1, y1 = cache.load(features, labels)
+    X2, y2 = cache.load(features, labels)
+    assert X1 is X2 and y1 is y2
+    assert X1.shape == (5, 1, 32, 32, 1)
+    assert not X1.flags.writeable
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_dataset_cache_keys_on_content_and_dtype():
+    """Different contents or dtype are separate entries."""
+    features, labels = _csv_bytes(3)
+    other_features, _ = _csv_bytes(3)
+    cache = DatasetCache(max_mb=16)
+    X_float, _ = cache.load(features, labels)
+    X_uint8, _ = cache.load(features, labels, dtype='uint8')
+    X_other, _ = cache.load(other_features, labels)
+    assert X_float.dtype == np.float32 and X_uint8.dtype == np.uint8
+    assert X_other is not X_float
+    assert cache.stats()['misses'] == 3
+
+def test_model_cache_loads_each_model_once(tmp_path):
+    """Same .keras bytes return the same warmed-up model instance."""
+    model_path = tmp_path / "model.keras"
+    ModelTrainer.build_model().save(str(model_path))
+    model_bytes = model_path.read_bytes()
+    cache = ModelCache(max_entries=2)
+    first = cache.load(model_bytes)
+    second = cache.load(model_bytes)
+    assert first is not None and first is second
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert cache.stats()['bytes'] == ModelCache.model_size(first) > 0
+
+class _CountingModel:
+    """Stand-in model that records inference batch sizes; weights set its fingerprint."""
+    def __init__(self, weight):
+        self.weight = weight
+        self.calls = []
+
+    def get_weights(self):
+        return [np.full(4, self.weight, dtype='float32')]
+
+    def predict(self, x, verbose=0):
+        self.calls.append(len(x))
+        probs = np.full((len(x), 28), 0.01, dtype='float32')
+        probs[:, self.weight] = 0.9
+        return probs
+
+def test_prediction_cache_skips_repeated_inputs():
+    """Identical preprocessed inputs are answered from the cache, only new samples run inference."""
+    cache = PredictionCache(max_entries=16)
+    model = _CountingModel(3)
+    images = [Image.new('L', (48, 48), color=c) for c in (0, 128)]
+    Predictor.predict_batch(model, images, cache=cache)
+    # One cached and one new image
+    results = Predictor.predict_batch(model, [images[1], Image.new('L', (48, 48), color=255)], cache=cache)
+    assert model.calls == [2, 1]
+    assert list(results['classes']) == [3, 3]
+    pred_class, _, _ = Predictor.predict_image(model, images[0], cache=cache)
+    assert pred_class == 3 and model.calls == [2, 1]
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 3
+
+def test_prediction_cache_is_per_model():
+    """Another model misses the cache; invalidate drops the old model's entries."""
+    cache = PredictionCache(max_entries=16)
+    old_model, new_model = _CountingModel(3), _CountingModel(5)
+    sample = np.zeros((2, 1, 32, 32, 1), dtype='float32')
+    sample[1] = 1.0
+    Predictor.predict_array(old_model, sample, cache=cache)
+    assert Predictor.predict_array(new_model, sample, cache=cache).argmax(axis=1).tolist() == [5, 5]
+    assert new_model.calls == [2]
+    assert cache.invalidate(cache.model_fingerprint(old_model)) == 2
+    assert cache.stats()['entries'] == 2
+
+def test_prediction_cache_drops_models_no_session_uses():
+    """Switching models drops the old entries only once the last session using them has moved on."""
+    cache = PredictionCache(max_entries=16)
+    old_model, new_model = _CountingModel(3), _CountingModel(5)
+    old_key, new_key = cache.model_fingerprint(old_model), cache.model_fingerprint(new_model)
+    Predictor.predict_array(old_model, np.zeros((2, 1, 32, 32, 1), dtype='float32'), cache=cache)
+    assert cache.use_model("a", old_key) == 0 and cache.use_model("b", old_key) == 0
+    # Session b still predicts with the old model
+    assert cache.use_model("a", new_key) == 0
+    assert cache.stats()['entries'] == 1
+    assert cache.use_model("b", new_key) == 1
+    assert cache.stats()['entries'] == 0
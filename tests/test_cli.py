@@ -0,0 +1,87 @@
+"""
+CLI Tests run the headless commands end to end on a tiny synthetic dataset.
+"""
+# Import required libraries
+import csv
+import numpy as np
+import pytest
+from PIL import Image
+import cli
+from classes.reporting import ConsoleReporter, StreamlitReporter, get_reporter, set_reporter
+
+def _write_dataset(tmp_path, rows=40):
+    """Random pixel/label CSV pair."""
+    X = np.random.randint(0, 256, (rows, 1024))
+    y = np.random.randint(1, 29, (rows, 1))
+    np.savetxt(tmp_path / "X.csv", X, fmt="%d", delimiter=",")
+    np.savetxt(tmp_path / "y.csv", y, fmt="%d", delimiter=",")
+    return str(tmp_path / "X.csv"), str(tmp_path / "y.csv"), X
+
+def test_train_then_predict(tmp_path, capsys):
+    """train saves a model that predict and evaluate can use, both report throughput."""
+    features, labels, X = _write_dataset(tmp_path)
+    model_path = str(tmp_path / "model.keras")
+    assert cli.main(["train", "--features", features, "--labels", labels,
+                     "--epochs", "1", "--batch-size", "16", "--output", model_path]) == 0
+    assert "samples/s" in capsys.readouterr().out
+    assert cli.main(["evaluate", "--model", model_path, "--features", features, "--labels", labels]) == 0
+    assert "Test Accuracy" in capsys.readouterr().out
+    # Predict two images into a CSV file
+    for i in range(2):
+        Image.fromarray(X[i].reshape(32, 32).astype(np.uint8)).save(tmp_path / f"img{i}.png")
+    output = tmp_path / "predictions.csv"
+    assert cli.main(["predict", "--model", model_path, str(tmp_path / "img0.png"),
+                     str(tmp_path / "img1.png"), "--top-k", "2", "--output", str(output)]) == 0
+    with open(output, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["image", "predicted", "confidence", "top_2"]
+    assert len(rows) == 3
+
+def test_missing_file_fails_cleanly(tmp_path, capsys):
+    """Load errors go to stderr and give a non-zero exit code."""
+    assert cli.main(["evaluate", "--model", str(tmp_path / "missing.keras"),
+                     "--features", str(tmp_path / "none.csv"), "--labels", str(tmp_path / "none.csv")]) == 1
+    assert capsys.readouterr().err
+
+def test_set_reporter_swaps_sink():
+    """Classes report through whichever sink is installed."""
+    previous = get_reporter()
+    try:
+        set_reporter(StreamlitReporter())
+        assert isinstance(get_reporter(), StreamlitReporter)
+        set_reporter(ConsoleReporter())
+        assert isinstance(get_reporter(), ConsoleReporter)
+    finally:
+        set_reporter(previous)
+
+def test_profile_command(tmp_path, capsys):
+    """profile prints per-layer and per-block costs and writes the CSV and trace."""
+    output = tmp_path / "layers.csv"
+    assert cli.main(["profile", "--runs", "2", "--steps", "2", "--trace-dir", str(tmp_path / "trace"),
+                     "--output", str(output)]) == 0
+    out = capsys.readouterr().out
+    assert "CNN block 3" in out and "LSTM" in out and "Whole model" in out
+    with open(output, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['type'] == "Lambda" and any(row['type'] == "LSTM" for row in rows)
+    assert (tmp_path / "trace").exists()
+
+def test_train_from_manifest(tmp_path, capsys):
+    """train streams the shards of a manifest and reports the samples it read."""
+    features, labels, _ = _write_dataset(tmp_path)
+    (tmp_path / "shards.json").write_text('[{"features": "X.csv", "labels": "y.csv"}, '
+                                          '{"features": "X.csv", "labels": "y.csv"}]')
+    model_path = str(tmp_path / "model.keras")
+    assert cli.main(["train", "--manifest", str(tmp_path / "shards.json"), "--epochs", "1", "--batch-size", "16",
+                     "--output", model_path]) == 0
+    assert "40 samples" in capsys.readouterr().out
+    assert cli.main(["train", "--epochs", "1"]) == 2
+
+def test_workers_reject_single_process_options(tmp_path, capsys):
+    """Options data-parallel training cannot honour are refused before any data is loaded."""
+    for extra in (["--manifest", "shards.json"], ["--base-model", "model.keras"], ["--xla"], ["--tf-data"],
+                  ["--checkpoint-dir", str(tmp_path)], ["--steps-per-execution", "4"], ["--profile-dir", str(tmp_path)]):
+        with pytest.raises(SystemExit) as error:
+            cli.main(["train", "--features", "X.csv", "--labels", "y.csv", "--workers", "2"] + extra)
+        assert error.value.code == 2
+        assert f"--workers is not supported with {extra[0]}" in capsys.readouterr().err
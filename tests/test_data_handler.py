@@ -1,43 +1,139 @@
-
-"""
-DataHandler Module Validation covers all branches in DataHandler 
-(file validation, reshaping, normalization).
-"""
-import unittest
-from PIL import Image
-import numpy as np
-import sys
-import os
-from io import StringIO
-from classes.data_handler import DataHandler
-from classes.predictor import Predictor
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-class TestDataHandler(unittest.TestCase):
-    """
-    Comprehensive tests for DataHandler class for both FYP and Quality Assurance and Testing Module.
-    Unit tests for focusing on branch and condition coverage.
-    """
-    
-    def setUp(self):
-        self.test_img = Image.new('L', (64, 64))  # 64x64 grayscale image
-        
-    def test_preprocess_image_resizing(self):
-        """UT-01: Verify image resizing to 32x32"""
-        _, processed_img = DataHandler.preprocess_image(self.test_img)
-        self.assertEqual(processed_img.size, (32, 32))
-        
-    def test_preprocess_image_normalization(self):
-        """UT-02: Validate pixel normalization [0,1]"""
-        processed_arr, _ = DataHandler.preprocess_image(self.test_img)
-        self.assertTrue(np.all(processed_arr <= 1.0))
-        self.assertTrue(np.all(processed_arr >= 0.0))
-        
-    def test_preprocess_image_tensor_shape(self):
-        """UT-03: Check output tensor dimensions"""
-        processed_arr, _ = DataHandler.preprocess_image(self.test_img)
-        self.assertEqual(processed_arr.shape, (1, 1, 32, 32, 1))
-
-    
-if __name__ == '__main__':
+
+"""
+DataHandler Module Validation covers all branches in DataHandler 
+(file validation, reshaping, normalization).
+"""
+import unittest
+from PIL import Image
+import numpy as np
+import sys
+import os
+import zipfile
+from io import BytesIO, StringIO
+from classes.data_handler import DataHandler
+from classes.predictor import Predictor
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class TestDataHandler(unittest.TestCase):
+    """
+    Comprehensive tests for DataHandler class for both FYP and Quality Assurance and Testing Module.
+    Unit tests for focusing on branch and condition coverage.
+    """
+    
+    def setUp(self):
+        self.test_img = Image.new('L', (64, 64))  # 64x64 grayscale image
+        
+    def test_preprocess_image_resizing(self):
+        """UT-01: Verify image resizing to 32x32"""
+        _, processed_img = DataHandler.preprocess_image(self.test_img)
+        self.assertEqual(processed_img.size, (32, 32))
+        
+    def test_preprocess_image_normalization(self):
+        """UT-02: Validate pixel normalization [0,1]"""
+        processed_arr, _ = DataHandler.preprocess_image(self.test_img)
+        self.assertTrue(np.all(processed_arr <= 1.0))
+        self.assertTrue(np.all(processed_arr >= 0.0))
+        
+    def test_preprocess_image_tensor_shape(self):
+        """UT-03: Check output tensor dimensions"""
+        processed_arr, _ = DataHandler.preprocess_image(self.test_img)
+        self.assertEqual(processed_arr.shape, (1, 1, 32, 32, 1))
+
+    def test_preprocess_images_matches_single(self):
+        """UT-07: Batch preprocessing equals per-image preprocessing"""
+        images = [Image.fromarray(np.random.randint(0, 256, (40, 50), dtype=np.uint8)) for _ in range(3)]
+        names, batch, failed = DataHandler.preprocess_images(images)
+        self.assertEqual(batch.shape, (3, 1, 32, 32, 1))
+        self.assertEqual(failed, [])
+        for i, image in enumerate(images):
+            single, _ = DataHandler.preprocess_image(image)
+            np.testing.assert_array_equal(batch[i:i + 1], single)
+
+    def test_preprocess_images_from_zip(self):
+        """UT-08: Zip archives are expanded and unreadable members skipped"""
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name in ('b.png', 'a.png'):
+                image_bytes = BytesIO()
+                Image.new('L', (64, 64), color=200).save(image_bytes, format='PNG')
+                archive.writestr(name, image_bytes.getvalue())
+            archive.writestr('broken.png', b'not an image')
+            archive.writestr('notes.txt', b'ignored')
+        buffer.seek(0)
+        names, batch, failed = DataHandler.preprocess_images(buffer)
+        self.assertEqual(names, ['a.png', 'b.png'])
+        self.assertEqual(failed, ['broken.png'])
+        self.assertEqual(batch.shape, (2, 1, 32, 32, 1))
+
+    def _csv_pair(self, n_rows):
+        """Build in-memory features/labels CSV buffers"""
+        pixels = np.random.randint(0, 256, (n_rows, 1024))
+        labels = np.random.randint(1, 29, n_rows)
+        features = StringIO("\n".join(",".join(map(str, row)) for row in pixels))
+        label_file = StringIO("\n".join(map(str, labels)))
+        return features, label_file, pixels, labels
+
+    def test_load_data_chunked_matches_full(self):
+        """UT-04: Chunked loading yields the same arrays as a full read"""
+        features, labels, pixels, raw_labels = self._csv_pair(25)
+        X_full, y_full = DataHandler.load_data(features, labels)
+        features.seek(0)
+        labels.seek(0)
+        stats = {}
+        X_chunk, y_chunk = DataHandler.load_data(features, labels, chunk_size=7, stats=stats)
+        self.assertEqual(X_chunk.dtype, np.float32)
+        np.testing.assert_allclose(X_chunk, X_full)
+        np.testing.assert_array_equal(y_chunk, raw_labels - 1)
+        self.assertEqual(stats['rows'], 25)
+        self.assertGreater(stats['rows_per_sec'], 0)
+
+    def test_load_data_chunked_uint8(self):
+        """UT-05: uint8 mode keeps raw pixel values"""
+        features, labels, pixels, _ = self._csv_pair(10)
+        X, _ = DataHandler.load_data(features, labels, chunk_size=4, dtype='uint8')
+        self.assertEqual(X.dtype, np.uint8)
+        np.testing.assert_array_equal(X.reshape(10, 1024), pixels)
+
+    def test_load_data_chunked_mismatch(self):
+        """UT-06: Label count mismatch is rejected while streaming"""
+        features, _, _, _ = self._csv_pair(10)
+        labels = StringIO("\n".join(["1"] * 8))
+        X, y = DataHandler.load_data(features, labels, chunk_size=3)
+        self.assertIsNone(X)
+        self.assertIsNone(y)
+
+    def test_load_data_parsers_match_pandas(self):
+        """UT-09: Every parser backend yields the pandas arrays, full and chunked"""
+        features, labels, pixels, raw_labels = self._csv_pair(20)
+        for parser in DataHandler.PARSERS:
+            for chunk_size in (None, 6):
+                for dtype in ('float32', 'uint8'):
+                    features.seek(0)
+                    labels.seek(0)
+                    stats = {}
+                    X, y = DataHandler.load_data(features, labels, chunk_size=chunk_size, dtype=dtype,
+                                                 stats=stats, parser=parser)
+                    self.assertEqual(X.dtype, np.dtype(dtype))
+                    np.testing.assert_allclose(X.reshape(20, 1024), pixels if dtype == 'uint8' else pixels / 255.0,
+                                               rtol=1e-6)
+                    np.testing.assert_array_equal(y, raw_labels - 1)
+                    self.assertEqual(stats['parser'], parser)
+
+    def test_load_data_parsers_reject_invalid_pixels(self):
+        """UT-10: uint8 backends reject out of range, non-numeric and empty files"""
+        _, _, pixels, raw_labels = self._csv_pair(4)
+        labels = "\n".join(map(str, raw_labels))
+        rows = [",".join(map(str, row)) for row in pixels]
+        for parser in ('pyarrow', 'numpy'):
+            for bad_value in ('300', '-1', 'a', '2.5'):
+                features = StringIO("\n".join(rows[:3] + [bad_value + rows[3][rows[3].index(','):]]))
+                X, _ = DataHandler.load_data(features, StringIO(labels), dtype='uint8', parser=parser)
+                self.assertIsNone(X, (parser, bad_value))
+            X, _ = DataHandler.load_data(StringIO(""), StringIO(labels), parser=parser)
+            self.assertIsNone(X)
+        X, _ = DataHandler.load_data(StringIO(rows[0]), StringIO("1"), parser='unknown')
+        self.assertIsNone(X)
+
+    
+if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
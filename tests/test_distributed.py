@@ -0,0 +1,33 @@
+"""
+DistributedTrainer Tests run data-parallel training with local worker processes.
+"""
+# Import required libraries
+import numpy as np
+import pytest
+from classes.distributed_trainer import DistributedTrainer
+from classes.model_trainer import ModelTrainer
+
+def test_scaled_learning_rate():
+    """The learning rate grows with the global batch under each rule."""
+    assert DistributedTrainer.scaled_learning_rate(1e-3, 4, 'linear') == pytest.approx(4e-3)
+    assert DistributedTrainer.scaled_learning_rate(1e-3, 4, 'sqrt') == pytest.approx(2e-3)
+    assert DistributedTrainer.scaled_learning_rate(1e-3, 4, 'none') == pytest.approx(1e-3)
+
+def test_two_workers_save_a_keras_model(tmp_path):
+    """Two workers train on sharded samples and the chief saves a loadable .keras model."""
+    X = np.random.randint(0, 256, (200, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 200)
+    model_path, history = DistributedTrainer.train_model(X, y, num_workers=2, per_worker_batch_size=16,
+                                                         epochs=2, model_path=str(tmp_path / "model.keras"))
+    assert model_path == str(tmp_path / "model.keras")
+    assert len(history.history['val_accuracy']) == 2
+    assert all(rate > 0 for rate in history.history['samples_per_sec'])
+    # Linear scaling for two workers
+    assert history.history['learning_rate'][0] == pytest.approx(2e-3)
+    model = ModelTrainer.load_model(model_path)
+    assert model.predict(ModelTrainer.as_model_input(X[:3]), verbose=0).shape == (3, 28)
+
+def test_unknown_lr_scaling_is_reported():
+    """Invalid options are reported, not raised."""
+    X = np.zeros((10, 1024), dtype=np.uint8)
+    assert DistributedTrainer.train_model(X, np.zeros(10), lr_scaling='cubic') == (None, None)
@@ -0,0 +1,53 @@
+"""
+Evaluator Tests check the batched evaluation report and its cache.
+"""
+# Import required libraries
+import numpy as np
+import pytest
+from classes.evaluator import Evaluator
+from classes.model_trainer import ModelTrainer
+
+@pytest.fixture(scope="module")
+def model():
+    return ModelTrainer.build_model()
+
+@pytest.fixture
+def test_data():
+    return (np.random.rand(100, 1, 32, 32, 1).astype('float32'), np.random.randint(0, 28, 100))
+
+def test_report_matches_keras_evaluate(model, test_data):
+    """Streaming over uneven batches gives Keras' loss and accuracy plus a consistent confusion matrix."""
+    X_test, y_test = test_data
+    report = Evaluator.evaluate_model(model, X_test, y_test, batch_size=32, top_k=(1, 5, 28))
+    loss, accuracy = model.evaluate(X_test, y_test, verbose=0)
+    assert report['loss'] == pytest.approx(loss, rel=1e-4)
+    assert report['accuracy'] == pytest.approx(accuracy)
+    assert report['confusion'].shape == (28, 28)
+    assert report['confusion'].sum() == 100
+    assert list(report['support']) == list(np.bincount(y_test, minlength=28))
+    # Top-1 is plain accuracy and every label is within the top 28
+    assert report['top_k'][1] == pytest.approx(accuracy)
+    assert report['top_k'][1] <= report['top_k'][5] <= report['top_k'][28] == 1.0
+    predictions = model.predict(X_test, verbose=0).argmax(axis=1)
+    for label in np.unique(predictions):
+        hits = np.sum((predictions == label) & (y_test == label))
+        assert report['precision'][label] == pytest.approx(hits / np.sum(predictions == label))
+
+def test_reports_are_cached_per_model_and_dataset(model, test_data):
+    """Repeated evaluations are cache hits; new weights or new data are evaluated again."""
+    X_test, y_test = test_data
+    evaluator = Evaluator()
+    assert evaluator.cached(model, X_test, y_test) is None
+    first = evaluator.evaluate(model, X_test, y_test)
+    assert evaluator.evaluate(model, X_test, y_test) is first
+    assert evaluator.cached(model, X_test, y_test) is first
+    # Changed labels are a different dataset
+    assert evaluator.cached(model, X_test, (y_test + 1) % 28) is None
+    # A retrained model has different weights
+    retrained = ModelTrainer.build_model()
+    retrained.set_weights([weight + 0.01 for weight in model.get_weights()])
+    assert evaluator.cached(retrained, X_test, y_test) is None
+
+def test_invalid_labels_are_reported(model):
+    """Out-of-range labels are reported, not raised."""
+    assert Evaluator.evaluate_model(model, np.zeros((4, 1024), dtype=np.uint8), np.array([0, 1, 2, 99])) is None
@@ -0,0 +1,81 @@
+"""
+InferenceServer Tests exercise the HTTP service and its micro-batcher.
+"""
+# Import required libraries
+import gc
+import json
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from benchmarks.load_test import make_payload, run_load
+from classes.inference_server import InferenceServer
+from classes.micro_batcher import MicroBatcher
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+
+@pytest.fixture(scope="module")
+def server():
+    server = InferenceServer(ModelTrainer.build_model(), port=0, max_batch_size=8, max_wait_ms=20).start()
+    yield server
+    server.stop()
+
+def _post(server, content_type, body):
+    request = urllib.request.Request(server.url + "/predict", data=body, headers={'Content-Type': content_type})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def test_micro_batcher_combines_concurrent_requests():
+    """Requests arriving together share one call, each gets its own row back."""
+    calls = []
+
+    def inference_fn(batch):
+        calls.append(len(batch))
+        time.sleep(0.01)
+        return batch.reshape(len(batch), -1)[:, :2]
+
+    batcher = MicroBatcher(inference_fn, max_batch_size=4, max_wait_ms=50)
+    samples = [np.full((1, 1, 32, 32, 1), i, dtype='float32') for i in range(8)]
+    futures = [batcher.submit(sample) for sample in samples]
+    assert [future.result(5)[0] for future in futures] == list(range(8))
+    assert calls == [4, 4]
+    assert batcher.stats()['mean_batch_size'] == 4
+
+@pytest.mark.parametrize("multipart", [False, True])
+def test_predict_json_and_multipart(server, multipart):
+    """Both input encodings return a ranked prediction per image."""
+    result = _post(server, *make_payload(multipart))
+    assert len(result['predictions']) == 1
+    prediction = result['predictions'][0]
+    assert prediction['label'] == Predictor.characters[prediction['class']]
+    assert len(prediction['top_k']) == 3
+    assert 0 <= prediction['confidence'] <= 1
+
+def test_server_keeps_its_model_alive():
+    """The server owns its model, a collection cycle does not break prediction."""
+    server = InferenceServer(ModelTrainer.build_model(), port=0, max_batch_size=1).start()
+    try:
+        gc.collect()
+        result = _post(server, *make_payload(False))
+        assert len(result['predictions']) == 1
+    finally:
+        server.stop()
+
+def test_invalid_requests_are_rejected(server):
+    """Malformed bodies get 400, undecodable images are listed as failed."""
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(server, "application/json", b"not json")
+    assert error.value.code == 400
+    result = _post(server, "application/json", json.dumps({'images': ["bm90IGFuIGltYWdl"]}).encode())
+    assert result == {'predictions': [], 'failed': ['image_0']}
+
+def test_concurrent_load_is_batched(server):
+    """Concurrent clients are served without errors from shared batches."""
+    before = server.stats()
+    stats = run_load(server.url, *make_payload(), requests=40, concurrency=8, warmup=2)
+    after = server.stats()
+    assert stats['requests'] == 40 and stats['errors'] == 0
+    assert stats['p50_ms'] <= stats['p99_ms']
+    # Fewer inference calls than requests
+    assert after['batches'] - before['batches'] < after['samples'] - before['samples']
@@ -1,80 +1,268 @@
-
-
-"""
-Test Integration Model validates cross-module workflows:
-
-Training → Saving → Prediction (Path Coverage)
-
-Canvas → Preprocessing → Prediction (Condition Coverage)
-"""
-# Import required libraries and files
-import pytest
-import numpy as np
-from PIL import Image
-from classes.model_trainer import ModelTrainer
-from classes.predictor import Predictor
-from classes.data_handler import DataHandler
-
-@pytest.fixture
-def sample_data():
-    """Generate sample training data for integration tests."""
-    return (
-        np.random.rand(10, 1, 32, 32, 1).astype('float32'),  # X_train
-        np.random.randint(0, 28, 10)  # y_train (28 classes)
-    )
-
-def test_train_save_predict_workflow(tmp_path, sample_data):
-    """
-    End-to-end test: Train → Save → Load → Predict (Path Coverage).
-    Covers interaction between ModelTrainer and Predictor.
-    """
-    X_train, y_train = sample_data
-    
-    # 1. Train model
-    model = ModelTrainer.build_model()
-    history = ModelTrainer.train_model(model, X_train, y_train, epochs=1)
-    assert history is not None  # Training occurred
-    
-    # 2. Save and load
-    model_path = str(tmp_path / "model.keras")
-    model.save(model_path)
-    loaded_model = ModelTrainer.load_model(model_path)
-    assert loaded_model is not None  # Loading succeeded
-    
-    # 3. Predict
-    pred_class, confidence, _ = Predictor.predict_image(loaded_model, X_train[0])
-    assert pred_class in range(28)  # Valid class prediction
-    assert 0 <= confidence <= 1  # Confidence normalized
-
-def test_canvas_to_prediction_integration():
-    """
-    Test UI-to-prediction workflow (Condition + Path Coverage).
-    Simulates Streamlit canvas → DataHandler → Predictor pipeline.
-    """
-    # 1. Simulate canvas output (RGBA)
-    canvas_data = np.zeros((32, 32, 4), dtype=np.uint8)
-    canvas_data[..., 3] = 255  # Opaque alpha channel
-    
-    # 2. Convert to grayscale PIL Image
-    img = Image.fromarray(canvas_data).convert("L")
-    
-    # 3. Mock model (always predicts class 1 with 90% confidence)
-    class MockModel:
-        def predict(self, x, verbose=0):
-            return np.array([[0.9 if i == 1 else 0.01 for i in range(28)]])
-    
-    # 4. Full prediction workflow
-    pred_class, confidence, processed_img = Predictor.predict_image(MockModel(), img)
-    
-    # Assertions. Mock model's forced prediction
-    assert pred_class == 1  
-    # 90% confidence
-    assert confidence == pytest.approx(0.9, 0.01)  
-    # Correct preprocessing
-    assert processed_img.shape == (1, 1, 32, 32, 1)  
-
-def test_invalid_image_handling():
-    """Test error handling for corrupt images (Condition Testing)."""
-    with pytest.raises(ValueError):
-        # Invalid input
+
+
+"""
+Test Integration Model validates cross-module workflows:
+
+Training → Saving → Prediction (Path Coverage)
+
+Canvas → Preprocessing → Prediction (Condition Coverage)
+"""
+# Import required libraries and files
+import gc
+import io
+import weakref
+import pytest
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.data_handler import DataHandler
+from classes.reporting import ConsoleProgress, ConsoleReporter, set_reporter
+
+@pytest.fixture
+def sample_data():
+    """Generate sample training data for integration tests."""
+    return (
+        np.random.rand(10, 1, 32, 32, 1).astype('float32'),  # X_train
+        np.random.randint(0, 28, 10)  # y_train (28 classes)
+    )
+
+def test_train_save_predict_workflow(tmp_path, sample_data):
+    """
+    End-to-end test: Train → Save → Load → Predict (Path Coverage).
+    Covers interaction between ModelTrainer and Predictor.
+    """
+    X_train, y_train = sample_data
+    
+    # 1. Train model
+    model = ModelTrainer.build_model()
+    history = ModelTrainer.train_model(model, X_train, y_train, epochs=1)
+    assert history is not None  # Training occurred
+    
+    # 2. Save and load
+    model_path = str(tmp_path / "model.keras")
+    model.save(model_path)
+    loaded_model = ModelTrainer.load_model(model_path)
+    assert loaded_model is not None  # Loading succeeded
+    
+    # 3. Predict
+    pred_class, confidence, _ = Predictor.predict_image(loaded_model, X_train[0])
+    assert pred_class in range(28)  # Valid class prediction
+    assert 0 <= confidence <= 1  # Confidence normalized
+
+def test_tf_data_training_on_uint8_pixels():
+    """
+    Training through the tf.data pipeline on raw uint8 pixels (Path Coverage).
+    Covers the index-based validation split and in-pipeline normalisation.
+    """
+    X_train = np.random.randint(0, 256, (20, 1, 32, 32, 1), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 20)
+    model = ModelTrainer.build_model()
+    history = ModelTrainer.train_model(model, X_train, y_train, epochs=1, batch_size=8,
+                                       use_tf_data=True, shuffle_buffer=16)
+    assert history is not None
+    assert 'val_accuracy' in history.history
+
+def test_training_history_records_throughput():
+    """The training callback adds timing, throughput, memory and learning rate per epoch."""
+    X_train = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 40)
+    model = ModelTrainer.build_model()
+    history = ModelTrainer.train_model(model, X_train, y_train, epochs=2, batch_size=8)
+    for key in ('epoch_time', 'samples_per_sec', 'step_time_p50_ms', 'step_time_p99_ms',
+                'train_time', 'val_time', 'overhead_time', 'peak_memory_mb', 'learning_rate'):
+        assert len(history.history[key]) == 2, key
+    assert all(rate > 0 for rate in history.history['samples_per_sec'])
+    assert history.history['step_time_p50_ms'][1] <= history.history['step_time_p99_ms'][1]
+    assert history.history['learning_rate'][0] == pytest.approx(1e-3)
+
+@pytest.mark.parametrize("use_attention", [False, True])
+def test_xla_multi_step_training(use_attention):
+    """Both variants (attention uses Attention + Concatenate) train under XLA with several steps per call."""
+    X_train = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 40)
+    model = ModelTrainer.build_model(use_attention=use_attention, jit_compile=True, steps_per_execution=4)
+    assert ModelTrainer.compile_mode(model) == "XLA, 4 steps/call"
+    history = ModelTrainer.train_model(model, X_train, y_train, epochs=2, batch_size=4)
+    assert history is not None
+    # Training did not fall back to the default compile
+    assert model.jit_compile
+    assert len(history.history['epoch_time']) == 2
+
+@pytest.mark.parametrize("error", [RuntimeError("callback failed"),
+                                   tf.errors.InvalidArgumentError(None, None, "bad batch")])
+def test_xla_training_errors_are_not_retried(error):
+    """An error that is not an XLA compilation failure fails training instead of rerunning it without XLA."""
+    X_train = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 40)
+    model = ModelTrainer.build_model(jit_compile=True)
+    calls = []
+
+    def fail_after_first_batch(batch, logs):
+        calls.append(batch)
+        raise error
+
+    history = ModelTrainer.train_model(model, X_train, y_train, epochs=1, batch_size=8, callbacks=[
+        tf.keras.callbacks.LambdaCallback(on_train_batch_end=fail_after_first_batch)])
+    assert history is None
+    assert len(calls) == 1
+    assert model.jit_compile
+
+def test_interrupted_training_resumes_from_checkpoint(tmp_path):
+    """A run stopped mid-way continues from its last epoch with the full history."""
+    class InterruptedProgress(ConsoleProgress):
+        # Simulates a session disconnect after the second epoch
+        def update(self, fraction, text=None):
+            if fraction > 0.5:
+                raise RuntimeError("session disconnected")
+
+    class InterruptingReporter(ConsoleReporter):
+        def progress(self):
+            return InterruptedProgress(self)
+
+    X_train = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 40)
+    checkpoint_dir = str(tmp_path / "run")
+    previous = set_reporter(InterruptingReporter(stream=io.StringIO()))
+    try:
+        assert ModelTrainer.train_model(ModelTrainer.build_model(), X_train, y_train, epochs=4,
+                                        batch_size=8, checkpoint_dir=checkpoint_dir) is None
+    finally:
+        set_reporter(previous)
+    assert ModelTrainer.checkpoint_epoch(checkpoint_dir) == 2
+    history = ModelTrainer.train_model(ModelTrainer.build_model(), X_train, y_train, epochs=4,
+                                       batch_size=8, checkpoint_dir=checkpoint_dir)
+    # Only epochs 3 and 4 ran again, the curves cover all four
+    assert history.epoch == [2, 3]
+    assert len(history.history['loss']) == 4
+    # The checkpoint is removed once the run completes
+    assert ModelTrainer.checkpoint_epoch(checkpoint_dir) is None
+
+def test_fine_tune_loaded_model(tmp_path):
+    """An existing model continues training on new data with a lower learning rate."""
+    X_train = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y_train = np.random.randint(0, 28, 40)
+    model_path = ModelTrainer.save_model(ModelTrainer.build_model(), str(tmp_path / "model.keras"))
+    model = ModelTrainer.load_model(model_path)
+    history = ModelTrainer.fine_tune(model, X_train, y_train, epochs=1, learning_rate=1e-4, batch_size=8)
+    assert history is not None
+    assert history.history['learning_rate'][0] == pytest.approx(1e-4)
+
+def test_make_dataset_normalises_batches():
+    """tf.data batches are float32 in [0,1] with the model input shape."""
+    X = np.full((10, 1024), 255, dtype=np.uint8)
+    y = np.arange(10)
+    dataset = ModelTrainer.make_dataset(X, y, np.arange(8, 10), batch_size=4)
+    features, labels = next(iter(dataset))
+    assert features.shape == (2, 1, 32, 32, 1)
+    assert np.allclose(features.numpy(), 1.0)
+    assert list(labels.numpy()) == [8, 9]
+
+def test_make_dataset_reads_memory_mapped_arrays(tmp_path):
+    """Batches are gathered from the NumPy array itself, so a memory-mapped file works as input."""
+    np.save(tmp_path / "X.npy", np.arange(10 * 1024, dtype=np.int64).reshape(10, 1024).astype(np.uint8))
+    X = np.load(tmp_path / "X.npy", mmap_mode='r')
+    y = np.arange(10, dtype=np.int32)
+    dataset = ModelTrainer.make_dataset(X, y, np.arange(10), batch_size=4)
+    features, labels = zip(*[(f.numpy(), l.numpy()) for f, l in dataset])
+    assert np.allclose(np.concatenate(features).reshape(10, 1024), X / 255.0)
+    assert np.concatenate(labels).tolist() == list(range(10))
+
+def test_fast_path_matches_predict():
+    """
+    The traced single-sample path gives the same prediction as model.predict
+    and is reused across calls.
+    """
+    model = ModelTrainer.build_model()
+    img = Image.fromarray(np.random.randint(0, 256, (40, 40), dtype=np.uint8))
+    slow_class, slow_conf, _ = Predictor.predict_image(model, img)
+    fast_class, fast_conf, _ = Predictor.predict_image(model, img, fast=True)
+    assert fast_class == slow_class
+    assert fast_conf == pytest.approx(slow_conf, rel=1e-4)
+    assert Predictor.get_predict_fn(model).traced is Predictor.get_predict_fn(model).traced
+
+def test_predict_fn_cache_releases_models():
+    """
+    A cached traced function does not keep its model alive.
+    """
+    # Models of earlier tests are released first
+    gc.collect()
+    cached = len(Predictor._predict_fns)
+    model = ModelTrainer.build_model()
+    Predictor.get_predict_fn(model)(np.zeros((1, 1, 32, 32, 1), dtype='float32'))
+    assert len(Predictor._predict_fns) == cached + 1
+    model_ref = weakref.ref(model)
+    del model
+    gc.collect()
+    assert model_ref() is None
+    assert len(Predictor._predict_fns) == cached
+
+def test_predict_fn_keeps_its_model_alive():
+    """
+    A callable held without its model still predicts after a collection.
+    """
+    sample = np.zeros((1, 1, 32, 32, 1), dtype='float32')
+    predict_fn = Predictor.get_predict_fn(ModelTrainer.build_model())
+    inference_fn = Predictor.get_inference_fn(ModelTrainer.build_model())
+    gc.collect()
+    assert predict_fn(sample).shape == (1, 28)
+    assert inference_fn(sample).shape == (1, 28)
+
+
+def test_canvas_to_prediction_integration():
+    """
+    Test UI-to-prediction workflow (Condition + Path Coverage).
+    Simulates Streamlit canvas → DataHandler → Predictor pipeline.
+    """
+    # 1. Simulate canvas output (RGBA)
+    canvas_data = np.zeros((32, 32, 4), dtype=np.uint8)
+    canvas_data[..., 3] = 255  # Opaque alpha channel
+    
+    # 2. Convert to grayscale PIL Image
+    img = Image.fromarray(canvas_data).convert("L")
+    
+    # 3. Mock model (always predicts class 1 with 90% confidence)
+    class MockModel:
+        def predict(self, x, verbose=0):
+            return np.array([[0.9 if i == 1 else 0.01 for i in range(28)]])
+    
+    # 4. Full prediction workflow
+    pred_class, confidence, processed_img = Predictor.predict_image(MockModel(), img)
+    
+    # Assertions. Mock model's forced prediction
+    assert pred_class == 1  
+    # 90% confidence
+    assert confidence == pytest.approx(0.9, 0.01)  
+    # Correct preprocessing
+    assert processed_img.shape == (1, 1, 32, 32, 1)  
+
+def test_batch_prediction_integration():
+    """
+    Batch workflow: images → contiguous preprocessing → batched inference → top-k labels.
+    """
+    images = [Image.new('L', (48, 48), color=c) for c in (0, 128, 255)]
+    calls = []
+    
+    # Mock model records batch sizes and ranks class 2 above class 5
+    class MockModel:
+        def predict(self, x, verbose=0):
+            calls.append(len(x))
+            probs = np.full((len(x), 28), 0.01)
+            probs[:, 2] = 0.7
+            probs[:, 5] = 0.2
+            return probs
+    
+    results = Predictor.predict_batch(MockModel(), images, batch_size=2, top_k=2)
+    # Inference ran in batches of at most 2
+    assert calls == [2, 1]
+    assert list(results['classes']) == [2, 2, 2]
+    assert results['top_k_classes'].shape == (3, 2)
+    assert list(results['top_k_labels'][0]) == [Predictor.characters[2], Predictor.characters[5]]
+    assert results['confidences'] == pytest.approx([0.7, 0.7, 0.7])
+
+def test_invalid_image_handling():
+    """Test error handling for corrupt images (Condition Testing)."""
+    with pytest.raises(ValueError):
+        # Invalid input
         Predictor.predict_image(None, "not_an_image")  
\ No newline at end of file
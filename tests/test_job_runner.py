@@ -0,0 +1,91 @@
+"""
+JobRunner Tests run training jobs in background worker processes.
+"""
+# Import required libraries
+import os
+import time
+import numpy as np
+from classes.job_runner import JobRunner
+from classes.model_trainer import ModelTrainer
+
+def wait_for(runner, job_id, timeout=180):
+    """Polls a job until it leaves the queued and running states."""
+    deadline = time.time() + timeout
+    while runner.get(job_id).active and time.time() < deadline:
+        time.sleep(0.5)
+    return runner.get(job_id)
+
+def test_job_streams_epochs_and_saves_model():
+    """A job reports each epoch while running and hands back the saved model and history."""
+    runner = JobRunner(max_concurrent=1, niceness=0)
+    X = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 40)
+    job_id = runner.submit(X, y, epochs=2, batch_size=8)
+    job = wait_for(runner, job_id)
+    assert job.status == 'finished', job.error
+    assert len(job.epochs) == 2
+    assert 'val_accuracy' in job.epochs[-1]
+    assert os.path.exists(job.model_path)
+    assert len(job.training_history().history['loss']) == 2
+    assert job.layer_profile is None
+    # The training data is removed with the job
+    assert not os.path.exists(job.data_dir)
+
+def test_profiled_job_returns_layer_profile(tmp_path):
+    """A profiled job writes a trace and hands back the per-layer cost of its model."""
+    runner = JobRunner(max_concurrent=1, niceness=0)
+    X = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 40)
+    job = wait_for(runner, runner.submit(X, y, epochs=1, batch_size=8, profile_dir=str(tmp_path),
+                                         profile_batches=(1, 2)))
+    assert job.status == 'finished', job.error
+    assert any(row['type'] == 'LSTM' for row in job.layer_profile['layers'])
+    assert any(name.endswith('.xplane.pb') for _, _, files in os.walk(tmp_path) for name in files)
+
+def test_jobs_beyond_the_limit_wait_and_can_be_cancelled():
+    """Only max_concurrent jobs run, queued and running jobs can be cancelled."""
+    runner = JobRunner(max_concurrent=1, niceness=0)
+    X = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 40)
+    first = runner.submit(X, y, epochs=50, batch_size=8)
+    second = runner.submit(X, y, epochs=1, batch_size=8)
+    assert [job['status'] for job in runner.jobs()] == ['queued', 'running']
+    assert runner.cancel(second)
+    assert runner.cancel(first)
+    assert not runner.cancel(first)
+    assert [job['status'] for job in runner.jobs([first, second])] == ['cancelled', 'cancelled']
+    # The worker process is gone
+    process = runner.get(first).process
+    process.join(10)
+    assert not process.is_alive()
+
+def test_manifest_job_streams_shards(tmp_path):
+    """A manifest job reads its shards in the worker instead of arrays from the app."""
+    for index in range(2):
+        np.save(tmp_path / f"X{index}.npy", np.random.randint(0, 256, (24, 1024), dtype=np.uint8))
+        np.save(tmp_path / f"y{index}.npy", np.random.randint(1, 29, 24))
+    (tmp_path / "shards.json").write_text('[{"features": "X0.npy", "labels": "y0.npy"}, '
+                                          '{"features": "X1.npy", "labels": "y1.npy"}]')
+    runner = JobRunner(max_concurrent=1, niceness=0)
+    job = wait_for(runner, runner.submit(None, None, epochs=1, batch_size=8, manifest=str(tmp_path / "shards.json"),
+                                         shard_threads=2))
+    assert job.status == 'finished', job.error
+    assert len(job.epochs) == 1 and 'val_accuracy' in job.epochs[0]
+    (tmp_path / "bad.json").write_text('[]')
+    job = wait_for(runner, runner.submit(None, None, epochs=1, manifest=str(tmp_path / "bad.json")))
+    assert job.status == 'failed' and "Manifest error" in job.error
+
+def test_fine_tune_job_stores_base_model_with_its_data(tmp_path):
+    """A base model given as bytes is fine-tuned from the job's data and removed with it."""
+    base_path = str(tmp_path / "base.keras")
+    ModelTrainer.build_model().save(base_path)
+    with open(base_path, 'rb') as f:
+        base_model_bytes = f.read()
+    runner = JobRunner(max_concurrent=1, niceness=0)
+    X = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 40)
+    job = wait_for(runner, runner.submit(X, y, epochs=1, batch_size=8, base_model_bytes=base_model_bytes))
+    assert job.status == 'finished', job.error
+    assert job.options['base_model_path'].startswith(job.data_dir)
+    assert 'base_model_bytes' not in job.options
+    assert not os.path.exists(job.options['base_model_path'])
@@ -0,0 +1,48 @@
+"""
+NumPy Backend Tests check that the .npz export reproduces the Keras model
+and that loading and predicting through it never imports TensorFlow.
+"""
+# Import required libraries
+import subprocess
+import sys
+import numpy as np
+import pytest
+from classes.model_trainer import ModelTrainer
+from classes.numpy_model import NumpyModel
+
+def randomized_model(use_attention):
+    """Model with non-trivial BatchNormalization statistics, as after training."""
+    model = ModelTrainer.build_model(use_attention=use_attention)
+    rng = np.random.default_rng(0)
+    for layer in model.layers:
+        if type(layer).__name__ == 'BatchNormalization':
+            channels = layer.gamma.shape[0]
+            layer.gamma.assign(rng.uniform(0.5, 1.5, channels).astype('float32'))
+            layer.beta.assign(rng.normal(0, 0.1, channels).astype('float32'))
+            layer.moving_mean.assign(rng.normal(0, 0.1, channels).astype('float32'))
+            layer.moving_variance.assign(rng.uniform(0.5, 2.0, channels).astype('float32'))
+    return model
+
+@pytest.mark.parametrize("use_attention", [False, True])
+def test_numpy_export_matches_keras(tmp_path, use_attention):
+    """The NumPy forward pass reproduces the Keras probabilities."""
+    model = randomized_model(use_attention)
+    path = ModelTrainer.export_numpy(model, str(tmp_path / "model.npz"))
+    assert path is not None
+    numpy_model = NumpyModel(path)
+    X = np.random.rand(8, 1, 32, 32, 1).astype('float32')
+    np.testing.assert_allclose(numpy_model.predict(X), model.predict(X, verbose=0), atol=1e-5)
+    y = np.random.randint(0, 28, 8)
+    report = ModelTrainer.compare_numpy(model, path, X, y, latency_runs=2)
+    assert report['agreement'] == 1.0 and report['max_abs_diff'] < 1e-5
+
+def test_numpy_backend_skips_tensorflow(tmp_path):
+    """Loading an .npz export and predicting through Predictor leaves TensorFlow unloaded."""
+    path = ModelTrainer.export_numpy(ModelTrainer.build_model(), str(tmp_path / "model.npz"))
+    code = ("import sys; from PIL import Image; from classes.predictor import Predictor; "
+            f"model = Predictor.load_model({path!r}, backend='numpy'); "
+            "pred_class, confidence, _ = Predictor.predict_image(model, Image.new('L', (32, 32)), fast=True); "
+            "print(pred_class in range(28), 'tensorflow' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ["True", "False"]
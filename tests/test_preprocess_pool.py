@@ -0,0 +1,51 @@
+"""
+PreprocessPool Module Tests check that threaded preprocessing streams
+ordered batches identical to the serial DataHandler path.
+"""
+# Import required libraries
+import numpy as np
+from PIL import Image
+from classes.data_handler import DataHandler
+from classes.preprocess_pool import PreprocessPool
+from classes.predictor import Predictor
+
+def _images(n):
+    """Random grayscale images of mixed sizes."""
+    return [Image.fromarray(np.random.randint(0, 256, (30 + i, 40), dtype=np.uint8)) for i in range(n)]
+
+def test_pool_matches_serial_preprocessing():
+    """Batches arrive in input order and match preprocess_images."""
+    images = _images(11)
+    pool = PreprocessPool(workers=3, queue_depth=2, batch_size=4)
+    batches = list(pool.iter_batches(images))
+    assert [len(names) for names, _, _ in batches] == [4, 4, 3]
+    names = [name for batch_names, _, _ in batches for name in batch_names]
+    pooled = np.concatenate([array for _, array, _ in batches])
+    serial_names, serial, _ = DataHandler.preprocess_images(images)
+    assert names == serial_names
+    np.testing.assert_array_equal(pooled, serial)
+    assert pool.timings['images'] == 11
+    assert pool.timings['batches'] == 3
+
+def test_pool_skips_unreadable_images():
+    """Images that fail to decode are reported, not fatal."""
+    pool = PreprocessPool(workers=2, batch_size=8)
+    (names, array, failed), = list(pool.iter_batches(_images(2) + [None]))
+    assert names == ['image_0', 'image_1']
+    assert failed == ['image_2']
+    assert array.shape == (2, 1, 32, 32, 1)
+
+def test_predict_batch_with_workers_matches_serial():
+    """Overlapped preprocessing gives the same predictions and reports timings."""
+    class MockModel:
+        def predict(self, x, verbose=0):
+            # Class depends on the mean pixel so order mistakes show up
+            probs = np.zeros((len(x), 28))
+            probs[np.arange(len(x)), (x.reshape(len(x), -1).mean(axis=1) * 27).astype(int)] = 1.0
+            return probs
+    images = _images(9)
+    serial = Predictor.predict_batch(MockModel(), images, batch_size=4)
+    pooled = Predictor.predict_batch(MockModel(), images, batch_size=4, workers=2)
+    np.testing.assert_array_equal(serial['classes'], pooled['classes'])
+    assert list(serial['names']) == list(pooled['names'])
+    assert set(pooled['timings']) >= {'preprocess', 'inference', 'total'}
@@ -0,0 +1,53 @@
+"""
+Profiler Tests cover the per-layer cost table and the profiler traces
+written by training and prediction.
+"""
+# Import required libraries
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.profiler import ModelProfiler
+
+def trace_files(profile_dir):
+    """Profiler trace files written under a run directory."""
+    return [name for _, _, files in os.walk(profile_dir) for name in files if name.endswith('.xplane.pb')]
+
+@pytest.mark.parametrize("use_attention", [False, True])
+def test_layer_profile_covers_architecture(use_attention):
+    """Every layer is timed, FLOPs match the conv arithmetic and blocks cover the architecture."""
+    model = ModelTrainer.build_model(use_attention=use_attention)
+    profile = ModelProfiler.layer_profile(model, batch_size=2, runs=2, warmup=1)
+    rows = {row['layer']: row for row in profile['layers']}
+    assert len(rows) == len(model.layers) - 1
+    assert all(row['latency_ms'] > 0 for row in rows.values())
+    assert sum(row['share'] for row in rows.values()) == pytest.approx(1.0)
+    # First conv: 32x32 outputs with 32 filters over a 3x3x1 window, plus bias
+    first_conv = next(row for row in profile['layers'] if row['type'] == 'Conv2D')
+    assert first_conv['flops'] == 2 * 32 * 32 * 32 * (2 * 9 + 1)
+    blocks = [block['block'] for block in ModelProfiler.block_summary(profile)]
+    expected = ["Input", "CNN block 1", "CNN block 2", "CNN block 3", "Reshape", "LSTM"]
+    assert blocks == expected + (["Attention", "Classifier"] if use_attention else ["Classifier"])
+    assert sum(row['params'] for row in rows.values()) == model.count_params()
+    assert profile['model_latency_ms'] > 0
+
+def test_train_model_writes_trace(tmp_path):
+    """Training with a profile directory traces the requested batch window."""
+    model = ModelTrainer.build_model()
+    X = np.random.randint(0, 256, (80, 1, 32, 32, 1), dtype=np.uint8)
+    y = np.random.randint(0, 28, 80)
+    history = ModelTrainer.train_model(model, X, y, epochs=1, batch_size=8,
+                                       profile_dir=str(tmp_path), profile_batches=(2, 3))
+    assert history is not None
+    assert trace_files(tmp_path)
+
+def test_predict_image_writes_trace(tmp_path):
+    """A profiled prediction returns the same result and leaves a trace."""
+    model = ModelTrainer.build_model()
+    image = Image.new('L', (32, 32))
+    expected = Predictor.predict_image(model, image, fast=True)[0]
+    pred_class, _, _ = Predictor.predict_image(model, image, fast=True, profile_dir=str(tmp_path))
+    assert pred_class == expected
+    assert trace_files(tmp_path)
@@ -0,0 +1,111 @@
+"""
+Segmenter Tests cover binarization, run-length labelling, diacritic merging,
+right-to-left ordering and the batched per-character prediction.
+"""
+# Import required libraries
+import numpy as np
+from PIL import Image, ImageDraw
+from classes.predictor import Predictor
+from classes.segmenter import Segmenter
+
+class _RecordingModel:
+    """Stand-in model that records each predict() batch and always predicts class 0."""
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, x, verbose=0):
+        self.batches.append(len(x))
+        probabilities = np.zeros((len(x), 28), dtype='float32')
+        probabilities[:, 0] = 1.0
+        return probabilities
+
+def draw_line(letters, dotted=(), size=(400, 100), top=30, background=230, ink=20):
+    """Draws one line of filled ellipses at the given x positions, dots above the dotted ones."""
+    image = Image.new('L', size, background)
+    draw = ImageDraw.Draw(image)
+    for index, x in enumerate(letters):
+        draw.ellipse([x, top, x + 30, top + 40], fill=ink)
+        if index in dotted:
+            draw.ellipse([x + 12, top - 14, x + 18, top - 8], fill=ink)
+    return image
+
+def test_otsu_threshold_separates_modes():
+    """The threshold falls between the ink and background grey levels."""
+    gray = np.concatenate([np.full(300, 40), np.full(700, 210)]).astype(np.uint8)
+    assert 40 <= Segmenter.otsu_threshold(gray) < 210
+
+def test_label_components_connectivity():
+    """U shapes merge through union-find, diagonal pixels are 8-connected."""
+    ink = np.zeros((8, 12), dtype=bool)
+    # U shape whose arms only meet at the bottom row
+    ink[0:5, 0] = ink[0:5, 3] = ink[4, 0:4] = True
+    # Diagonal staircase
+    ink[0, 6] = ink[1, 7] = ink[2, 8] = True
+    # Separate block
+    ink[6:8, 10:12] = True
+    label_image, count = Segmenter.label_components(ink)
+    assert count == 3
+    assert np.array_equal(label_image > 0, ink)
+    assert len(np.unique(label_image[0:5, 0:4][ink[0:5, 0:4]])) == 1
+    boxes, areas = Segmenter.component_boxes(label_image, count)
+    assert sorted(areas.tolist()) == [3, 4, 12]
+
+def test_segment_merges_diacritics_and_orders_right_to_left():
+    """Dots join their letter and regions are read right to left."""
+    image = draw_line([20, 60, 100, 220], dotted=(1, 3))
+    result = Segmenter.segment(image)
+    assert result['components'] == 6 and result['lines'] == 1
+    boxes = [region['bbox'] for region in result['regions']]
+    assert [box[0] for box in boxes] == [220, 100, 60, 20]
+    # Dotted letters reach above the undotted ones
+    assert boxes[0][1] < boxes[1][1] and boxes[2][1] < boxes[3][1]
+    # The wide gap starts a second word
+    assert [region['word'] for region in result['regions']] == [0, 1, 1, 1]
+    assert result['crops'].shape == (4, 32, 32) and result['crops'].dtype == np.uint8
+
+def test_segment_groups_lines_and_light_ink():
+    """Two lines are read top to bottom, light-on-dark scans are inverted first."""
+    image = Image.new('L', (300, 200), 10)
+    draw = ImageDraw.Draw(image)
+    for top in (20, 120):
+        for x in (20, 120, 220):
+            draw.rectangle([x, top, x + 30, top + 40], fill=240)
+    result = Segmenter.segment(image)
+    assert result['lines'] == 2
+    assert [region['line'] for region in result['regions']] == [0, 0, 0, 1, 1, 1]
+    assert result['regions'][0]['bbox'][0] == 220
+
+def test_segment_splits_wide_components():
+    """A connected stroke much wider than it is tall is cut at its thinnest columns."""
+    image = Image.new('L', (300, 80), 255)
+    draw = ImageDraw.Draw(image)
+    for x in (20, 80, 140):
+        draw.rectangle([x, 10, x + 40, 60], fill=0)
+    # Thin baseline joining the letters
+    draw.rectangle([20, 58, 180, 60], fill=0)
+    result = Segmenter.segment(image)
+    assert result['components'] == 1
+    assert len(result['regions']) == 3
+    assert len(Segmenter.segment(image, split_ratio=0)['regions']) == 1
+
+def test_segment_page_scales():
+    """A page with hundreds of characters is segmented completely."""
+    page = Image.new('L', (1000, 600), 255)
+    draw = ImageDraw.Draw(page)
+    for row in range(10):
+        for col in range(20):
+            x, y = 10 + col * 49, 10 + row * 58
+            draw.rectangle([x, y + 10, x + 25, y + 45], fill=0)
+            draw.rectangle([x + 10, y, x + 14, y + 4], fill=0)
+    result = Segmenter.segment(page)
+    assert result['components'] == 400
+    assert len(result['regions']) == 200 and result['lines'] == 10
+
+def test_predict_segmented_single_batch():
+    """All crops of an image go through the model in one call and form the text."""
+    model = _RecordingModel()
+    results = Predictor.predict_segmented(model, draw_line([20, 60, 100, 220], dotted=(1,)))
+    assert model.batches == [4]
+    first = Predictor.characters[0]
+    assert results['text'] == first + " " + first * 3
+    assert len(results['regions']) == 4 and results['timings']['characters'] == 4
@@ -0,0 +1,78 @@
+"""
+ShardedDataset Tests stream CSV and .npy shards listed in a manifest.
+"""
+# Import required libraries
+import json
+import threading
+import time
+import numpy as np
+import pytest
+from classes.sharded_dataset import ShardedDataset
+
+def _write_shards(tmp_path, sizes=(50, 37, 64, 23)):
+    """CSV and .npy shards in turn, with the manifest listing them."""
+    rng = np.random.default_rng(0)
+    shards, pixels, labels = [], [], []
+    for index, rows in enumerate(sizes):
+        X = rng.integers(0, 256, (rows, 1024))
+        y = rng.integers(1, 29, rows)
+        if index % 2:
+            np.save(tmp_path / f"X{index}.npy", X.astype(np.uint8))
+            np.save(tmp_path / f"y{index}.npy", y)
+            shards.append({"features": f"X{index}.npy", "labels": f"y{index}.npy"})
+        else:
+            np.savetxt(tmp_path / f"X{index}.csv", X, fmt="%d", delimiter=",")
+            np.savetxt(tmp_path / f"y{index}.csv", y, fmt="%d")
+            shards.append({"features": f"X{index}.csv", "labels": f"y{index}.csv"})
+        pixels.append(X)
+        labels.append(y)
+    return shards, pixels, labels
+
+def _rows(X, y):
+    """Rows as a sorted list of (label, pixels) tuples, to compare regardless of order."""
+    return sorted(zip(y.tolist(), map(tuple, X.tolist())))
+
+def test_pass_reads_every_row_once_in_mixed_batches(tmp_path):
+    """Train batches cover every train row exactly once, with rows of different shards mixed."""
+    shards, pixels, labels = _write_shards(tmp_path)
+    (tmp_path / "manifest.json").write_text(json.dumps({"train": shards[:3], "validation": shards[3:]}))
+    dataset = ShardedDataset.from_manifest(str(tmp_path / "manifest.json"), chunk_size=16, threads=3, seed=0)
+    batches = list(dataset.batches('train', batch_size=20))
+    assert all(len(X) == 20 for X, _ in batches[:-1])
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    assert X.dtype == np.uint8
+    assert _rows(X, y) == _rows(np.concatenate(pixels[:3]), np.concatenate(labels[:3]) - 1)
+    assert dataset.pass_rows['train'] == 151
+    # Rows are not in shard order
+    assert not np.array_equal(X, np.concatenate(pixels[:3]))
+    # Validation is not shuffled and holds the validation shard
+    X_val = np.concatenate([X for X, _ in dataset.batches('validation', batch_size=20)])
+    np.testing.assert_array_equal(X_val, pixels[3])
+
+def test_manifest_without_validation_holds_out_last_shards(tmp_path):
+    """A plain list is split into train and validation shards, bad entries are rejected."""
+    shards, _, _ = _write_shards(tmp_path)
+    (tmp_path / "list.json").write_text(json.dumps(shards))
+    dataset = ShardedDataset.from_manifest(str(tmp_path / "list.json"), validation_split=0.25)
+    assert len(dataset.shards['train']) == 3 and dataset.shards['validation'][0]['features'].endswith("X3.npy")
+    (tmp_path / "one.json").write_text(json.dumps(shards[:1]))
+    assert ShardedDataset.from_manifest(str(tmp_path / "one.json")) is None
+    (tmp_path / "missing.json").write_text(json.dumps([{"features": "none.csv", "labels": "none.csv"}] * 2))
+    assert ShardedDataset.from_manifest(str(tmp_path / "missing.json")) is None
+
+def test_read_errors_surface_and_early_stop_ends_readers(tmp_path):
+    """A bad shard fails the pass, closing a pass early stops its reader threads."""
+    shards, _, _ = _write_shards(tmp_path)
+    shards = [{key: str(tmp_path / path) for key, path in shard.items()} for shard in shards]
+    np.save(tmp_path / "X1.npy", np.full((37, 1024), 300, dtype=np.int32))
+    dataset = ShardedDataset(shards[:2], [], chunk_size=8, threads=2)
+    with pytest.raises(ValueError, match="0-255"):
+        list(dataset.batches('train', batch_size=8))
+    before = threading.active_count()
+    dataset = ShardedDataset(shards[:1] * 20, [], chunk_size=8, threads=2)
+    batches = dataset.batches('train', batch_size=8)
+    next(batches)
+    batches.close()
+    time.sleep(0.5)
+    assert threading.active_count() <= before
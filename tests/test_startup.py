@@ -0,0 +1,44 @@
+"""
+Startup Tests guard the lazy import of TensorFlow and matplotlib:
+app modules must not import them until a code path needs them.
+"""
+# Import required libraries
+import subprocess
+import sys
+import pytest
+
+@pytest.mark.parametrize("module", [
+    "main",
+    "st_pages.train_page",
+    "st_pages.test_page",
+    "st_pages.results_page",
+    "st_pages.exit_page",
+    "classes.model_trainer",
+    "classes.predictor",
+    "classes.model_cache",
+    "classes.distributed_trainer",
+    "classes.job_runner",
+    "classes.evaluator",
+    "classes.sweep",
+    "classes.inference_server",
+    "classes.prediction_cache",
+    "classes.numpy_model",
+    "classes.segmenter",
+    "classes.profiler",
+    "classes.sharded_dataset",
+])
+def test_module_import_is_lazy(module):
+    """Importing an app module leaves TensorFlow and matplotlib unloaded."""
+    code = (f"import sys, {module}; "
+            "print('tensorflow' in sys.modules, 'matplotlib' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ["False", "False"]
+
+@pytest.mark.parametrize("module", ["cli", "classes.data_handler", "classes.model_trainer", "classes.predictor"])
+def test_headless_modules_skip_streamlit(module):
+    """The CLI and the core classes run without importing Streamlit."""
+    code = f"import sys, {module}; print('streamlit' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-1] == "False"
@@ -0,0 +1,49 @@
+"""
+HyperparameterSweep Tests run small sweeps in a process pool.
+"""
+# Import required libraries
+import numpy as np
+import pytest
+from classes.sweep import HyperparameterSweep
+
+def test_expand_fills_defaults():
+    """Every combination becomes one trial, options not in the space keep their defaults."""
+    trials = HyperparameterSweep.expand({'use_attention': [False, True], 'batch_size': [32, 64]})
+    assert len(trials) == 4
+    assert {(trial['use_attention'], trial['batch_size']) for trial in trials} == {
+        (False, 32), (False, 64), (True, 32), (True, 64)}
+    assert all(trial['learning_rate'] == 1e-3 for trial in trials)
+    with pytest.raises(ValueError):
+        HyperparameterSweep.expand({'dropout': [0.1]})
+
+def test_ranked_by_accuracy_and_time():
+    """Completed trials rank above pruned ones by accuracy; time ranks fastest first."""
+    results = [dict(val_accuracy=0.9, train_time=30, pruned=True),
+               dict(val_accuracy=0.5, train_time=10, pruned=False),
+               dict(val_accuracy=0.7, train_time=20, pruned=False)]
+    assert [r['val_accuracy'] for r in HyperparameterSweep.ranked(results)] == [0.7, 0.5, 0.9]
+    assert [r['train_time'] for r in HyperparameterSweep.ranked(results, by='time')] == [10, 20, 30]
+
+def test_trailing_trial_is_pruned():
+    """A trial behind the best trial at the same epoch stops after prune_after epochs."""
+    X = np.random.randint(0, 256, (60, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 60)
+    # A negative margin makes every trial after the first one count as behind
+    results = HyperparameterSweep.run(X, y, {'batch_size': [16, 32], 'epochs': [4]}, workers=1,
+                                      prune_after=2, prune_margin=-1.0)
+    assert [result['pruned'] for result in results] == [False, True]
+    assert [result['epochs_run'] for result in results] == [4, 2]
+    assert len(HyperparameterSweep.table(results)) == 2
+
+def test_failed_trial_keeps_other_results():
+    """A trial that raises is reported as failed, the completed trials are still returned."""
+    X = np.random.randint(0, 256, (40, 1024), dtype=np.uint8)
+    y = np.random.randint(0, 28, 40)
+    # A learning rate that cannot be assigned makes the second trial raise
+    results = HyperparameterSweep.run(X, y, {'learning_rate': [1e-3, 'fast'], 'epochs': [1]}, workers=1,
+                                      prune_after=0)
+    assert results[0]['error'] is None and results[0]['epochs_run'] == 1
+    assert results[1]['error'] and results[1]['val_accuracy'] is None
+    rows = HyperparameterSweep.table(HyperparameterSweep.ranked(results))
+    assert [row['Status'] for row in rows] == ['completed', 'failed']
+    assert rows[1]['Error'] == results[1]['error']
@@ -0,0 +1,56 @@
+"""
+TFLite Export Tests cover conversion for every quantization mode and
+running the export through the Predictor TFLite backend.
+"""
+# Import required libraries
+import tempfile
+import numpy as np
+import pytest
+from PIL import Image
+from classes.model_trainer import ModelTrainer
+from classes.predictor import Predictor
+from classes.tflite_model import TFLiteModel
+
+@pytest.fixture(scope="module")
+def model():
+    """Untrained model shared by the export tests."""
+    return ModelTrainer.build_model()
+
+@pytest.mark.parametrize("quantization", [None, 'dynamic', 'float16', 'int8'])
+def test_export_tflite_modes(tmp_path, model, quantization):
+    """Every quantization mode converts and runs through the interpreter."""
+    calibration = np.random.randint(0, 256, (20, 1, 32, 32, 1), dtype=np.uint8)
+    path = ModelTrainer.export_tflite(model, str(tmp_path / "model.tflite"), quantization=quantization,
+                                      calibration_data=calibration, num_calibration_samples=10)
+    assert path is not None
+    tflite_model = TFLiteModel(path)
+    X = np.random.rand(3, 1, 32, 32, 1).astype('float32')
+    probs = tflite_model.predict(X)
+    assert probs.shape == (3, 28)
+    if quantization in (None, 'float16'):
+        np.testing.assert_allclose(probs, model.predict(X, verbose=0), atol=1e-3)
+
+def test_tflite_backend_and_report(tmp_path, model):
+    """Predictor can load the TFLite backend and the export report is complete."""
+    path = ModelTrainer.export_tflite(model, str(tmp_path / "model.tflite"))
+    tflite_model = Predictor.load_model(path, backend='tflite')
+    pred_class, confidence, _ = Predictor.predict_image(tflite_model, Image.new('L', (32, 32)), fast=True)
+    assert pred_class in range(28)
+    X = np.random.randint(0, 256, (6, 1, 32, 32, 1), dtype=np.uint8)
+    y = np.random.randint(0, 28, 6)
+    report = ModelTrainer.compare_tflite(model, path, X, y, latency_runs=3)
+    assert report['agreement'] == 1.0
+    assert report['tflite_size_mb'] > 0 and report['tflite_latency_ms'] > 0
+    loss, accuracy = tflite_model.evaluate(ModelTrainer.as_model_input(X), y)
+    assert 0 <= accuracy <= 1 and loss > 0
+
+def test_export_and_report_remove_intermediates(tmp_path, monkeypatch, model):
+    """The SavedModel and .keras intermediates are deleted, only the .tflite is kept."""
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+    path = ModelTrainer.export_tflite(model, str(tmp_path / "model.tflite"))
+    X = np.random.randint(0, 256, (2, 1, 32, 32, 1), dtype=np.uint8)
+    report = ModelTrainer.compare_tflite(model, path, X, np.zeros(2, dtype=int), latency_runs=1)
+    assert report['keras_size_mb'] > 0
+    assert list(scratch.iterdir()) == []